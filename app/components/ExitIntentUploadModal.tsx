@@ -3,7 +3,7 @@
 import { useState, useEffect } from 'react';
 import { useRouter } from 'next/navigation';
 import { Upload, FileText, X, Loader2, AlertCircle } from 'lucide-react';
-import axios from 'axios';
+import { analyzeUpload } from '@/app/lib/analyzeUpload';
 
 export default function ExitIntentUploadModal() {
   const router = useRouter();
@@ -74,19 +74,12 @@ export default function ExitIntentUploadModal() {
       setError('');
       setProgress(['Dokument wird verarbeitet ✓']);
 
-      const formData = new FormData();
-      formData.append('file', file);
-
       setTimeout(() => setProgress(prev => [...prev, 'BA GZ 04 Kriterien werden geprüft ✓']), 5000);
 
       const apiUrl = 'http://localhost:8000';
-      const response = await axios.post(`${apiUrl}/api/analyze`, formData, {
-        headers: {
-          'Content-Type': 'multipart/form-data',
-        },
-      });
+      const analysis = await analyzeUpload(apiUrl, file);
 
-      localStorage.setItem('analysisResult', JSON.stringify(response.data));
+      localStorage.setItem('analysisResult', JSON.stringify(analysis));
       await new Promise(resolve => setTimeout(resolve, 100));
       router.push('/results');
 
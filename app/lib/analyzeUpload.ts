@@ -0,0 +1,39 @@
+import axios from 'axios';
+
+// Hex SHA-256 of the file - the same hash the backend stores per upload
+async function sha256Hex(file: File): Promise<string> {
+  const digest = await crypto.subtle.digest('SHA-256', await file.arrayBuffer());
+  return Array.from(new Uint8Array(digest))
+    .map(byte => byte.toString(16).padStart(2, '0'))
+    .join('');
+}
+
+/**
+ * Analyze a business plan file.
+ * The SHA-256 is sent first - if the backend already analyzed the identical
+ * file, its analysis comes back without uploading the file again.
+ */
+export async function analyzeUpload(apiUrl: string, file: File) {
+  try {
+    const preflight = await axios.post(`${apiUrl}/api/analyze/preflight`, {
+      sha256: await sha256Hex(file),
+      filename: file.name,
+    });
+    if (preflight.data.status === 'known') {
+      return preflight.data.analysis;
+    }
+  } catch (err) {
+    // No crypto.subtle outside secure contexts, older backend, ... - just upload
+    console.warn('Upload preflight failed, sending file:', err);
+  }
+
+  const formData = new FormData();
+  formData.append('file', file);
+
+  const response = await axios.post(`${apiUrl}/api/analyze`, formData, {
+    headers: {
+      'Content-Type': 'multipart/form-data',
+    },
+  });
+  return response.data;
+}
@@ -3,7 +3,7 @@
 import { useState } from 'react';
 import { useRouter } from 'next/navigation';
 import { Upload, FileText, AlertCircle, Loader2 } from 'lucide-react';
-import axios from 'axios';
+import { analyzeUpload } from '@/app/lib/analyzeUpload';
 
 export default function UploadPage() {
   const router = useRouter();
@@ -61,9 +61,6 @@ export default function UploadPage() {
       setError('');
       setProgress(['Dokument wird verarbeitet ✓']);
 
-      const formData = new FormData();
-      formData.append('file', file);
-
       // Progress updates
       const progressTimer1 = setTimeout(() => {
         setProgress(prev => [...prev, 'Text wird extrahiert ✓']);
@@ -77,29 +74,25 @@ export default function UploadPage() {
         setProgress(prev => [...prev, 'Kopiervorlagen werden erstellt ✓']);
       }, 10000);
 
-      const response = await axios.post(`${API_URL}/api/analyze`, formData, {
-        headers: {
-          'Content-Type': 'multipart/form-data',
-        },
-      });
+      const analysis = await analyzeUpload(API_URL, file);
 
       // Clear timers
       clearTimeout(progressTimer1);
       clearTimeout(progressTimer2);
       clearTimeout(progressTimer3);
 
-      console.log('Analysis result:', response.data);
+      console.log('Analysis result:', analysis);
 
       // ✅ FIX: Get analysis_id (not session_id!)
-      const analysisId = response.data.analysis_id || response.data.session_id;
+      const analysisId = analysis.analysis_id || analysis.session_id;
       
       if (!analysisId) {
-        console.error('Response data:', response.data);
+        console.error('Response data:', analysis);
         throw new Error('Keine Analysis-ID vom Server erhalten');
       }
 
       // Store in localStorage as backup
-      localStorage.setItem('analysisResult', JSON.stringify(response.data));
+      localStorage.setItem('analysisResult', JSON.stringify(analysis));
       localStorage.setItem('lastAnalysisId', analysisId);
 
       // ✅ Redirect to results WITH analysis ID
@@ -0,0 +1,181 @@
+"""
+Analysis Cache für GründerAI
+Content-addressed cache in front of the Claude analysis
+
+- Key: SHA-256 of the normalized plan text + criteria/prompt version
+- Tier 1: bounded in-memory LRU (per process)
+- Tier 2: persistent on-disk JSON store with TTL (shared across restarts)
+"""
+
+import os
+import json
+import time
+import copy
+import hashlib
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Cache configuration
+ANALYSIS_CACHE_ENABLED = os.getenv("ANALYSIS_CACHE_ENABLED", "true").lower() == "true"
+ANALYSIS_CACHE_MAX_ENTRIES = int(os.getenv("ANALYSIS_CACHE_MAX_ENTRIES", "256"))
+ANALYSIS_CACHE_TTL_HOURS = float(os.getenv("ANALYSIS_CACHE_TTL_HOURS", "168"))  # 7 Tage
+ANALYSIS_CACHE_DIR = os.getenv(
+    "ANALYSIS_CACHE_DIR",
+    os.path.join(os.path.dirname(__file__), "cache", "analyses")
+)
+
+
+def normalize_plan_text(text: str) -> str:
+    """
+    Normalize extracted text so that cosmetic differences
+    (whitespace, line breaks, unicode composition) hit the same cache entry
+    """
+    text = unicodedata.normalize("NFC", text or "")
+    return " ".join(text.split())
+
+
+def make_cache_key(text: str, version: str) -> str:
+    """Build content-addressed cache key from plan text and prompt version"""
+    digest = hashlib.sha256()
+    digest.update(version.encode("utf-8"))
+    digest.update(b"\n")
+    digest.update(normalize_plan_text(text).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class AnalysisCache:
+    """Two-tier (memory LRU + disk TTL) cache for analysis results"""
+
+    def __init__(
+        self,
+        max_entries: int = ANALYSIS_CACHE_MAX_ENTRIES,
+        ttl_hours: float = ANALYSIS_CACHE_TTL_HOURS,
+        cache_dir: Optional[str] = ANALYSIS_CACHE_DIR,
+        enabled: bool = ANALYSIS_CACHE_ENABLED
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_hours * 3600
+        self.cache_dir = cache_dir
+        self.enabled = enabled
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "evictions": 0,
+            "expired": 0,
+        }
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def _is_expired(self, created_at: float) -> bool:
+        return self.ttl_seconds > 0 and time.time() - created_at > self.ttl_seconds
+
+    def _remember(self, key: str, entry: Dict):
+        """Insert into memory tier and evict least recently used entries"""
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def _read_disk(self, key: str) -> Optional[Dict]:
+        if not self.cache_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if self._is_expired(entry.get("created_at", 0)):
+            self._stats["expired"] += 1
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+        return entry
+
+    def _write_disk(self, key: str, entry: Dict):
+        if not self.cache_dir:
+            return
+        path = self._disk_path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"⚠️ Analysis cache write failed: {str(e)}")
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Return a copy of the cached result or None"""
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and self._is_expired(entry["created_at"]):
+                del self._memory[key]
+                self._stats["expired"] += 1
+                entry = None
+
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self._stats["memory_hits"] += 1
+                return copy.deepcopy(entry["result"])
+
+            entry = self._read_disk(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+
+            self._remember(key, entry)
+            self._stats["disk_hits"] += 1
+            return copy.deepcopy(entry["result"])
+
+    def set(self, key: str, result: Dict):
+        """Store a result in both tiers"""
+        if not self.enabled:
+            return
+
+        entry = {"created_at": time.time(), "result": copy.deepcopy(result)}
+        with self._lock:
+            self._remember(key, entry)
+            self._stats["stores"] += 1
+        self._write_disk(key, entry)
+
+    def clear(self):
+        """Drop the memory tier (disk entries expire via TTL)"""
+        with self._lock:
+            self._memory.clear()
+
+    def stats(self) -> Dict:
+        """Hit/miss counters for monitoring"""
+        with self._lock:
+            hits = self._stats["memory_hits"] + self._stats["disk_hits"]
+            lookups = hits + self._stats["misses"]
+            return {
+                "enabled": self.enabled,
+                **self._stats,
+                "hits": hits,
+                "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "max_entries": self.max_entries,
+                "ttl_hours": self.ttl_seconds / 3600,
+            }
+
+
+# Process-wide cache instance
+analysis_cache = AnalysisCache()
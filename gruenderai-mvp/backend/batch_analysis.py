@@ -0,0 +1,245 @@
+"""
+Bulk Analysis für GründerAI
+Analyzes many business plans in one Message Batch (B2B: Berater, Gründungszentren)
+
+The Claude requests of all plans are submitted together and collected
+asynchronously - higher throughput and lower per-plan cost than N
+interactive /api/analyze calls. The batch backend is pluggable:
+- anthropic: Anthropic Message Batches API
+- local: runs the requests locally with bounded concurrency (dev/testing,
+  the request handler can be swapped for a stand-in)
+"""
+
+import os
+import uuid
+import asyncio
+from abc import ABC, abstractmethod
+from typing import Awaitable, Callable, Dict, List, NamedTuple, Optional
+from dotenv import load_dotenv
+
+from grant_calibration import (
+    build_analysis_request,
+    recover_analysis_async,
+    finalize_analysis,
+    prescreen_verdict,
+    get_analysis_cache_key,
+    lookup_analysis,
+    store_analysis,
+    get_async_anthropic_client,
+    create_message_async,
+    create_error_response,
+    SINGLE_CACHE_VARIANT,
+)
+from llm_client import record_usage
+from llm_resilience import is_retryable
+
+load_dotenv()
+
+# Batch configuration
+BATCH_BACKEND = os.getenv("BATCH_BACKEND", "anthropic")  # anthropic | local
+BATCH_POLL_INTERVAL_SECONDS = float(os.getenv("BATCH_POLL_INTERVAL_SECONDS", "30"))
+BATCH_MAX_FILES = int(os.getenv("BATCH_MAX_FILES", "100"))
+BATCH_LOCAL_CONCURRENCY = int(os.getenv("BATCH_LOCAL_CONCURRENCY", "4"))
+
+# Batch results are single analysis-model calls, independent of ANALYSIS_MODE
+# and of the model cascade
+BATCH_CACHE_VARIANT = SINGLE_CACHE_VARIANT
+
+RequestHandler = Callable[[Dict], Awaitable[str]]
+ResultCallback = Callable[[str, Dict], None]
+
+
+class BatchItemResult(NamedTuple):
+    custom_id: str
+    text: Optional[str]
+    error: Optional[str]
+
+
+class BatchBackend(ABC):
+    """Submit a set of Claude requests and collect their answers later"""
+
+    name = "base"
+
+    @abstractmethod
+    async def submit(self, requests: Dict[str, Dict]) -> str:
+        """Submit {custom_id: messages.create params}, return the batch id"""
+
+    @abstractmethod
+    async def is_done(self, batch_id: str) -> bool:
+        """Whether all requests of the batch have finished"""
+
+    @abstractmethod
+    async def results(self, batch_id: str) -> List[BatchItemResult]:
+        """Answers of a finished batch, one per custom_id"""
+
+
+class AnthropicBatchBackend(BatchBackend):
+    """Anthropic Message Batches API"""
+
+    name = "anthropic"
+
+    async def submit(self, requests: Dict[str, Dict]) -> str:
+        client = get_async_anthropic_client()
+        batch = await client.messages.batches.create(requests=[
+            {"custom_id": custom_id, "params": params}
+            for custom_id, params in requests.items()
+        ])
+        return batch.id
+
+    async def is_done(self, batch_id: str) -> bool:
+        client = get_async_anthropic_client()
+        batch = await client.messages.batches.retrieve(batch_id)
+        return batch.processing_status == "ended"
+
+    async def results(self, batch_id: str) -> List[BatchItemResult]:
+        client = get_async_anthropic_client()
+        items = []
+        async for entry in await client.messages.batches.results(batch_id):
+            if entry.result.type == "succeeded":
+                message = entry.result.message
+                record_usage(message.usage)
+                items.append(BatchItemResult(entry.custom_id, message.content[0].text, None))
+            else:
+                items.append(BatchItemResult(entry.custom_id, None, f"Batch request {entry.result.type}"))
+        return items
+
+
+async def _interactive_handler(request: Dict) -> str:
+    response = await create_message_async(get_async_anthropic_client(), request)
+    return response.content[0].text
+
+
+class LocalBatchBackend(BatchBackend):
+    """
+    Runs the batch in-process with bounded concurrency.
+    handler receives the messages.create params and returns the answer text;
+    defaults to interactive Claude calls, tests can pass a stand-in.
+    """
+
+    name = "local"
+
+    def __init__(self, handler: Optional[RequestHandler] = None, concurrency: int = BATCH_LOCAL_CONCURRENCY):
+        self.handler = handler or _interactive_handler
+        self.concurrency = concurrency
+        self._batches: Dict[str, asyncio.Task] = {}
+
+    async def _run(self, requests: Dict[str, Dict]) -> List[BatchItemResult]:
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def run_one(custom_id: str, params: Dict) -> BatchItemResult:
+            async with semaphore:
+                try:
+                    return BatchItemResult(custom_id, await self.handler(params), None)
+                except Exception as e:
+                    return BatchItemResult(custom_id, None, str(e))
+
+        return list(await asyncio.gather(*(run_one(cid, params) for cid, params in requests.items())))
+
+    async def submit(self, requests: Dict[str, Dict]) -> str:
+        batch_id = f"local_{uuid.uuid4().hex[:12]}"
+        self._batches[batch_id] = asyncio.ensure_future(self._run(requests))
+        return batch_id
+
+    async def is_done(self, batch_id: str) -> bool:
+        return self._batches[batch_id].done()
+
+    async def results(self, batch_id: str) -> List[BatchItemResult]:
+        return await self._batches.pop(batch_id)
+
+
+BATCH_BACKENDS = {
+    "anthropic": AnthropicBatchBackend,
+    "local": LocalBatchBackend,
+}
+
+
+def get_batch_backend(name: Optional[str] = None) -> BatchBackend:
+    """Backend instance by name (default: BATCH_BACKEND)"""
+    name = name or BATCH_BACKEND
+    if name not in BATCH_BACKENDS:
+        raise ValueError(f"Unknown batch backend: {name} (available: {', '.join(BATCH_BACKENDS)})")
+    return BATCH_BACKENDS[name]()
+
+
+async def _wait_for_batch(backend: BatchBackend, batch_id: str, poll_interval: float):
+    while True:
+        try:
+            if await backend.is_done(batch_id):
+                return
+        except Exception as e:
+            if not is_retryable(e):
+                raise
+            print(f"⚠️ Batch {batch_id} status check failed, retrying: {str(e)}")
+        await asyncio.sleep(poll_interval)
+
+
+async def run_batch_analysis(
+    plans: Dict[str, str],
+    on_result: ResultCallback,
+    backend: Optional[BatchBackend] = None,
+    poll_interval: float = BATCH_POLL_INTERVAL_SECONDS
+) -> Dict:
+    """
+    Analyze {custom_id: plan_text} as one batch.
+
+    Cached plans and K.O. short-circuit verdicts are answered immediately,
+    the rest is submitted as one batch; on_result(custom_id, result) is
+    called for every plan as soon as its result is available.
+    Returns batch statistics.
+    """
+    backend = backend or get_batch_backend()
+    stats = {
+        "backend": backend.name, "batch_id": None, "total": len(plans),
+        "cached": 0, "prescreened": 0, "succeeded": 0, "failed": 0,
+    }
+
+    cache_keys = {}
+    requests = {}
+    for custom_id, plan_text in plans.items():
+        cache_keys[custom_id] = get_analysis_cache_key(plan_text, BATCH_CACHE_VARIANT)
+        verdict = prescreen_verdict(plan_text)
+        if verdict is not None:
+            stats["prescreened"] += 1
+            on_result(custom_id, verdict)
+            continue
+        cached_result, seed_context = lookup_analysis(plan_text, cache_keys[custom_id], variant=BATCH_CACHE_VARIANT)
+        if cached_result is not None:
+            stats["cached"] += 1
+            on_result(custom_id, cached_result)
+        else:
+            requests[custom_id] = build_analysis_request(plan_text, seed_context)
+
+    if not requests:
+        return stats
+
+    batch_id = await backend.submit(requests)
+    stats["batch_id"] = batch_id
+    print(f"✅ Submitted batch {batch_id} ({backend.name}) with {len(requests)} plans")
+
+    await _wait_for_batch(backend, batch_id, poll_interval)
+
+    seen = set()
+    for item in await backend.results(batch_id):
+        if item.custom_id not in requests:
+            continue
+        seen.add(item.custom_id)
+        if item.text is None:
+            stats["failed"] += 1
+            on_result(item.custom_id, create_error_response(f"Analysefehler: {item.error}"))
+            continue
+        try:
+            raw_analysis = await recover_analysis_async(item.text, plans[item.custom_id])
+            result = finalize_analysis(raw_analysis, pdf_text=plans[item.custom_id])
+            store_analysis(cache_keys[item.custom_id], plans[item.custom_id], result, BATCH_CACHE_VARIANT)
+            stats["succeeded"] += 1
+        except Exception as e:
+            result = create_error_response(f"JSON-Parsing-Fehler: {str(e)}")
+            stats["failed"] += 1
+        on_result(item.custom_id, result)
+
+    for custom_id in requests:
+        if custom_id not in seen:
+            stats["failed"] += 1
+            on_result(custom_id, create_error_response("Analysefehler: kein Ergebnis im Batch"))
+
+    return stats
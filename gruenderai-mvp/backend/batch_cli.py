@@ -0,0 +1,116 @@
+"""
+Bulk Analysis CLI für GründerAI
+Analyzes a folder or list of business plans as one batch
+
+Usage:
+    python batch_cli.py plans/*.pdf --output results/
+    python batch_cli.py plans/ --backend local --poll-interval 5
+"""
+
+import os
+import sys
+import json
+import asyncio
+import argparse
+from typing import Dict, List
+
+from extraction_pool import extraction_pool, extract_text_isolated
+from batch_analysis import run_batch_analysis, get_batch_backend, BATCH_BACKENDS, BATCH_POLL_INTERVAL_SECONDS
+
+CONTENT_TYPES = {
+    ".pdf": "application/pdf",
+    ".docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+}
+
+
+def collect_files(paths: List[str]) -> List[str]:
+    """Expand directories to the PDF/DOCX files they contain"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                if os.path.splitext(name)[1].lower() in CONTENT_TYPES:
+                    files.append(os.path.join(path, name))
+        elif os.path.splitext(path)[1].lower() in CONTENT_TYPES:
+            files.append(path)
+        else:
+            print(f"⚠️ Skipping unsupported file: {path}")
+    # The same file given twice (e.g. as file and via its directory) is analyzed once
+    return list(dict.fromkeys(os.path.normpath(path) for path in files))
+
+
+def output_names(files: List[str]) -> Dict[str, str]:
+    """
+    Result file name per input file: the file stem, with a counter appended
+    when several inputs share a stem (plans/a/plan.pdf, plans/b/plan.pdf,
+    plan.docx) so no result overwrites another
+    """
+    names: Dict[str, str] = {}
+    taken = set()
+    for path in files:
+        stem = os.path.splitext(os.path.basename(path))[0]
+        name, counter = stem, 1
+        # Compared case-insensitively - Plan.pdf and plan.pdf collide on macOS/Windows
+        while name.lower() in taken:
+            counter += 1
+            name = f"{stem}-{counter}"
+        taken.add(name.lower())
+        names[path] = f"{name}.json"
+    return names
+
+
+async def extract_file(path: str) -> str:
+    with open(path, "rb") as f:
+        content = f.read()
+    return await extract_text_isolated(content, CONTENT_TYPES[os.path.splitext(path)[1].lower()])
+
+
+async def run(args) -> int:
+    files = collect_files(args.paths)
+    if not files:
+        print("❌ No PDF/DOCX files found")
+        return 1
+
+    os.makedirs(args.output, exist_ok=True)
+    names = output_names(files)
+
+    # Extract all documents in parallel
+    texts = await asyncio.gather(*(extract_file(path) for path in files), return_exceptions=True)
+    extraction_pool.shutdown()
+    plans: Dict[str, str] = {}
+    for path, text in zip(files, texts):
+        if isinstance(text, Exception):
+            print(f"❌ {path}: extraction failed ({text})")
+        elif len(text.strip()) < 100:
+            print(f"❌ {path}: not enough readable text")
+        else:
+            plans[path] = text
+
+    if not plans:
+        return 1
+
+    def on_result(path: str, result: Dict):
+        with open(os.path.join(args.output, names[path]), "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        status = "❌" if result.get("error") else "✅"
+        print(f"{status} {path} -> {names[path]}: score {result.get('score')} ({result.get('risk_level')})")
+
+    stats = await run_batch_analysis(
+        plans, on_result, backend=get_batch_backend(args.backend), poll_interval=args.poll_interval
+    )
+    print(f"Batch finished: {json.dumps(stats)}")
+    return 0 if stats["failed"] == 0 else 2
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GründerAI bulk business plan analysis")
+    parser.add_argument("paths", nargs="+", help="PDF/DOCX files or directories")
+    parser.add_argument("--output", default="batch_results", help="Directory for the JSON results")
+    parser.add_argument("--backend", choices=list(BATCH_BACKENDS), default=None, help="Batch backend (default: BATCH_BACKEND)")
+    parser.add_argument("--poll-interval", type=float, default=BATCH_POLL_INTERVAL_SECONDS, help="Seconds between batch status checks")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
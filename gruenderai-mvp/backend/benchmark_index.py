@@ -0,0 +1,142 @@
+"""
+Benchmark Index für GründerAI
+Versioned industry benchmark table, loaded once and served from memory
+
+data/benchmarks.json holds the year-1 revenue range and its source per
+industry. Lookups accept the classifier label as well as free-form
+descriptions ("Friseursalon", "Gastronmie"):
+1. exact label / synonym (dict lookup)
+2. synonym contained in a word of the description ("Gebäudereinigung")
+3. fuzzy match of a word against labels and synonyms (typos)
+Unknown industries get the default benchmark.
+"""
+
+import os
+import re
+import json
+import difflib
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+BENCHMARKS_PATH = os.getenv(
+    "BENCHMARKS_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "benchmarks.json"),
+)
+BENCHMARK_FUZZY_CUTOFF = float(os.getenv("BENCHMARK_FUZZY_CUTOFF", "0.85"))
+
+# Synonyms shorter than this only match whole words ("it", "bar", "bau")
+MIN_SUBSTRING_SYNONYM = 5
+
+WORD = re.compile(r"[a-zäöüß0-9]+")
+
+# Used when the table cannot be loaded
+BUILTIN_DEFAULT = ("Dienstleistung", 40000, 60000, "IHK")
+
+
+class Benchmark(NamedTuple):
+    label: str
+    low: int
+    high: int
+    source: str
+
+
+class BenchmarkMatch(NamedTuple):
+    benchmark: Benchmark
+    match: str  # exact | synonym | fuzzy | default
+
+
+def normalize(text: str) -> str:
+    return " ".join(WORD.findall((text or "").lower().replace("&", " und ")))
+
+
+class BenchmarkIndex:
+    """In-memory index of the benchmark table"""
+
+    def __init__(self, entries: List[Dict], default_label: str, version: str):
+        self.version = version
+        self.benchmarks = [
+            Benchmark(entry["label"], int(entry["low"]), int(entry["high"]), entry.get("source", "IHK"))
+            for entry in entries
+        ]
+        by_label = {benchmark.label: benchmark for benchmark in self.benchmarks}
+        self.default = by_label.get(default_label) or Benchmark(*BUILTIN_DEFAULT)
+
+        # normalized label / synonym → benchmark; the first entry wins on conflicts
+        self._keys: Dict[str, Benchmark] = {}
+        for entry, benchmark in zip(entries, self.benchmarks):
+            for key in [entry["label"]] + entry.get("synonyms", []):
+                self._keys.setdefault(normalize(key), benchmark)
+        self._phrases = [(key, b) for key, b in self._keys.items() if " " in key]
+        self._substrings = [(key, b) for key, b in self._keys.items() if len(key) >= MIN_SUBSTRING_SYNONYM]
+        self._fuzzy_keys = list(self._keys)
+
+    @classmethod
+    def load(cls, path: str = BENCHMARKS_PATH) -> "BenchmarkIndex":
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data["industries"], data.get("default", BUILTIN_DEFAULT[0]), data.get("version", ""))
+
+    @classmethod
+    def builtin(cls) -> "BenchmarkIndex":
+        label, low, high, source = BUILTIN_DEFAULT
+        return cls([{"label": label, "low": low, "high": high, "source": source}], label, "builtin")
+
+    def lookup(self, industry: Optional[str]) -> BenchmarkMatch:
+        query = normalize(industry)
+        if not query:
+            return BenchmarkMatch(self.default, "default")
+
+        if query in self._keys:
+            return BenchmarkMatch(self._keys[query], "exact")
+
+        padded = f" {query} "
+        for phrase, benchmark in self._phrases:
+            if f" {phrase} " in padded:
+                return BenchmarkMatch(benchmark, "synonym")
+
+        words = query.split()
+        for word in words:
+            if word in self._keys:
+                return BenchmarkMatch(self._keys[word], "synonym")
+        for word in words:
+            for key, benchmark in self._substrings:
+                if key in word:
+                    return BenchmarkMatch(benchmark, "synonym")
+
+        for word in words:
+            close = difflib.get_close_matches(word, self._fuzzy_keys, n=1, cutoff=BENCHMARK_FUZZY_CUTOFF)
+            if close:
+                return BenchmarkMatch(self._keys[close[0]], "fuzzy")
+
+        return BenchmarkMatch(self.default, "default")
+
+    def labels(self) -> List[str]:
+        return [benchmark.label for benchmark in self.benchmarks]
+
+
+def _load_default_index() -> BenchmarkIndex:
+    try:
+        index = BenchmarkIndex.load()
+        print(f"✅ Benchmark index loaded ({len(index.benchmarks)} industries, version {index.version})")
+        return index
+    except Exception as e:
+        print(f"⚠️ Benchmark table unavailable, using built-in default: {str(e)}")
+        return BenchmarkIndex.builtin()
+
+
+# Loaded once per process
+benchmark_index = _load_default_index()
+BENCHMARK_VERSION = benchmark_index.version
+
+
+@lru_cache(maxsize=1024)
+def find_benchmark(industry: Optional[str]) -> BenchmarkMatch:
+    """Benchmark for an industry label or description (memoized)"""
+    return benchmark_index.lookup(industry)
+
+
+def default_benchmark() -> Benchmark:
+    return benchmark_index.default
@@ -0,0 +1,176 @@
+"""
+Criteria Registry für GründerAI
+The 27 BA GZ 04 criteria, compiled once and shared by analysis and PDF report
+
+BA_GZ_04_CRITERIA is the single source definition. At import it is
+compiled into immutable records with O(1) id lookup, fixed category and
+criterion order, the prompt fragments and the max_points weight vector.
+CRITERIA_VERSION together with the content fingerprint is part of every
+analysis cache key - bump it when the criteria change meaning.
+"""
+
+import json
+import hashlib
+from types import MappingProxyType
+from typing import Dict, Iterable, Mapping, NamedTuple, Optional, Tuple
+
+CRITERIA_VERSION = "ba-gz-04/2025-1"
+
+# Points assumed for ids that are not part of the registry
+UNKNOWN_MAX_POINTS = 3
+
+
+# ============================================
+# 27 BA GZ 04 KRITERIEN DEFINITION
+# ============================================
+
+BA_GZ_04_CRITERIA = {
+    "grundvoraussetzungen": {
+        "name": "Grundvoraussetzungen",
+        "criteria": [
+            {"id": "G1", "name": "Solo-Selbständigkeit", "description": "Gründung als Einzelperson", "max_points": 5},
+            {"id": "G2", "name": "Einzelunternehmen/Freiberufler", "description": "Keine Kapitalgesellschaft", "max_points": 5},
+            {"id": "G3", "name": "Keine Gesellschafter", "description": "Alleinige Inhaberschaft", "max_points": 4},
+            {"id": "G4", "name": "Keine Angestellten Jahr 1", "description": "Solo-Start ohne Personal", "max_points": 5},
+            {"id": "G5", "name": "Haupterwerb geplant", "description": "Mindestens 15 Stunden/Woche", "max_points": 4},
+            {"id": "G6", "name": "ALG-Anspruch vorhanden", "description": "Mindestens 150 Tage Restanspruch", "max_points": 3},
+        ]
+    },
+    "finanzplanung": {
+        "name": "Finanzplanung",
+        "criteria": [
+            {"id": "F1", "name": "Realistische Umsatzprognose", "description": "Jahr 1: €40-60K typisch", "max_points": 6},
+            {"id": "F2", "name": "Kostenaufstellung", "description": "Alle Betriebskosten erfasst", "max_points": 4},
+            {"id": "F3", "name": "Liquiditätsplanung", "description": "Monatliche Cashflow-Übersicht", "max_points": 4},
+            {"id": "F4", "name": "Break-Even Analyse", "description": "Gewinnschwelle definiert", "max_points": 3},
+            {"id": "F5", "name": "Kapitalbedarf", "description": "Startkapital und Reserven", "max_points": 4},
+            {"id": "F6", "name": "Privatentnahmen", "description": "Lebenshaltungskosten berücksichtigt", "max_points": 3},
+        ]
+    },
+    "marktanalyse": {
+        "name": "Marktanalyse",
+        "criteria": [
+            {"id": "M1", "name": "Zielgruppe definiert", "description": "Konkrete Kundenbeschreibung", "max_points": 4},
+            {"id": "M2", "name": "Wettbewerbsanalyse", "description": "Konkurrenten identifiziert", "max_points": 4},
+            {"id": "M3", "name": "USP formuliert", "description": "Alleinstellungsmerkmal klar", "max_points": 4},
+            {"id": "M4", "name": "Marktgröße", "description": "Realistisches Marktpotenzial", "max_points": 3},
+            {"id": "M5", "name": "Preiskalkulation", "description": "Nachvollziehbare Preise", "max_points": 3},
+        ]
+    },
+    "geschaeftsmodell": {
+        "name": "Geschäftsmodell",
+        "criteria": [
+            {"id": "B1", "name": "Leistungsbeschreibung", "description": "Klare Produkt-/Dienstleistungsdefinition", "max_points": 4},
+            {"id": "B2", "name": "Kundenakquise", "description": "Vertriebsstrategie vorhanden", "max_points": 3},
+            {"id": "B3", "name": "Marketing-Mix", "description": "Werbemaßnahmen geplant", "max_points": 3},
+            {"id": "B4", "name": "Standortwahl", "description": "Begründete Standortentscheidung", "max_points": 3},
+        ]
+    },
+    "qualifikation": {
+        "name": "Qualifikation & Erfahrung",
+        "short_name": "Qualifikation",
+        "criteria": [
+            {"id": "Q1", "name": "Fachliche Eignung", "description": "Branchenerfahrung/-ausbildung", "max_points": 4},
+            {"id": "Q2", "name": "Kaufmännische Kenntnisse", "description": "BWL-Grundlagen vorhanden", "max_points": 3},
+            {"id": "Q3", "name": "Branchenkontakte", "description": "Netzwerk für Kundengewinnung", "max_points": 3},
+        ]
+    },
+    "risikobewertung": {
+        "name": "Risikobewertung",
+        "criteria": [
+            {"id": "R1", "name": "Risiken identifiziert", "description": "Mögliche Probleme benannt", "max_points": 3},
+            {"id": "R2", "name": "Gegenmaßnahmen", "description": "Strategien zur Risikominimierung", "max_points": 3},
+            {"id": "R3", "name": "Plan B vorhanden", "description": "Alternative bei Misserfolg", "max_points": 2},
+        ]
+    }
+}
+
+
+class Criterion(NamedTuple):
+    id: str
+    name: str
+    description: str
+    max_points: int
+    category: str
+    index: int  # position in CriteriaRegistry.ids, -1 for unknown ids
+
+    def prompt_line(self) -> str:
+        return f"  - {self.id}: {self.name} ({self.description}) [Max: {self.max_points} Punkte]\n"
+
+
+class Category(NamedTuple):
+    key: str
+    name: str
+    short_name: str  # report label
+    criteria: Tuple[Criterion, ...]
+
+    @property
+    def ids(self) -> Tuple[str, ...]:
+        return tuple(c.id for c in self.criteria)
+
+    @property
+    def max_points(self) -> int:
+        return sum(c.max_points for c in self.criteria)
+
+
+class CriteriaRegistry:
+    """Compiled, read-only view of a criteria definition"""
+
+    __slots__ = (
+        "version", "fingerprint", "categories", "criteria", "ids", "max_points",
+        "total_points", "_by_id", "_by_category", "_prompts", "_full_prompt",
+    )
+
+    def __init__(self, definition: Dict, version: str):
+        categories = []
+        criteria = []
+        for cat_key, category in definition.items():
+            records = []
+            for c in category["criteria"]:
+                record = Criterion(c["id"], c["name"], c["description"], int(c["max_points"]), cat_key, len(criteria))
+                records.append(record)
+                criteria.append(record)
+            categories.append(Category(cat_key, category["name"], category.get("short_name", category["name"]), tuple(records)))
+
+        self.version = version
+        self.fingerprint = hashlib.sha256(
+            (version + json.dumps(definition, sort_keys=True, ensure_ascii=False)).encode("utf-8")
+        ).hexdigest()[:12]
+        self.categories: Tuple[Category, ...] = tuple(categories)
+        self.criteria: Tuple[Criterion, ...] = tuple(criteria)
+        self.ids: Tuple[str, ...] = tuple(c.id for c in criteria)
+        self.max_points: Tuple[int, ...] = tuple(c.max_points for c in criteria)
+        self.total_points = sum(self.max_points)
+        self._by_id: Mapping[str, Criterion] = MappingProxyType({c.id: c for c in criteria})
+        self._by_category: Mapping[str, Category] = MappingProxyType({c.key: c for c in categories})
+        self._prompts: Mapping[str, str] = MappingProxyType({
+            c.key: f"\n{c.name}:\n" + "".join(criterion.prompt_line() for criterion in c.criteria)
+            for c in categories
+        })
+        self._full_prompt = "".join(self._prompts.values())
+
+    def __contains__(self, criterion_id: str) -> bool:
+        return criterion_id in self._by_id
+
+    def get(self, criterion_id: str) -> Criterion:
+        """Criterion by id; unknown ids get a placeholder record"""
+        criterion = self._by_id.get(criterion_id)
+        if criterion is None:
+            return Criterion(criterion_id, criterion_id, "", UNKNOWN_MAX_POINTS, "", -1)
+        return criterion
+
+    def category(self, cat_key: str) -> Category:
+        return self._by_category[cat_key]
+
+    @property
+    def category_keys(self) -> Tuple[str, ...]:
+        return tuple(self._by_category)
+
+    def prompt_fragment(self, category_keys: Optional[Iterable[str]] = None) -> str:
+        """Criteria list for the prompt (all categories or the given ones, in registry order)"""
+        if category_keys is None:
+            return self._full_prompt
+        return "".join(self._prompts[key] for key in category_keys)
+
+# Compiled once per process
+criteria_registry = CriteriaRegistry(BA_GZ_04_CRITERIA, CRITERIA_VERSION)
@@ -0,0 +1,253 @@
+"""
+Extraction Pool für GründerAI
+PDF/DOCX text extraction in isolated, pre-warmed worker processes
+
+PyPDF2 and python-docx are pure-Python parsers: a pathological PDF (huge
+object streams, deep nesting) or a DOCX zip bomb pins a CPU and grows
+memory without bound. Run in a thread, that takes the whole API worker
+with it. Here every extraction runs in a process pool:
+- workers are started at startup (forkserver, parsers imported) and
+  spread extraction over EXTRACTION_WORKERS cores
+- each job has a wall-clock timeout (EXTRACTION_TIMEOUT_SECONDS), enforced
+  in the worker by a timer signal (not on Windows) and in the API by a
+  hard deadline that kills and replaces the workers
+- each worker's address space is capped at its size after start-up plus
+  EXTRACTION_MEMORY_LIMIT_MB (RLIMIT_AS), so a bomb ends in MemoryError
+- timeouts, memory errors and crashed workers surface as
+  ExtractionRejectedError; the event loop only awaits a future
+"""
+
+import os
+import time
+import signal
+import asyncio
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Optional
+from dotenv import load_dotenv
+
+from pdf_processor import extract_text_from_file, extract_text_from_file_async
+
+try:
+    import resource
+except ImportError:  # not available on Windows - no memory cap there
+    resource = None
+
+# No SIGALRM on Windows - there only the API's hard deadline (pool
+# replacement) bounds a job
+HAS_ALARM = hasattr(signal, "SIGALRM")
+
+load_dotenv()
+
+EXTRACTION_POOL_ENABLED = os.getenv("EXTRACTION_POOL_ENABLED", "true").lower() == "true"
+EXTRACTION_WORKERS = int(os.getenv("EXTRACTION_WORKERS", str(min(os.cpu_count() or 1, 4))))
+EXTRACTION_TIMEOUT_SECONDS = float(os.getenv("EXTRACTION_TIMEOUT_SECONDS", "20"))
+EXTRACTION_MEMORY_LIMIT_MB = int(os.getenv("EXTRACTION_MEMORY_LIMIT_MB", "512"))
+
+# Extra time before the API gives up on a worker that ignores its timer
+# (stuck in C code) and replaces the pool
+HARD_DEADLINE_GRACE_SECONDS = 5.0
+
+
+class ExtractionRejectedError(Exception):
+    """Document could not be extracted within the time or memory limits"""
+
+
+class ExtractionTimeoutError(ExtractionRejectedError):
+    pass
+
+
+class ExtractionMemoryError(ExtractionRejectedError):
+    pass
+
+
+TIMEOUT_MESSAGE = "Document took too long to process. Please upload a simpler PDF or DOCX."
+MEMORY_MESSAGE = "Document is too complex to process. Please upload a simpler PDF or DOCX."
+CRASH_MESSAGE = "Document could not be processed."
+
+
+def _address_space_bytes() -> Optional[int]:
+    """Current virtual memory size of this process (Linux), None if unknown"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _init_worker(memory_limit_mb: int):
+    """Worker start-up: cap the address space above what the worker already maps"""
+    if resource is None or memory_limit_mb <= 0:
+        return
+    baseline = _address_space_bytes() or 0
+    limit = baseline + memory_limit_mb * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def _ping() -> int:
+    # Busy long enough that every ping of start() gets its own worker
+    time.sleep(0.2)
+    return os.getpid()
+
+
+def _on_alarm(signum, frame):
+    raise TimeoutError("extraction timer expired")
+
+
+def _caused_by(error: BaseException, error_type) -> bool:
+    """pdf_processor re-raises parser errors as plain Exception - look at the chain"""
+    while error is not None:
+        if isinstance(error, error_type):
+            return True
+        error = error.__cause__ or error.__context__
+    return False
+
+
+def _run_extraction(content: bytes, content_type: str, full: bool, timeout: float) -> str:
+    """Worker side of one job: extraction under a wall-clock timer"""
+    if HAS_ALARM:
+        signal.signal(signal.SIGALRM, _on_alarm)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return extract_text_from_file(content, content_type, full)
+    except Exception as e:
+        if _caused_by(e, TimeoutError):
+            raise ExtractionTimeoutError(TIMEOUT_MESSAGE)
+        if _caused_by(e, MemoryError):
+            raise ExtractionMemoryError(MEMORY_MESSAGE)
+        raise
+    finally:
+        if HAS_ALARM:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+def _start_method() -> str:
+    # forkserver: workers are forked from a small single-threaded server,
+    # not from the API process with its event loop and client threads
+    return "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+
+class ExtractionPool:
+    """Process pool with per-job timeout and memory cap; replaced when a worker hangs or dies"""
+
+    def __init__(self, workers: int, timeout: float, memory_limit_mb: int):
+        self.workers = max(workers, 1)
+        self.timeout = timeout
+        self.memory_limit_mb = memory_limit_mb
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._generation = 0
+        self._lock = threading.Lock()
+        # Jobs are only handed over when a worker is free, so the hard
+        # deadline measures extraction time and not time spent queueing
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._stats = {"jobs": 0, "failed": 0, "timeouts": 0, "memory_errors": 0, "crashes": 0, "restarts": 0}
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        context = multiprocessing.get_context(_start_method())
+        if context.get_start_method() == "forkserver":
+            context.set_forkserver_preload(["extraction_pool"])
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(self.memory_limit_mb,),
+        )
+
+    def _current(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = self._new_executor()
+            return self._executor, self._generation
+
+    def start(self):
+        """Start all workers and wait until they accept jobs (blocking)"""
+        executor, _ = self._current()
+        pids = {future.result() for future in [executor.submit(_ping) for _ in range(self.workers)]}
+        print(f"✅ Extraction pool ready ({len(pids)} workers, {_start_method()})")
+
+    def _replace(self, generation: int):
+        """Kill the workers of a hung or broken pool and start a fresh one"""
+        with self._lock:
+            if generation != self._generation or self._executor is None:
+                return
+            executor = self._executor
+            self._executor = None
+            self._generation += 1
+            self._stats["restarts"] += 1
+        for process in list((getattr(executor, "_processes", None) or {}).values()):
+            process.kill()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    async def extract(self, content: bytes, content_type: str, full: bool = False) -> str:
+        """Extract text in a worker process. Raises ExtractionRejectedError on limits."""
+        self._stats["jobs"] += 1
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.workers)
+        async with self._slots:
+            return await self._extract(content, content_type, full)
+
+    async def _extract(self, content: bytes, content_type: str, full: bool) -> str:
+        loop = asyncio.get_running_loop()
+        for attempt in range(2):
+            executor, generation = self._current()
+            future = loop.run_in_executor(executor, _run_extraction, content, content_type, full, self.timeout)
+            try:
+                return await asyncio.wait_for(future, self.timeout + HARD_DEADLINE_GRACE_SECONDS)
+            except asyncio.TimeoutError:
+                self._stats["timeouts"] += 1
+                self._stats["failed"] += 1
+                self._replace(generation)
+                raise ExtractionTimeoutError(TIMEOUT_MESSAGE)
+            except ExtractionTimeoutError:
+                self._stats["timeouts"] += 1
+                self._stats["failed"] += 1
+                raise
+            except ExtractionMemoryError:
+                self._stats["memory_errors"] += 1
+                self._stats["failed"] += 1
+                raise
+            except BrokenProcessPool:
+                self._replace(generation)
+                # The pool may have been broken by another job - one retry on the fresh pool
+                if attempt == 0:
+                    continue
+                self._stats["crashes"] += 1
+                self._stats["failed"] += 1
+                raise ExtractionRejectedError(CRASH_MESSAGE)
+
+    def shutdown(self):
+        with self._lock:
+            executor = self._executor
+            self._executor = None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> Dict:
+        return {
+            "enabled": EXTRACTION_POOL_ENABLED,
+            "workers": self.workers,
+            "running": self._executor is not None,
+            "timeout_seconds": self.timeout,
+            "memory_limit_mb": self.memory_limit_mb,
+            **self._stats,
+        }
+
+
+extraction_pool = ExtractionPool(EXTRACTION_WORKERS, EXTRACTION_TIMEOUT_SECONDS, EXTRACTION_MEMORY_LIMIT_MB)
+
+
+async def extract_text_isolated(content: bytes, content_type: str, full: bool = False) -> str:
+    """
+    Extract text from file bytes in the worker pool
+    (in a thread when EXTRACTION_POOL_ENABLED=false)
+    """
+    if not EXTRACTION_POOL_ENABLED:
+        return await extract_text_from_file_async(content, content_type, full)
+    return await extraction_pool.extract(content, content_type, full)
+
+
+def get_extraction_stats() -> Dict:
+    """Extraction pool statistics for /health"""
+    return extraction_pool.stats()
@@ -8,121 +8,188 @@ NEW FEATURES:
 - Time and impact estimates per fix
 - Personalized summary with business name
 - Copy-paste texts for all warnings/errors
+- Content-addressed analysis cache (repeat uploads cost no tokens)
+- Static prompt prefix with provider-side prompt caching
+- Token-budget-aware section selection of the plan text
+- Optional concurrent per-category fan-out (ANALYSIS_MODE=fanout)
+- Optional two-phase analysis: scoring at upload, copy-paste texts after payment
+- Truncation-tolerant JSON recovery with targeted continuation calls
+- Local K.O.-criteria pre-screen (G1-G4) before the Claude call
+- Local revenue extraction and plausibility check (revenue_comparison, F1)
+- Local industry classifier (detected_industry is given to Claude, not generated)
+- Versioned industry benchmark index (benchmarks are given, not generated)
+- Near-duplicate detection (MinHash/LSH): seed from similar plans
+- Incremental re-analysis of revised plans (only changed sections re-evaluated)
+- Potential score from fix impact_points (local what-if score simulator)
 """
 
 import os
 import json
-from typing import Dict, List, Optional
-from anthropic import Anthropic
-
-
-# ============================================
-# 27 BA GZ 04 KRITERIEN DEFINITION
-# ============================================
-
-BA_GZ_04_CRITERIA = {
-    "grundvoraussetzungen": {
-        "name": "Grundvoraussetzungen",
-        "criteria": [
-            {"id": "G1", "name": "Solo-Selbständigkeit", "description": "Gründung als Einzelperson", "max_points": 5},
-            {"id": "G2", "name": "Einzelunternehmen/Freiberufler", "description": "Keine Kapitalgesellschaft", "max_points": 5},
-            {"id": "G3", "name": "Keine Gesellschafter", "description": "Alleinige Inhaberschaft", "max_points": 4},
-            {"id": "G4", "name": "Keine Angestellten Jahr 1", "description": "Solo-Start ohne Personal", "max_points": 5},
-            {"id": "G5", "name": "Haupterwerb geplant", "description": "Mindestens 15 Stunden/Woche", "max_points": 4},
-            {"id": "G6", "name": "ALG-Anspruch vorhanden", "description": "Mindestens 150 Tage Restanspruch", "max_points": 3},
-        ]
-    },
-    "finanzplanung": {
-        "name": "Finanzplanung",
-        "criteria": [
-            {"id": "F1", "name": "Realistische Umsatzprognose", "description": "Jahr 1: €40-60K typisch", "max_points": 6},
-            {"id": "F2", "name": "Kostenaufstellung", "description": "Alle Betriebskosten erfasst", "max_points": 4},
-            {"id": "F3", "name": "Liquiditätsplanung", "description": "Monatliche Cashflow-Übersicht", "max_points": 4},
-            {"id": "F4", "name": "Break-Even Analyse", "description": "Gewinnschwelle definiert", "max_points": 3},
-            {"id": "F5", "name": "Kapitalbedarf", "description": "Startkapital und Reserven", "max_points": 4},
-            {"id": "F6", "name": "Privatentnahmen", "description": "Lebenshaltungskosten berücksichtigt", "max_points": 3},
-        ]
-    },
-    "marktanalyse": {
-        "name": "Marktanalyse",
-        "criteria": [
-            {"id": "M1", "name": "Zielgruppe definiert", "description": "Konkrete Kundenbeschreibung", "max_points": 4},
-            {"id": "M2", "name": "Wettbewerbsanalyse", "description": "Konkurrenten identifiziert", "max_points": 4},
-            {"id": "M3", "name": "USP formuliert", "description": "Alleinstellungsmerkmal klar", "max_points": 4},
-            {"id": "M4", "name": "Marktgröße", "description": "Realistisches Marktpotenzial", "max_points": 3},
-            {"id": "M5", "name": "Preiskalkulation", "description": "Nachvollziehbare Preise", "max_points": 3},
-        ]
-    },
-    "geschaeftsmodell": {
-        "name": "Geschäftsmodell",
-        "criteria": [
-            {"id": "B1", "name": "Leistungsbeschreibung", "description": "Klare Produkt-/Dienstleistungsdefinition", "max_points": 4},
-            {"id": "B2", "name": "Kundenakquise", "description": "Vertriebsstrategie vorhanden", "max_points": 3},
-            {"id": "B3", "name": "Marketing-Mix", "description": "Werbemaßnahmen geplant", "max_points": 3},
-            {"id": "B4", "name": "Standortwahl", "description": "Begründete Standortentscheidung", "max_points": 3},
-        ]
-    },
-    "qualifikation": {
-        "name": "Qualifikation & Erfahrung",
-        "criteria": [
-            {"id": "Q1", "name": "Fachliche Eignung", "description": "Branchenerfahrung/-ausbildung", "max_points": 4},
-            {"id": "Q2", "name": "Kaufmännische Kenntnisse", "description": "BWL-Grundlagen vorhanden", "max_points": 3},
-            {"id": "Q3", "name": "Branchenkontakte", "description": "Netzwerk für Kundengewinnung", "max_points": 3},
-        ]
-    },
-    "risikobewertung": {
-        "name": "Risikobewertung",
-        "criteria": [
-            {"id": "R1", "name": "Risiken identifiziert", "description": "Mögliche Probleme benannt", "max_points": 3},
-            {"id": "R2", "name": "Gegenmaßnahmen", "description": "Strategien zur Risikominimierung", "max_points": 3},
-            {"id": "R3", "name": "Plan B vorhanden", "description": "Alternative bei Misserfolg", "max_points": 2},
-        ]
-    }
-}
+import time
+import asyncio
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from anthropic import Anthropic, AsyncAnthropic
+from dotenv import load_dotenv
+
+from analysis_cache import analysis_cache, make_cache_key
+from llm_client import get_shared_client, get_shared_async_client, record_usage
+from llm_resilience import (
+    call_with_resilience, call_with_resilience_async, claude_breaker, is_retryable, CircuitOpenError
+)
+from incremental_json import IncrementalJSONParser, salvage_json_object
+from section_selector import select_plan_text, ANALYSIS_TOKEN_BUDGET
+from ko_prescreen import (
+    KO_PRESCREEN_MODE, KO_SCORE_CAP, KO_CRITERIA, PrescreenResult,
+    prescreen_text, build_prescreen_context, build_ko_issue, build_ko_fix, build_ko_verdict
+)
+from revenue_engine import (
+    assess_revenue, revenue_f1_status, format_euro, parse_benchmark_range,
+    format_benchmark_range, default_benchmark_range
+)
+from benchmark_index import find_benchmark, BENCHMARK_VERSION
+from criteria_registry import criteria_registry, Criterion, BA_GZ_04_CRITERIA
+from near_duplicate import similarity_index, SimilarityMatch
+from plan_diff import PlanDiff, diff_plan_sections
+from score_simulator import ScoreModel, STATUS_WEIGHTS, risk_level_for_score
+from model_cascade import (
+    MODEL_CASCADE_ENABLED, CASCADE_FAST_MODEL, CascadeDecision, decide_escalation, cascade_stats
+)
+from industry_classifier import classify_industry, INDUSTRY_MODEL_VERSION
+
+load_dotenv()
+
+
+# Claude model settings for the analysis call
+ANALYSIS_MODEL = "claude-sonnet-4-20250514"
+ANALYSIS_MAX_TOKENS = 8000
+ANALYSIS_TEMPERATURE = 0.3
+
+# "single": one call for the whole analysis
+# "fanout": concurrent calls per criteria category + summary call
+ANALYSIS_MODE = os.getenv("ANALYSIS_MODE", "single")
+
+# Cache variants: label of the analysis that actually produced a result
+SINGLE_CACHE_VARIANT = "single"  # one analysis-model call (stream, batch)
+# create_analysis: fast model first when the cascade is on
+ROUTED_CACHE_VARIANT = "single+cascade" if MODEL_CASCADE_ENABLED else SINGLE_CACHE_VARIANT
+FANOUT_CACHE_VARIANT = "fanout"
+SCORING_CACHE_VARIANT = "scoring"  # two-phase: phase 1
+COMPLETE_CACHE_VARIANT = "complete"  # two-phase: phase 1 + generated texts
+# What analyze_business_plan_async produces under the configured ANALYSIS_MODE
+FULL_CACHE_VARIANT = FANOUT_CACHE_VARIANT if ANALYSIS_MODE == "fanout" else ROUTED_CACHE_VARIANT
+# Incremental re-analysis: carried-over parts of a previous analysis, never a full analysis
+REANALYSIS_CACHE_VARIANT = "reanalysis"
+FANOUT_CATEGORY_MAX_TOKENS = 2000
+FANOUT_SUMMARY_MAX_TOKENS = 3000
+
+# Truncated answers: salvage complete fields, re-request only missing parts
+CONTINUATION_MAX_TOKENS = 4000
+REQUIRED_ANALYSIS_KEYS = [
+    "score", "risk_level", "business_name", "positive_aspects",
+    "issues", "criteria_checklist", "criteria_fixes", "personalized_summary",
+]
+
+# Two-phase analysis: cheap scoring at upload, copy-paste texts after payment
+ANALYSIS_TWO_PHASE = os.getenv("ANALYSIS_TWO_PHASE", "false").lower() == "true"
+SCORING_MAX_TOKENS = 2500
+GENERATION_MAX_TOKENS = 6000
+
+# Re-analysis of a revised plan: only criteria of changed sections are re-evaluated.
+# More changes than this fall back to a full analysis.
+REANALYSIS_MAX_CATEGORIES = int(os.getenv("REANALYSIS_MAX_CATEGORIES", "3"))
+REANALYSIS_MAX_CHANGED_RATIO = float(os.getenv("REANALYSIS_MAX_CHANGED_RATIO", "0.5"))
+REANALYSIS_MAX_TOKENS = 3000
+
+# Bump whenever the analysis prompt or response mapping changes,
+# so cached analyses from older prompts are not served anymore
+PROMPT_VERSION = "v4.8"
+
+# Fields sent to streaming clients as soon as they are complete
+STREAM_EVENT_FIELDS = ["score", "risk_level", "business_name", "detected_industry", "positive_aspects"]
+
+# Changes with CRITERIA_VERSION and with every edit of the criteria definition
+CRITERIA_FINGERPRINT = criteria_registry.fingerprint
+
+
+
+def get_analysis_version(variant: str) -> str:
+    """Criteria/prompt version of an analysis variant (one of the *_CACHE_VARIANT labels)"""
+    return (
+        f"{PROMPT_VERSION}:{CRITERIA_FINGERPRINT}:{ANALYSIS_TOKEN_BUDGET}:{KO_PRESCREEN_MODE}:"
+        f"{INDUSTRY_MODEL_VERSION}:{BENCHMARK_VERSION}:{variant}"
+    )
+
+
+def get_analysis_cache_key(pdf_text: str, variant: str) -> str:
+    """Cache key for a plan text under the current criteria/prompt version"""
+    return make_cache_key(pdf_text, get_analysis_version(variant))
 
 
-def get_anthropic_client():
-    """Get Anthropic client instance"""
-    api_key = os.getenv("ANTHROPIC_API_KEY")
-    if not api_key:
-        raise ValueError("ANTHROPIC_API_KEY environment variable not set")
-    return Anthropic(api_key=api_key)
+def get_cache_stats() -> Dict:
+    """Hit/miss statistics of the analysis cache"""
+    return analysis_cache.stats()
+
+
+def get_near_duplicate_stats() -> Dict:
+    """Lookup/seed statistics of the near-duplicate index"""
+    return similarity_index.stats()
+
+
+def get_anthropic_client() -> Anthropic:
+    """Get the process-wide pooled Anthropic client"""
+    return get_shared_client()
+
+
+def get_async_anthropic_client() -> AsyncAnthropic:
+    """Get the process-wide pooled async Anthropic client"""
+    return get_shared_async_client()
+
+
+def create_message(client: Anthropic, request: Dict, call_type: str = "full"):
+    """messages.create with deadline, retries and circuit breaker"""
+    response = call_with_resilience(
+        lambda timeout: client.messages.create(**request, timeout=timeout), call_type
+    )
+    record_usage(response.usage)
+    return response
+
+
+async def create_message_async(client: AsyncAnthropic, request: Dict, call_type: str = "full"):
+    """
+    Async messages.create with deadline, retries, hedging and circuit breaker
+    (call_type: latency window for hedging, e.g. fast, fanout, full)
+    """
+    response = await call_with_resilience_async(
+        lambda timeout: client.messages.create(**request, timeout=timeout), call_type
+    )
+    record_usage(response.usage)
+    return response
 
 
 def get_all_criteria_ids() -> List[str]:
     """Get flat list of all criteria IDs"""
-    ids = []
-    for category in BA_GZ_04_CRITERIA.values():
-        for criterion in category["criteria"]:
-            ids.append(criterion["id"])
-    return ids
+    return list(criteria_registry.ids)
 
 
-def get_criterion_info(criterion_id: str) -> Dict:
-    """Get criterion info by ID"""
-    for category in BA_GZ_04_CRITERIA.values():
-        for criterion in category["criteria"]:
-            if criterion["id"] == criterion_id:
-                return criterion
-    return {"id": criterion_id, "name": criterion_id, "max_points": 3}
+def get_criterion_info(criterion_id: str) -> Criterion:
+    """Get criterion record by ID (O(1) registry lookup)"""
+    return criteria_registry.get(criterion_id)
 
 
 def calculate_potential_score(current_score: int, checklist: Dict, fixes: Dict) -> int:
-    """Calculate potential score after applying all fixes"""
-    # Count fixable issues
-    fixable_points = 0
-    for cid, status in checklist.items():
-        if status.upper() in ["WARNUNG", "FEHLER"] and cid in fixes:
-            criterion = get_criterion_info(cid)
-            # Estimate recoverable points (70-90% of max for that criterion)
-            max_pts = criterion.get("max_points", 3)
-            if status.upper() == "FEHLER":
-                fixable_points += int(max_pts * 0.85)
-            else:  # WARNUNG
-                fixable_points += int(max_pts * 0.5)
-    
-    potential = min(current_score + fixable_points, 95)  # Cap at 95
-    return potential
+    """Potential score after applying all fixes (gains from the fixes' impact_points)"""
+    return ScoreModel(current_score, checklist, fixes).potential()
+
+
+def checklist_score_delta(old_checklist: Dict, new_checklist: Dict) -> float:
+    """Score change (0-100 scale) implied by changed checklist entries"""
+    delta = 0.0
+    for cid, status in new_checklist.items():
+        old_status = old_checklist.get(cid, "NICHT_GEFUNDEN")
+        if status != old_status:
+            weight = STATUS_WEIGHTS.get(str(status).upper(), 0.0) - STATUS_WEIGHTS.get(str(old_status).upper(), 0.0)
+            delta += weight * get_criterion_info(cid).max_points
+    return delta * 100 / criteria_registry.total_points
 
 
 def calculate_total_time(fixes: Dict, issues: List[Dict]) -> int:
@@ -138,32 +205,20 @@ def calculate_total_time(fixes: Dict, issues: List[Dict]) -> int:
 def map_analysis_for_pdf(raw_analysis: Dict) -> Dict:
     """Map Claude's analysis response to PDF generator format"""
     
-    # Extract revenue data
-    revenue_comparison = raw_analysis.get("revenue_comparison", {})
-    plan_revenue = revenue_comparison.get("plan", "N/A")
-    benchmark = revenue_comparison.get("ihk_benchmark", "N/A")
+    # Revenue data (computed locally by the revenue engine)
+    revenue_comparison = raw_analysis.get("revenue_comparison") or {}
+    plan_revenue = revenue_comparison.get("plan")
     
-    # Format revenue strings
     if isinstance(plan_revenue, (int, float)):
-        estimated_revenue = f"€{plan_revenue:,.0f}".replace(",", ".")
+        estimated_revenue = format_euro(plan_revenue)
     else:
         estimated_revenue = str(plan_revenue) if plan_revenue else "N/A"
     
-    if isinstance(benchmark, (int, float)):
-        benchmark_revenue = f"€{benchmark:,.0f}".replace(",", ".")
-    elif isinstance(benchmark, str) and benchmark:
-        if "-" in benchmark:
-            parts = benchmark.replace(".", "").split("-")
-            try:
-                low = int(parts[0])
-                high = int(parts[1])
-                benchmark_revenue = f"€{low:,.0f} - €{high:,.0f}".replace(",", ".")
-            except (ValueError, IndexError):
-                benchmark_revenue = benchmark
-        else:
-            benchmark_revenue = benchmark
+    benchmark_range = parse_benchmark_range(revenue_comparison.get("ihk_benchmark"))
+    if benchmark_range is None:
+        benchmark_revenue = default_benchmark_range()
     else:
-        benchmark_revenue = "€40.000 - €60.000"
+        benchmark_revenue = format_benchmark_range(*benchmark_range)
     
     # Calculate potential score
     checklist = raw_analysis.get("criteria_checklist", {})
@@ -202,27 +257,40 @@ def map_analysis_for_pdf(raw_analysis: Dict) -> Dict:
     return mapped_result
 
 
-def analyze_business_plan(pdf_text: str, metadata: Optional[Dict] = None) -> Dict:
+# Paid part of an analysis (generation phase): served only after payment
+PAID_ISSUE_FIELDS = ("fix", "copy_paste_text", "why_it_works")
+
+
+def strip_paid_fields(result: Dict) -> Dict:
+    """Free part of a mapped result: no criteria fixes and no fix texts in the issues"""
+    free = {**result, "criteria_fixes": {}}
+    free["top_issues"] = [
+        {k: v for k, v in issue.items() if k not in PAID_ISSUE_FIELDS} if isinstance(issue, dict) else issue
+        for issue in result.get("top_issues", [])
+    ]
+    return free
+
+
+def as_scoring_result(result: Dict) -> Dict:
+    """A complete result reduced to its scoring phase (free part, generation runs again after payment)"""
+    return {**strip_paid_fields(result), "analysis_phase": "scoring"}
+
+
+def build_criteria_prompt(category_keys=None) -> str:
+    """Build criteria list for prompt (precomputed by the registry)"""
+    return criteria_registry.prompt_fragment(category_keys)
+
+
+def build_analysis_instructions() -> str:
     """
-    Analyze business plan with SOTA features:
-    - Positive aspects detection
-    - Potential score calculation
-    - Time and impact estimates
-    - Personalized summary
+    Build the static part of the analysis prompt (tasks, 27 criteria,
+    JSON example, rules). Identical for every plan, so it is computed once
+    at import and sent as cacheable system prompt prefix.
     """
-    client = get_anthropic_client()
-    
-    # Build criteria list for prompt
-    criteria_prompt = ""
-    for cat_key, category in BA_GZ_04_CRITERIA.items():
-        criteria_prompt += f"\n{category['name']}:\n"
-        for c in category["criteria"]:
-            criteria_prompt += f"  - {c['id']}: {c['name']} ({c['description']}) [Max: {c['max_points']} Punkte]\n"
+    criteria_prompt = build_criteria_prompt()
     
-    analysis_prompt = f"""Analysiere diesen deutschen Business Plan für Gründungszuschuss-Bewilligung.
-
-BUSINESS PLAN TEXT:
-{pdf_text[:8000]}
+    return f"""Du analysierst deutsche Business Pläne für die Gründungszuschuss-Bewilligung (BA GZ 04).
+Der Business Plan Text folgt in der Nachricht des Users.
 
 ═══════════════════════════════════════════════════════════════
 WICHTIG: ANTWORTE NUR AUF DEUTSCH! KEINE ENGLISCHEN BEGRIFFE!
@@ -230,8 +298,10 @@ WICHTIG: ANTWORTE NUR AUF DEUTSCH! KEINE ENGLISCHEN BEGRIFFE!
 
 ANALYSE-AUFGABEN:
 
-1. BUSINESS NAME & BRANCHE ERKENNEN:
-   Extrahiere den Firmennamen/Projektnamen und die Branche aus dem Text.
+1. BUSINESS NAME ERKENNEN:
+   Extrahiere den Firmennamen/Projektnamen aus dem Text.
+   Branche und Umsatz-Richtwert sind vorgegeben (in der Nachricht des Users).
+   Nutze für Umsatzvergleiche NUR diesen Richtwert, erfinde keine Branchenkennzahlen.
 
 2. POSITIVE ASPEKTE IDENTIFIZIEREN ("Was bereits gut ist"):
    Liste 3-5 Dinge auf, die der Business Plan bereits gut macht.
@@ -272,7 +342,6 @@ ANTWORT ALS JSON:
 {{
   "score": 42,
   "risk_level": "KRITISCH",
-  "detected_industry": "Lebensmitteleinzelhandel",
   "business_name": "Foodlocal Market",
   "positive_aspects": [
     "Geschäftsidee klar und verständlich beschrieben",
@@ -365,11 +434,6 @@ ANTWORT ALS JSON:
       "why_it_works": "IHK-Referenz zeigt fundierte Recherche und Realismus."
     }}
   }},
-  "revenue_comparison": {{
-    "plan": 589281,
-    "ihk_benchmark": "120000-180000",
-    "deviation_percent": 227
-  }},
   "personalized_summary": "Dein Business Plan für den Foodlocal Market zeigt eine durchdachte Geschäftsidee mit echtem Marktpotenzial im regionalen Lebensmittelhandel. Die klare Zielgruppendefinition und deine Branchenerfahrung sind starke Pluspunkte. Allerdings verhindern drei kritische Punkte aktuell die Genehmigung: geplante Angestellte (K.O.-Kriterium), unrealistischer Umsatz und fehlende Kapitalbedarfsplanung. Die gute Nachricht: Mit den 13 Kopiervorlagen in diesem Report kannst du deinen Score von 42 auf geschätzte 78+ Punkte steigern - in etwa 3 Stunden Arbeit."
 }}
 
@@ -385,71 +449,888 @@ WICHTIGE REGELN:
 
 ANTWORTE NUR MIT VALIDEM JSON."""
 
+
+# Static prompt prefix, built once per process
+ANALYSIS_INSTRUCTIONS = build_analysis_instructions()
+
+
+def build_plan_message(pdf_text: str) -> str:
+    """Build the dynamic part of the prompt (the business plan itself)"""
+    industry = classify_industry(pdf_text).label
+    benchmark = find_benchmark(industry).benchmark
+    message = f"""Analysiere diesen deutschen Business Plan für Gründungszuschuss-Bewilligung.
+
+BRANCHE (vorgegeben): {industry}
+UMSATZ-RICHTWERT JAHR 1 (vorgegeben, {benchmark.source}): {format_benchmark_range(benchmark.low, benchmark.high)}
+
+BUSINESS PLAN TEXT:
+{select_plan_text(pdf_text, ANALYSIS_TOKEN_BUDGET)}"""
+    
+    # Locally decided K.O. criteria are skipped, pattern hits passed as hints
+    if KO_PRESCREEN_MODE != "off":
+        prescreen_context = build_prescreen_context(prescreen_text(pdf_text))
+        if prescreen_context:
+            message += f"\n\n{prescreen_context}"
+    
+    return message + "\n\nANTWORTE NUR MIT VALIDEM JSON."
+
+
+def build_analysis_request(
+    pdf_text: str, context: str = "", max_tokens: int = ANALYSIS_MAX_TOKENS, model: str = ANALYSIS_MODEL
+) -> Dict:
+    """
+    Keyword arguments for the Claude messages API call.
+    The static instructions are marked for provider-side prompt caching,
+    only the plan message changes between calls.
+    `context` is appended to the plan message (e.g. for continuations).
+    """
+    content = build_plan_message(pdf_text)
+    if context:
+        content += f"\n\n{context}"
+    
+    return {
+        "model": model,
+        "max_tokens": max_tokens,
+        "temperature": ANALYSIS_TEMPERATURE,
+        "system": [
+            {
+                "type": "text",
+                "text": ANALYSIS_INSTRUCTIONS,
+                "cache_control": {"type": "ephemeral"}
+            }
+        ],
+        "messages": [
+            {
+                "role": "user",
+                "content": content
+            }
+        ],
+    }
+
+
+def build_category_instructions(cat_key: str) -> str:
+    """Static prompt for the fan-out call of one criteria category"""
+    category = criteria_registry.category(cat_key)
+    example_id = category.criteria[0].id
+    
+    return f"""Du prüfst deutsche Business Pläne für die Gründungszuschuss-Bewilligung (BA GZ 04).
+Der Business Plan Text folgt in der Nachricht des Users.
+
+WICHTIG: ANTWORTE NUR AUF DEUTSCH! KEINE ENGLISCHEN BEGRIFFE!
+
+AUFGABE:
+Bewerte NUR die Kriterien der Kategorie "{category.name}":
+{build_criteria_prompt([cat_key])}
+Bewertung je Kriterium: "OK", "WARNUNG", "FEHLER", "NICHT_GEFUNDEN"
+
+Für jedes Kriterium mit WARNUNG oder FEHLER erstelle eine Kopiervorlage:
+- problem: Kurze Problembeschreibung
+- copy_paste_text: Fertiger Text (2-3 Sätze), den der Gründer übernehmen kann
+- time_minutes: Geschätzte Zeit zur Behebung (5-30 Minuten)
+- impact_points: Punkteverbesserung (höchstens die Max-Punkte des Kriteriums)
+- why_it_works: Warum diese Formulierung bei Prüfern funktioniert (1 Satz)
+
+ANTWORT ALS JSON:
+{{
+  "criteria_checklist": {{"{example_id}": "FEHLER"}},
+  "criteria_fixes": {{
+    "{example_id}": {{
+      "problem": "...",
+      "copy_paste_text": "...",
+      "time_minutes": 10,
+      "impact_points": 4,
+      "why_it_works": "..."
+    }}
+  }}
+}}
+
+ANTWORTE NUR MIT VALIDEM JSON."""
+
+
+def build_summary_instructions() -> str:
+    """Static prompt for the fan-out call that produces score, issues and summary"""
+    return f"""Du analysierst deutsche Business Pläne für die Gründungszuschuss-Bewilligung (BA GZ 04).
+Der Business Plan Text folgt in der Nachricht des Users.
+
+WICHTIG: ANTWORTE NUR AUF DEUTSCH! KEINE ENGLISCHEN BEGRIFFE!
+
+Die Prüfkriterien (werden separat im Detail bewertet):
+{build_criteria_prompt()}
+AUFGABEN:
+1. business_name aus dem Text erkennen (die Branche ist vorgegeben)
+2. positive_aspects: 3-5 Dinge, die der Plan bereits gut macht
+3. score (0-100) und risk_level:
+   - 85-100: NIEDRIG, 65-84: MITTEL, 45-64: HOCH, 0-44: KRITISCH
+4. issues: Die TOP 3 Probleme mit title, description, severity ("KRITISCH", "HOCH", "MITTEL"),
+   fix, copy_paste_text (3-5 Sätze), time_minutes (5-30), impact_points (3-15), why_it_works
+5. personalized_summary: 4-5 motivierende Sätze mit dem Business-Namen
+
+ANTWORT ALS JSON:
+{{
+  "score": 42,
+  "risk_level": "KRITISCH",
+  "business_name": "...",
+  "positive_aspects": ["..."],
+  "issues": [{{"title": "...", "description": "...", "severity": "KRITISCH", "fix": "...", "copy_paste_text": "...", "time_minutes": 15, "impact_points": 12, "why_it_works": "..."}}],
+  "personalized_summary": "..."
+}}
+
+ANTWORTE NUR MIT VALIDEM JSON."""
+
+
+# Static prompts of the fan-out mode, built once per process
+CATEGORY_INSTRUCTIONS = {cat_key: build_category_instructions(cat_key) for cat_key in criteria_registry.category_keys}
+SUMMARY_INSTRUCTIONS = build_summary_instructions()
+
+
+def build_scoring_instructions() -> str:
+    """Static prompt of the scoring phase (no copy-paste texts)"""
+    return f"""Du analysierst deutsche Business Pläne für die Gründungszuschuss-Bewilligung (BA GZ 04).
+Der Business Plan Text folgt in der Nachricht des Users.
+
+WICHTIG: ANTWORTE NUR AUF DEUTSCH! KEINE ENGLISCHEN BEGRIFFE!
+
+AUFGABEN (nur Bewertung, KEINE Kopiervorlagen):
+1. business_name aus dem Text erkennen (die Branche ist vorgegeben)
+2. positive_aspects: 3-5 Dinge, die der Plan bereits gut macht
+3. score (0-100) und risk_level:
+   - 85-100: NIEDRIG, 65-84: MITTEL, 45-64: HOCH, 0-44: KRITISCH
+4. issues: Die TOP 3 Probleme nur mit title, description (1 Satz),
+   severity ("KRITISCH", "HOCH", "MITTEL"), time_minutes (5-30), impact_points (3-15)
+5. criteria_checklist: ALLE 27 Kriterien mit "OK", "WARNUNG", "FEHLER", "NICHT_GEFUNDEN"
+{build_criteria_prompt()}
+6. personalized_summary: 2-3 Sätze mit dem Business-Namen
+
+ANTWORT ALS JSON:
+{{
+  "score": 42,
+  "risk_level": "KRITISCH",
+  "business_name": "...",
+  "positive_aspects": ["..."],
+  "issues": [{{"title": "...", "description": "...", "severity": "KRITISCH", "time_minutes": 15, "impact_points": 12}}],
+  "criteria_checklist": {{"G1": "OK", "G2": "OK", "...": "..."}},
+  "personalized_summary": "..."
+}}
+
+ANTWORTE NUR MIT VALIDEM JSON."""
+
+
+def build_generation_instructions() -> str:
+    """Static prompt of the generation phase (fixes and copy-paste texts)"""
+    return f"""Du erstellst Kopiervorlagen für deutsche Business Pläne zur Gründungszuschuss-Bewilligung (BA GZ 04).
+Der Business Plan Text und das Ergebnis der Bewertung folgen in der Nachricht des Users.
+
+WICHTIG: ANTWORTE NUR AUF DEUTSCH! KEINE ENGLISCHEN BEGRIFFE!
+
+Die Kriterien:
+{build_criteria_prompt()}
+AUFGABEN:
+1. issues: Für JEDES bewertete Issue (gleiche Reihenfolge) ergänze:
+   - fix: Kurze Anleitung
+   - copy_paste_text: Fertiger Text (3-5 Sätze)
+   - why_it_works: Warum diese Formulierung funktioniert (1-2 Sätze)
+2. criteria_fixes: Für JEDES Kriterium mit WARNUNG oder FEHLER:
+   - problem, copy_paste_text, time_minutes (5-30), impact_points, why_it_works
+
+ANTWORT ALS JSON:
+{{
+  "issues": [{{"fix": "...", "copy_paste_text": "...", "why_it_works": "..."}}],
+  "criteria_fixes": {{
+    "G4": {{
+      "problem": "...",
+      "copy_paste_text": "...",
+      "time_minutes": 10,
+      "impact_points": 5,
+      "why_it_works": "..."
+    }}
+  }}
+}}
+
+ANTWORTE NUR MIT VALIDEM JSON."""
+
+
+def build_reanalysis_instructions() -> str:
+    """Static prompt of the incremental re-analysis (criteria and issues follow in the message)"""
+    return """Du prüfst eine ÜBERARBEITETE Version eines deutschen Business Plans für die Gründungszuschuss-Bewilligung (BA GZ 04).
+Der Business Plan Text, die neu zu bewertenden Kriterien und die bisherigen Top-Probleme folgen in der Nachricht des Users.
+
+WICHTIG: ANTWORTE NUR AUF DEUTSCH! KEINE ENGLISCHEN BEGRIFFE!
+
+AUFGABEN:
+1. criteria_checklist: Bewerte NUR die Kriterien unter "NEU ZU BEWERTENDE KRITERIEN":
+   "OK", "WARNUNG", "FEHLER", "NICHT_GEFUNDEN"
+2. criteria_fixes: Für jedes dieser Kriterien mit WARNUNG oder FEHLER:
+   - problem, copy_paste_text (2-3 Sätze), time_minutes (5-30), impact_points, why_it_works
+3. resolved_issues: Nummern der bisherigen Top-Probleme, die durch die Überarbeitung behoben sind
+4. new_issues: Höchstens so viele neue Probleme wie behoben wurden, nur falls vorhanden
+   (title, description, severity ("KRITISCH", "HOCH", "MITTEL"), fix, copy_paste_text,
+   time_minutes, impact_points, why_it_works)
+
+ANTWORT ALS JSON:
+{
+  "criteria_checklist": {"F3": "OK"},
+  "criteria_fixes": {
+    "F4": {
+      "problem": "...",
+      "copy_paste_text": "...",
+      "time_minutes": 10,
+      "impact_points": 3,
+      "why_it_works": "..."
+    }
+  },
+  "resolved_issues": [1],
+  "new_issues": []
+}
+
+ANTWORTE NUR MIT VALIDEM JSON."""
+
+
+# Static prompts of the two-phase mode and the re-analysis, built once per process
+SCORING_INSTRUCTIONS = build_scoring_instructions()
+GENERATION_INSTRUCTIONS = build_generation_instructions()
+REANALYSIS_INSTRUCTIONS = build_reanalysis_instructions()
+
+
+def build_instruction_request(
+    pdf_text: str, instructions: str, max_tokens: int, context: str = "", plan_message: Optional[str] = None
+) -> Dict:
+    """
+    Keyword arguments for a call with its own static instructions
+    (fan-out category/summary, scoring or generation phase).
+    `context` is appended to the plan message, e.g. previous results.
+    `plan_message`: build_plan_message(pdf_text) when already built (fan-out
+    sends the same plan message with every category request).
+    """
+    content = plan_message if plan_message is not None else build_plan_message(pdf_text)
+    if context:
+        content += f"\n\n{context}"
+    
+    return {
+        "model": ANALYSIS_MODEL,
+        "max_tokens": max_tokens,
+        "temperature": ANALYSIS_TEMPERATURE,
+        "system": [
+            {
+                "type": "text",
+                "text": instructions,
+                "cache_control": {"type": "ephemeral"}
+            }
+        ],
+        "messages": [
+            {
+                "role": "user",
+                "content": content
+            }
+        ],
+    }
+
+
+def clean_json_response(response_text: str) -> str:
+    """Strip markdown code fences around Claude's JSON answer"""
+    response_text = response_text.strip()
+    if response_text.startswith("```json"):
+        response_text = response_text.replace("```json", "").replace("```", "").strip()
+    elif response_text.startswith("```"):
+        response_text = response_text.replace("```", "").strip()
+    return response_text
+
+
+def parse_json_tolerant(response_text: str) -> Dict:
+    """
+    Parse Claude's JSON answer; if it is cut off or malformed, keep every
+    complete field. Raises json.JSONDecodeError only if nothing is salvageable.
+    """
+    cleaned = clean_json_response(response_text)
     try:
-        response = client.messages.create(
-            model="claude-sonnet-4-20250514",
-            max_tokens=8000,
-            temperature=0.3,
-            messages=[
-                {
-                    "role": "user",
-                    "content": analysis_prompt
-                }
-            ]
-        )
-        
-        response_text = response.content[0].text.strip()
-        
-        # Clean JSON
-        if response_text.startswith("```json"):
-            response_text = response_text.replace("```json", "").replace("```", "").strip()
-        elif response_text.startswith("```"):
-            response_text = response_text.replace("```", "").strip()
-        
-        raw_analysis = json.loads(response_text)
-        
-        # Validate and ensure minimum data
-        if "issues" not in raw_analysis or len(raw_analysis.get("issues", [])) == 0:
-            raw_analysis["issues"] = [create_fallback_issue()]
-        
-        while len(raw_analysis.get("issues", [])) < 3:
-            raw_analysis["issues"].append(create_generic_issue(len(raw_analysis["issues"]) + 1))
-        
-        # Ensure all criteria present
-        if "criteria_checklist" not in raw_analysis:
-            raw_analysis["criteria_checklist"] = {cid: "NICHT_GEFUNDEN" for cid in get_all_criteria_ids()}
+        return json.loads(cleaned)
+    except json.JSONDecodeError:
+        salvaged, _ = salvage_json_object(cleaned)
+        if not salvaged:
+            raise
+        return salvaged
+
+
+def find_missing_parts(raw_analysis: Dict, incomplete: List[str]) -> Dict:
+    """
+    Describe what a salvaged analysis still lacks:
+    top-level keys, checklist ids, fix ids and number of issues
+    """
+    missing = {}
+    checklist = raw_analysis.get("criteria_checklist", {})
+    fixes = raw_analysis.get("criteria_fixes", {})
+    
+    for key in REQUIRED_ANALYSIS_KEYS:
+        if key not in raw_analysis and key not in ("criteria_checklist", "criteria_fixes", "issues"):
+            missing[key] = True
+    
+    missing_ids = [cid for cid in get_all_criteria_ids() if cid not in checklist]
+    if missing_ids:
+        missing["criteria_checklist"] = missing_ids
+    
+    if "criteria_fixes" in incomplete or "criteria_fixes" not in raw_analysis:
+        missing_fixes = [
+            cid for cid, status in checklist.items()
+            if str(status).upper() in ["WARNUNG", "FEHLER"] and cid not in fixes
+        ]
+        if missing_fixes or missing_ids:
+            missing["criteria_fixes"] = missing_fixes
+    
+    issue_count = len(raw_analysis.get("issues", []))
+    if issue_count < 3:
+        missing["issues"] = 3 - issue_count
+    
+    return missing
+
+
+def build_continuation_context(raw_analysis: Dict, missing: Dict) -> str:
+    """Tell Claude what already exists and which parts to deliver"""
+    existing = {
+        "score": raw_analysis.get("score"),
+        "business_name": raw_analysis.get("business_name"),
+        "issues": [i.get("title") for i in raw_analysis.get("issues", []) if isinstance(i, dict)],
+        "criteria_checklist": raw_analysis.get("criteria_checklist", {}),
+        "criteria_fixes": list(raw_analysis.get("criteria_fixes", {}).keys()),
+    }
+    
+    tasks = []
+    for key, detail in missing.items():
+        if key == "criteria_checklist":
+            tasks.append(f"- criteria_checklist: NUR für {', '.join(detail)}")
+        elif key == "criteria_fixes":
+            targets = [", ".join(detail)] if detail else []
+            if "criteria_checklist" in missing:
+                targets.append("alle neu bewerteten Kriterien mit WARNUNG/FEHLER")
+            tasks.append(f"- criteria_fixes: NUR für {' sowie '.join(targets)}")
+        elif key == "issues":
+            tasks.append(f"- issues: {detail} weitere(s) Issue(s), keine Wiederholung der vorhandenen")
         else:
-            for cid in get_all_criteria_ids():
-                if cid not in raw_analysis["criteria_checklist"]:
-                    raw_analysis["criteria_checklist"][cid] = "NICHT_GEFUNDEN"
+            tasks.append(f"- {key}")
+    
+    return f"""FORTSETZUNG: Deine vorherige Antwort wurde abgeschnitten.
+Diese Teile liegen bereits vor und dürfen NICHT wiederholt werden:
+{json.dumps(existing, ensure_ascii=False)}
+
+Liefere NUR die folgenden fehlenden Teile als JSON-Objekt im gleichen Format:
+{chr(10).join(tasks)}"""
+
+
+def merge_continuation(raw_analysis: Dict, continuation: Dict) -> Dict:
+    """Merge a continuation answer into the salvaged analysis without overwriting"""
+    for key, value in continuation.items():
+        if key not in raw_analysis:
+            raw_analysis[key] = value
+        elif isinstance(raw_analysis[key], dict) and isinstance(value, dict):
+            for sub_key, sub_value in value.items():
+                raw_analysis[key].setdefault(sub_key, sub_value)
+        elif isinstance(raw_analysis[key], list) and isinstance(value, list):
+            raw_analysis[key].extend(value)
+    return raw_analysis
+
+
+def prepare_recovery(response_text: str):
+    """
+    Parse an analysis answer. Returns (raw_analysis, missing) where missing
+    is empty for a complete answer. Raises json.JSONDecodeError if nothing
+    can be salvaged.
+    """
+    cleaned = clean_json_response(response_text)
+    try:
+        return json.loads(cleaned), {}
+    except json.JSONDecodeError:
+        raw_analysis, incomplete = salvage_json_object(cleaned)
+        if "score" not in raw_analysis and "criteria_checklist" not in raw_analysis:
+            raise
+        return raw_analysis, find_missing_parts(raw_analysis, incomplete)
+
+
+def recover_analysis(response_text: str, pdf_text: str) -> Dict:
+    """Parse answer, salvage partial JSON and fetch only missing parts"""
+    raw_analysis, missing = prepare_recovery(response_text)
+    if not missing:
+        return raw_analysis
+    
+    print(f"⚠️ Incomplete analysis JSON, requesting continuation for: {list(missing.keys())}")
+    try:
+        client = get_anthropic_client()
+        response = create_message(client, build_analysis_request(
+            pdf_text, build_continuation_context(raw_analysis, missing), CONTINUATION_MAX_TOKENS
+        ), "continuation")
+        merge_continuation(raw_analysis, parse_json_tolerant(response.content[0].text))
+    except Exception as e:
+        print(f"⚠️ Continuation failed, keeping salvaged analysis: {str(e)}")
+    return raw_analysis
+
+
+async def recover_analysis_async(response_text: str, pdf_text: str) -> Dict:
+    """Async variant of recover_analysis"""
+    raw_analysis, missing = prepare_recovery(response_text)
+    if not missing:
+        return raw_analysis
+    
+    print(f"⚠️ Incomplete analysis JSON, requesting continuation for: {list(missing.keys())}")
+    try:
+        continuation = await request_json_async(build_analysis_request(
+            pdf_text, build_continuation_context(raw_analysis, missing), CONTINUATION_MAX_TOKENS
+        ), "continuation")
+        merge_continuation(raw_analysis, continuation)
+    except Exception as e:
+        print(f"⚠️ Continuation failed, keeping salvaged analysis: {str(e)}")
+    return raw_analysis
+
+
+def prescreen_plan(pdf_text: str) -> Optional[PrescreenResult]:
+    """Local K.O. pre-screen of G1-G4 (None when KO_PRESCREEN_MODE=off)"""
+    if KO_PRESCREEN_MODE == "off":
+        return None
+    return prescreen_text(pdf_text)
+
+
+def apply_industry(raw_analysis: Dict, pdf_text: str) -> Dict:
+    """detected_industry from the local classifier, returns the classification"""
+    prediction = classify_industry(pdf_text)
+    raw_analysis["detected_industry"] = prediction.label
+    return prediction.to_dict()
+
+
+def apply_revenue_assessment(raw_analysis: Dict, pdf_text: str):
+    """Deterministic revenue_comparison and F1 from the plan figures"""
+    assessment = assess_revenue(pdf_text, raw_analysis.get("detected_industry"))
+    raw_analysis["revenue_comparison"] = assessment
+    
+    # An unlabeled figure only informs revenue_comparison - F1 stays Claude's
+    status = revenue_f1_status(assessment)
+    if status is not None:
+        raw_analysis.setdefault("criteria_checklist", {})["F1"] = status
+
+
+def apply_prescreen(raw_analysis: Dict, prescreen: PrescreenResult):
+    """
+    Locally decided G1-G4 entries overrule Claude, unambiguous K.O. hits
+    cap the score (prefill: nothing - the results were only hints)
+    """
+    checklist = raw_analysis.setdefault("criteria_checklist", {})
+    checklist.update(prescreen.enforced())
+    
+    knockouts = prescreen.enforced_knockouts()
+    if not knockouts:
+        return
+    
+    fixes = raw_analysis.setdefault("criteria_fixes", {})
+    for cid in knockouts:
+        if cid not in fixes:
+            fixes[cid] = build_ko_fix(cid)
+    
+    # Claude did not flag the exclusion as critical issue - put it first
+    issues = raw_analysis.setdefault("issues", [])
+    if not any(str(issue.get("severity", "")).upper() == "KRITISCH" for issue in issues if isinstance(issue, dict)):
+        issues.insert(0, build_ko_issue(knockouts[0], prescreen))
+    
+    raw_analysis["score"] = min(raw_analysis.get("score", KO_SCORE_CAP), KO_SCORE_CAP)
+    raw_analysis["risk_level"] = "KRITISCH"
+
+
+def prescreen_verdict(pdf_text: str, metadata: Optional[Dict] = None) -> Optional[Dict]:
+    """
+    Immediate KRITISCH verdict without Claude call for plans with a
+    unambiguous K.O. hit (KO_PRESCREEN_MODE=short_circuit), otherwise None
+    """
+    if KO_PRESCREEN_MODE != "short_circuit":
+        return None
+    prescreen = prescreen_text(pdf_text)
+    knockouts = prescreen.enforced_knockouts()
+    if not knockouts:
+        return None
+    
+    print(f"✅ K.O. pre-screen short-circuit: {knockouts}")
+    result = finalize_analysis(build_ko_verdict(prescreen), metadata, pdf_text)
+    result["prescreen"]["short_circuit"] = True
+    return result
+
+
+def finalize_analysis(raw_analysis: Dict, metadata: Optional[Dict] = None, pdf_text: Optional[str] = None) -> Dict:
+    """
+    Validate Claude's raw analysis, fill gaps and map to PDF format.
+    With pdf_text the local checks (K.O. pre-screen, revenue engine) are applied.
+    """
+    prescreen = prescreen_plan(pdf_text) if pdf_text is not None else None
+    if prescreen is not None:
+        apply_prescreen(raw_analysis, prescreen)
+    industry = None
+    if pdf_text is not None:
+        industry = apply_industry(raw_analysis, pdf_text)
+        apply_revenue_assessment(raw_analysis, pdf_text)
+    
+    # Validate and ensure minimum data
+    if "issues" not in raw_analysis or len(raw_analysis.get("issues", [])) == 0:
+        raw_analysis["issues"] = [create_fallback_issue()]
+    
+    while len(raw_analysis.get("issues", [])) < 3:
+        raw_analysis["issues"].append(create_generic_issue(len(raw_analysis["issues"]) + 1))
+    
+    # Ensure all criteria present
+    if "criteria_checklist" not in raw_analysis:
+        raw_analysis["criteria_checklist"] = {cid: "NICHT_GEFUNDEN" for cid in get_all_criteria_ids()}
+    else:
+        for cid in get_all_criteria_ids():
+            if cid not in raw_analysis["criteria_checklist"]:
+                raw_analysis["criteria_checklist"][cid] = "NICHT_GEFUNDEN"
+    
+    # Ensure criteria_fixes exists
+    if "criteria_fixes" not in raw_analysis:
+        raw_analysis["criteria_fixes"] = {}
+    
+    # Generate missing fixes
+    checklist = raw_analysis["criteria_checklist"]
+    fixes = raw_analysis["criteria_fixes"]
+    for cid, status in checklist.items():
+        if status.upper() in ["WARNUNG", "FEHLER"] and cid not in fixes:
+            fixes[cid] = create_generic_criterion_fix(cid)
+    
+    # Ensure positive aspects
+    if "positive_aspects" not in raw_analysis or len(raw_analysis["positive_aspects"]) == 0:
+        raw_analysis["positive_aspects"] = [
+            "Geschäftsidee vorhanden und beschrieben",
+            "Business Plan wurde eingereicht",
+            "Motivation zur Selbständigkeit erkennbar"
+        ]
+    
+    # Ensure business name
+    if "business_name" not in raw_analysis or not raw_analysis["business_name"]:
+        raw_analysis["business_name"] = "Ihr Unternehmen"
+    
+    if metadata:
+        raw_analysis["metadata"] = metadata
+    
+    result = map_analysis_for_pdf(raw_analysis)
+    if industry is not None:
+        result["industry_classification"] = industry
+    if prescreen is not None:
+        result["prescreen"] = {**prescreen.to_dict(), "mode": KO_PRESCREEN_MODE}
+    return result
+
+
+def store_analysis(cache_key: str, pdf_text: str, result: Dict, variant: str):
+    """Cache a result and index the plan for near-duplicate lookups"""
+    analysis_cache.set(cache_key, result)
+    similarity_index.add(cache_key, pdf_text, get_analysis_version(variant))
+
+
+def build_seed_context(previous: Dict, match: SimilarityMatch) -> str:
+    """Prompt addition: assessment of an earlier version of the plan"""
+    reference = json.dumps(
+        {"score": previous.get("score"), "criteria_checklist": previous.get("criteria_checklist", {})},
+        ensure_ascii=False
+    )
+    return (
+        f"REFERENZ: Eine frühere, zu {round(match.similarity * 100)} % identische Version dieses Plans "
+        f"wurde so bewertet:\n{reference}\n"
+        "Bewerte unveränderte Inhalte konsistent mit dieser Referenz und ändere Bewertungen nur dort, "
+        "wo sich der Plan geändert hat."
+    )
+
+
+def lookup_analysis(
+    pdf_text: str, cache_key: str, variant: str
+) -> Tuple[Optional[Dict], str]:
+    """
+    Previous analysis for a plan: exact cache hit, otherwise (None, seed_context).
+    The seed context is non-empty when a similar plan was analyzed before -
+    near-duplicates only seed a new analysis, their texts are never reused.
+    """
+    cached_result = analysis_cache.get(cache_key)
+    if cached_result is not None:
+        return cached_result, ""
+    
+    match = similarity_index.find(pdf_text, get_analysis_version(variant), exclude=cache_key)
+    if match is None:
+        return None, ""
+    previous = analysis_cache.get(match.key)
+    if previous is None or previous.get("error"):
+        return None, ""
+    
+    print(f"✅ Near-duplicate seed ({match.similarity:.2f})")
+    similarity_index.record_seed()
+    return None, build_seed_context(previous, match)
+
+
+def local_checklist(pdf_text: str) -> Tuple[Dict, bool]:
+    """Locally decided criteria (K.O. pre-screen, F1) and whether a K.O. hit was found"""
+    checklist = {}
+    prescreen = prescreen_plan(pdf_text)
+    if prescreen is not None:
+        checklist.update(prescreen.enforced())
+    assessment = assess_revenue(pdf_text, classify_industry(pdf_text).label)
+    status = revenue_f1_status(assessment)
+    if status is not None:
+        checklist["F1"] = status
+    return checklist, bool(prescreen is not None and prescreen.enforced_knockouts())
+
+
+def fill_enforced_entries(raw_analysis: Dict, checklist: Dict):
+    """
+    The prompt tells the model to leave the enforced G1-G4 entries out of
+    criteria_checklist - fill them in so their absence counts neither as
+    missing criteria nor as disagreement. Entries the model did give are
+    kept and still compared; F1 is never filled in.
+    """
+    model_checklist = raw_analysis.get("criteria_checklist")
+    if not isinstance(model_checklist, dict):
+        return
+    for cid, status in checklist.items():
+        if cid in KO_CRITERIA:
+            model_checklist.setdefault(cid, status)
+
+
+def route_fast_answer(response_text: str, pdf_text: str) -> Tuple[Optional[Dict], CascadeDecision]:
+    """Fast-tier analysis if it can be used, None when the analysis model has to redo it"""
+    try:
+        raw_analysis = parse_json_tolerant(response_text)
+    except json.JSONDecodeError:
+        raw_analysis, decision = None, CascadeDecision(True, "validation", 0.0)
+    else:
+        checklist, knockout = local_checklist(pdf_text)
+        fill_enforced_entries(raw_analysis, checklist)
+        decision = decide_escalation(raw_analysis, REQUIRED_ANALYSIS_KEYS, checklist, knockout)
+    cascade_stats.record_decision(decision)
+    return (None if decision.escalate else raw_analysis), decision
+
+
+def model_routing(model: str, decision: Optional[CascadeDecision]) -> Dict:
+    """result["model_routing"]: which model produced the analysis and why"""
+    routing = {"model": model, "tier": "fast" if model == CASCADE_FAST_MODEL else "large"}
+    if decision is not None:
+        routing.update(decision.to_dict())
+    return routing
+
+
+def fast_model_failed(error: Exception) -> CascadeDecision:
+    print(f"⚠️ Fast model failed, escalating: {str(error)}")
+    decision = CascadeDecision(True, "fast_model_error", 0.0)
+    cascade_stats.record_decision(decision)
+    return decision
+
+
+def create_analysis(pdf_text: str, context: str = "") -> Tuple[Dict, Dict]:
+    """
+    Raw analysis and its model routing. With MODEL_CASCADE_ENABLED the
+    fast model answers first and the analysis model only runs on escalation.
+    """
+    client = get_anthropic_client()
+    decision = None
+    if MODEL_CASCADE_ENABLED:
+        try:
+            started = time.perf_counter()
+            response = create_message(client, build_analysis_request(pdf_text, context, model=CASCADE_FAST_MODEL), "fast")
+            cascade_stats.record_call("fast", time.perf_counter() - started, response.usage)
+            raw_analysis, decision = route_fast_answer(response.content[0].text, pdf_text)
+            if raw_analysis is not None:
+                return raw_analysis, model_routing(CASCADE_FAST_MODEL, decision)
+        except CircuitOpenError:
+            raise
+        except Exception as e:
+            decision = fast_model_failed(e)
+    
+    started = time.perf_counter()
+    response = create_message(client, build_analysis_request(pdf_text, context))
+    cascade_stats.record_call("large", time.perf_counter() - started, response.usage)
+    raw_analysis = recover_analysis(response.content[0].text, pdf_text)
+    return raw_analysis, model_routing(ANALYSIS_MODEL, decision)
+
+
+async def create_analysis_async(pdf_text: str, context: str = "") -> Tuple[Dict, Dict]:
+    """Async variant of create_analysis"""
+    client = get_async_anthropic_client()
+    decision = None
+    if MODEL_CASCADE_ENABLED:
+        try:
+            started = time.perf_counter()
+            response = await create_message_async(
+                client, build_analysis_request(pdf_text, context, model=CASCADE_FAST_MODEL), "fast"
+            )
+            cascade_stats.record_call("fast", time.perf_counter() - started, response.usage)
+            # Local checks are CPU work - keep the event loop free
+            raw_analysis, decision = await asyncio.to_thread(route_fast_answer, response.content[0].text, pdf_text)
+            if raw_analysis is not None:
+                return raw_analysis, model_routing(CASCADE_FAST_MODEL, decision)
+        except CircuitOpenError:
+            raise
+        except Exception as e:
+            decision = fast_model_failed(e)
+    
+    started = time.perf_counter()
+    response = await create_message_async(client, build_analysis_request(pdf_text, context))
+    cascade_stats.record_call("large", time.perf_counter() - started, response.usage)
+    raw_analysis = await recover_analysis_async(response.content[0].text, pdf_text)
+    return raw_analysis, model_routing(ANALYSIS_MODEL, decision)
+
+
+def analyze_business_plan(pdf_text: str, metadata: Optional[Dict] = None) -> Dict:
+    """
+    Analyze business plan with SOTA features:
+    - Positive aspects detection
+    - Potential score calculation
+    - Time and impact estimates
+    - Personalized summary
+    
+    Results are served from the analysis cache when the same
+    plan text was analyzed before under the same prompt version.
+    """
+    verdict = prescreen_verdict(pdf_text, metadata)
+    if verdict is not None:
+        return verdict
+    
+    cache_key = get_analysis_cache_key(pdf_text, ROUTED_CACHE_VARIANT)
+    cached_result, seed_context = lookup_analysis(pdf_text, cache_key, ROUTED_CACHE_VARIANT)
+    if cached_result is not None:
+        return cached_result
+    
+    try:
+        raw_analysis, routing = create_analysis(pdf_text, seed_context)
+        result = finalize_analysis(raw_analysis, metadata, pdf_text)
+        result["model_routing"] = routing
+        store_analysis(cache_key, pdf_text, result, ROUTED_CACHE_VARIANT)
+        return result
         
-        # Ensure criteria_fixes exists
-        if "criteria_fixes" not in raw_analysis:
-            raw_analysis["criteria_fixes"] = {}
+    except json.JSONDecodeError as e:
+        return create_error_response(f"JSON-Parsing-Fehler: {str(e)}")
+    except Exception as e:
+        return create_error_response(f"Analysefehler: {str(e)}")
+
+
+async def analyze_business_plan_async(pdf_text: str, metadata: Optional[Dict] = None) -> Dict:
+    """
+    Non-blocking variant of analyze_business_plan for the FastAPI endpoints.
+    Uses the async Anthropic client, so the event loop keeps serving
+    other requests while Claude generates the analysis.
+    
+    ANALYSIS_MODE=fanout runs the per-category fan-out instead.
+    """
+    verdict = prescreen_verdict(pdf_text, metadata)
+    if verdict is not None:
+        return verdict
+    
+    if ANALYSIS_MODE == "fanout":
+        return await analyze_business_plan_fanout_async(pdf_text, metadata)
+    
+    cache_key = get_analysis_cache_key(pdf_text, ROUTED_CACHE_VARIANT)
+    cached_result, seed_context = lookup_analysis(pdf_text, cache_key, ROUTED_CACHE_VARIANT)
+    if cached_result is not None:
+        return cached_result
+    
+    try:
+        raw_analysis, routing = await create_analysis_async(pdf_text, seed_context)
+        result = await asyncio.to_thread(finalize_analysis, raw_analysis, metadata, pdf_text)
+        result["model_routing"] = routing
+        store_analysis(cache_key, pdf_text, result, ROUTED_CACHE_VARIANT)
+        return result
         
-        # Generate missing fixes
-        checklist = raw_analysis["criteria_checklist"]
-        fixes = raw_analysis["criteria_fixes"]
-        for cid, status in checklist.items():
-            if status.upper() in ["WARNUNG", "FEHLER"] and cid not in fixes:
-                fixes[cid] = create_generic_criterion_fix(cid)
+    except json.JSONDecodeError as e:
+        return create_error_response(f"JSON-Parsing-Fehler: {str(e)}")
+    except Exception as e:
+        return create_error_response(f"Analysefehler: {str(e)}")
+
+
+async def request_json_async(request: Dict, call_type: str = "full") -> Dict:
+    """Run one Claude call and parse its (possibly truncated) JSON answer"""
+    client = get_async_anthropic_client()
+    response = await create_message_async(client, request, call_type)
+    return parse_json_tolerant(response.content[0].text)
+
+
+def merge_fanout_results(summary: Dict, category_results: List[Dict]) -> Dict:
+    """Merge summary and per-category answers into one raw analysis"""
+    raw_analysis = dict(summary)
+    raw_analysis["criteria_checklist"] = {}
+    raw_analysis["criteria_fixes"] = {}
+    for category_result in category_results:
+        raw_analysis["criteria_checklist"].update(category_result.get("criteria_checklist", {}))
+        raw_analysis["criteria_fixes"].update(category_result.get("criteria_fixes", {}))
+    return raw_analysis
+
+
+async def analyze_business_plan_fanout_async(pdf_text: str, metadata: Optional[Dict] = None) -> Dict:
+    """
+    Fan-out variant: one smaller Claude call per criteria category plus
+    one call for score, issues and summary, all running concurrently.
+    Wall-clock time is roughly the slowest call instead of one long generation.
+    """
+    # Fan-out calls are per category - exact cache hits only, no near-duplicate seed
+    cache_key = get_analysis_cache_key(pdf_text, FANOUT_CACHE_VARIANT)
+    cached_result = analysis_cache.get(cache_key)
+    if cached_result is not None:
+        return cached_result
+    
+    category_keys = list(criteria_registry.category_keys)
+    try:
+        # Classification, benchmark, section selection and pre-screen once per analysis, off the event loop
+        plan_message = await asyncio.to_thread(build_plan_message, pdf_text)
+        requests = [
+            build_instruction_request(pdf_text, SUMMARY_INSTRUCTIONS, FANOUT_SUMMARY_MAX_TOKENS, plan_message=plan_message)
+        ] + [
+            build_instruction_request(
+                pdf_text, CATEGORY_INSTRUCTIONS[cat_key], FANOUT_CATEGORY_MAX_TOKENS, plan_message=plan_message
+            )
+            for cat_key in category_keys
+        ]
         
-        # Ensure positive aspects
-        if "positive_aspects" not in raw_analysis or len(raw_analysis["positive_aspects"]) == 0:
-            raw_analysis["positive_aspects"] = [
-                "Geschäftsidee vorhanden und beschrieben",
-                "Business Plan wurde eingereicht",
-                "Motivation zur Selbständigkeit erkennbar"
-            ]
+        answers = await asyncio.gather(
+            *[request_json_async(request, "fanout") for request in requests],
+            return_exceptions=True
+        )
+        summary, category_answers = answers[0], answers[1:]
+        if isinstance(summary, Exception):
+            raise summary
         
-        # Ensure business name
-        if "business_name" not in raw_analysis or not raw_analysis["business_name"]:
-            raw_analysis["business_name"] = "Ihr Unternehmen"
+        category_results = []
+        for cat_key, answer in zip(category_keys, category_answers):
+            if isinstance(answer, Exception):
+                # Criteria of this category fall back to NICHT_GEFUNDEN in finalize_analysis
+                print(f"⚠️ Fan-out call for {cat_key} failed: {str(answer)}")
+                continue
+            category_results.append(answer)
         
-        if metadata:
-            raw_analysis["metadata"] = metadata
+        result = await asyncio.to_thread(
+            finalize_analysis, merge_fanout_results(summary, category_results), metadata, pdf_text
+        )
+        if len(category_results) == len(category_keys):
+            store_analysis(cache_key, pdf_text, result, FANOUT_CACHE_VARIANT)
+        return result
         
-        return map_analysis_for_pdf(raw_analysis)
+    except json.JSONDecodeError as e:
+        return create_error_response(f"JSON-Parsing-Fehler: {str(e)}")
+    except Exception as e:
+        return create_error_response(f"Analysefehler: {str(e)}")
+
+
+async def score_business_plan_async(pdf_text: str, metadata: Optional[Dict] = None) -> Dict:
+    """
+    Phase 1 of the two-phase analysis: checklist, score and issue headlines
+    without copy-paste texts. Fast and cheap, used at upload.
+    The result is marked analysis_phase="scoring".
+    """
+    verdict = prescreen_verdict(pdf_text, metadata)
+    if verdict is not None:
+        return verdict
+    
+    cached_result = analysis_cache.get(get_analysis_cache_key(pdf_text, COMPLETE_CACHE_VARIANT))
+    if cached_result is not None:
+        # Paid for by someone else - the generation phase hits the cache after payment
+        return as_scoring_result(cached_result)
+    
+    cache_key = get_analysis_cache_key(pdf_text, SCORING_CACHE_VARIANT)
+    cached_result, seed_context = lookup_analysis(pdf_text, cache_key, SCORING_CACHE_VARIANT)
+    if cached_result is not None:
+        return cached_result
+    
+    try:
+        raw_analysis = await request_json_async(
+            build_instruction_request(pdf_text, SCORING_INSTRUCTIONS, SCORING_MAX_TOKENS, context=seed_context),
+            "scoring"
+        )
+        result = await asyncio.to_thread(finalize_analysis, raw_analysis, metadata, pdf_text)
+        result["analysis_phase"] = "scoring"
+        store_analysis(cache_key, pdf_text, result, SCORING_CACHE_VARIANT)
+        return result
         
     except json.JSONDecodeError as e:
         return create_error_response(f"JSON-Parsing-Fehler: {str(e)}")
@@ -457,6 +1338,290 @@ ANTWORTE NUR MIT VALIDEM JSON."""
         return create_error_response(f"Analysefehler: {str(e)}")
 
 
+def unmap_analysis(result: Dict) -> Dict:
+    """Turn a mapped (PDF format) result back into a raw analysis"""
+    return {
+        "score": result.get("score", 0),
+        "risk_level": result.get("risk_level", "MITTEL"),
+        "detected_industry": result.get("detected_industry"),
+        "business_name": result.get("business_name"),
+        "positive_aspects": result.get("positive_aspects", []),
+        "issues": [dict(issue) for issue in result.get("top_issues", [])],
+        "criteria_checklist": dict(result.get("criteria_checklist", {})),
+        "criteria_fixes": dict(result.get("criteria_fixes", {})),
+        "revenue_comparison": result.get("revenue_comparison", {}),
+        "summary": result.get("summary", ""),
+        "personalized_summary": result.get("personalized_summary", ""),
+    }
+
+
+async def complete_business_plan_analysis_async(scoring_result: Dict, pdf_text: str) -> Dict:
+    """
+    Phase 2 of the two-phase analysis: generate fixes, copy-paste texts and
+    why_it_works for a scoring result. Runs after payment (or speculatively
+    at create-payment). Raises when the generation fails - the caller keeps
+    the scoring result and can retry, a paid report never goes out without
+    its texts.
+    """
+    cache_key = get_analysis_cache_key(pdf_text, COMPLETE_CACHE_VARIANT)
+    cached_result = analysis_cache.get(cache_key)
+    if cached_result is not None:
+        return cached_result
+    
+    raw_analysis = unmap_analysis(scoring_result)
+    assessment = json.dumps(
+        {
+            "issues": [
+                {"title": i.get("title"), "description": i.get("description"), "severity": i.get("severity")}
+                for i in raw_analysis["issues"]
+            ],
+            "criteria_checklist": raw_analysis["criteria_checklist"],
+        },
+        ensure_ascii=False
+    )
+    
+    generated = await request_json_async(
+        build_instruction_request(
+            pdf_text, GENERATION_INSTRUCTIONS, GENERATION_MAX_TOKENS,
+            context=f"ERGEBNIS DER BEWERTUNG:\n{assessment}"
+        ),
+        "generation"
+    )
+    if not isinstance(generated, dict) or not isinstance(generated.get("issues"), list):
+        raise ValueError("Generation phase returned no issue texts")
+    
+    for issue, details in zip(raw_analysis["issues"], generated.get("issues", [])):
+        if isinstance(details, dict):
+            issue.update({k: v for k, v in details.items() if k in PAID_ISSUE_FIELDS})
+    raw_analysis["criteria_fixes"] = generated.get("criteria_fixes", {})
+    
+    result = await asyncio.to_thread(finalize_analysis, raw_analysis, pdf_text=pdf_text)
+    result["analysis_phase"] = "complete"
+    store_analysis(cache_key, pdf_text, result, COMPLETE_CACHE_VARIANT)
+    return result
+
+
+def reanalysis_fallback_reason(previous: Dict, diff: PlanDiff, pdf_text: str) -> Optional[str]:
+    """Why a revised plan needs a full analysis instead of an incremental one (None: incremental)"""
+    if previous.get("error") or "criteria_checklist" not in previous:
+        return "Vorherige Analyse unvollständig"
+    if previous.get("prescreen", {}).get("enforced_knockouts"):
+        # The previous score was capped - no reliable base for a delta
+        prescreen = prescreen_plan(pdf_text)
+        if prescreen is None or not prescreen.enforced_knockouts():
+            return "K.O.-Kriterium behoben"
+    if diff.changed_ratio > REANALYSIS_MAX_CHANGED_RATIO:
+        return "Zu viele Änderungen"
+    if len(diff.categories) > REANALYSIS_MAX_CATEGORIES:
+        return "Zu viele Kategorien betroffen"
+    return None
+
+
+def build_reanalysis_context(criteria_ids: List[str], diff: PlanDiff, issues: List[Dict]) -> str:
+    """Message part of the re-analysis: criteria to re-evaluate, changed sections, previous issues"""
+    changed = ", ".join(change.title or "(ohne Überschrift)" for change in diff.changes)
+    previous_issues = "\n".join(
+        f"{index}. {issue.get('title', '')}: {issue.get('description', '')}" for index, issue in enumerate(issues, 1)
+    )
+    return (
+        f"NEU ZU BEWERTENDE KRITERIEN:\n{''.join(get_criterion_info(cid).prompt_line() for cid in criteria_ids)}\n"
+        f"GEÄNDERTE ABSCHNITTE: {changed}\n\n"
+        f"BISHERIGE TOP-PROBLEME:\n{previous_issues}"
+    )
+
+
+def reanalysis_variant(previous_text: str, scoring_only: bool) -> str:
+    """Cache variant of an incremental re-analysis - depends on the previous version and its phase"""
+    base = SCORING_CACHE_VARIANT if scoring_only else FULL_CACHE_VARIANT
+    return f"{REANALYSIS_CACHE_VARIANT}+{base}:{make_cache_key(previous_text, '')[:16]}"
+
+
+def merge_reanalysis(previous: Dict, answer: Dict, criteria_ids: List[str]) -> Dict:
+    """Previous analysis with re-evaluated criteria and issues replaced, everything else carried over"""
+    raw_analysis = unmap_analysis(previous)
+    checklist = raw_analysis["criteria_checklist"]
+    fixes = raw_analysis["criteria_fixes"]
+    new_checklist = answer.get("criteria_checklist", {})
+    new_fixes = answer.get("criteria_fixes", {})
+    for cid in criteria_ids:
+        if cid in new_checklist:
+            checklist[cid] = new_checklist[cid]
+            fixes.pop(cid, None)
+        if isinstance(new_fixes.get(cid), dict):
+            fixes[cid] = new_fixes[cid]
+    
+    issues = raw_analysis["issues"]
+    # Issues are numbered from 1 in the prompt
+    resolved = {
+        index - 1 for index in answer.get("resolved_issues", [])
+        if isinstance(index, int) and 1 <= index <= len(issues)
+    }
+    new_issues = [issue for issue in answer.get("new_issues", []) if isinstance(issue, dict)][:len(resolved)]
+    raw_analysis["issues"] = [issue for index, issue in enumerate(issues) if index not in resolved] + new_issues
+    return raw_analysis
+
+
+async def reanalyze_business_plan_async(
+    pdf_text: str, previous: Dict, previous_text: str, metadata: Optional[Dict] = None
+) -> Dict:
+    """
+    Re-analysis of a revised plan linked to a previous analysis.
+    
+    The section structure of both versions is diffed, only the criteria of
+    the affected categories are re-evaluated (one small Claude call), all
+    other checklist entries, fixes and issues are carried over. The score
+    moves by the point delta of the changed criteria. Plans with too many
+    changes get a full analysis.
+    """
+    verdict = prescreen_verdict(pdf_text, metadata)
+    if verdict is not None:
+        return verdict
+    
+    scoring_only = previous.get("analysis_phase") == "scoring"
+    variant = reanalysis_variant(previous_text, scoring_only)
+    cache_key = get_analysis_cache_key(pdf_text, variant)
+    cached_result = analysis_cache.get(cache_key)
+    if cached_result is not None:
+        return cached_result
+    
+    diff = diff_plan_sections(previous_text, pdf_text)
+    reason = reanalysis_fallback_reason(previous, diff, pdf_text)
+    if reason is not None:
+        print(f"⚠️ Full re-analysis: {reason}")
+        if scoring_only:
+            result = await score_business_plan_async(pdf_text, metadata)
+        else:
+            result = await analyze_business_plan_async(pdf_text, metadata)
+        result["reanalysis"] = {"mode": "full", "reason": reason, **diff.to_dict()}
+        return result
+    
+    criteria_ids = [c.id for cat_key in diff.categories for c in criteria_registry.category(cat_key).criteria]
+    answer = {}
+    if criteria_ids:
+        try:
+            answer = await request_json_async(build_instruction_request(
+                pdf_text, REANALYSIS_INSTRUCTIONS, REANALYSIS_MAX_TOKENS,
+                context=build_reanalysis_context(criteria_ids, diff, previous.get("top_issues", []))
+            ), "reanalysis")
+        except json.JSONDecodeError as e:
+            return create_error_response(f"JSON-Parsing-Fehler: {str(e)}")
+        except Exception as e:
+            return create_error_response(f"Analysefehler: {str(e)}")
+    
+    raw_analysis = merge_reanalysis(previous, answer, criteria_ids)
+    result = await asyncio.to_thread(finalize_analysis, raw_analysis, metadata, pdf_text)
+    
+    # Score: previous score moved by the changed entries (incl. local checks)
+    delta = checklist_score_delta(previous.get("criteria_checklist", {}), result["criteria_checklist"])
+    if round(delta):
+        raw_analysis["score"] = max(0, min(100, round(previous.get("score", 0) + delta)))
+        raw_analysis["risk_level"] = risk_level_for_score(raw_analysis["score"])
+        if result.get("prescreen", {}).get("enforced_knockouts"):
+            raw_analysis["score"] = min(raw_analysis["score"], KO_SCORE_CAP)
+            raw_analysis["risk_level"] = "KRITISCH"
+        result.update(map_analysis_for_pdf(raw_analysis))
+    
+    if "analysis_phase" in previous:
+        result["analysis_phase"] = previous["analysis_phase"]
+    result["reanalysis"] = {
+        "mode": "incremental" if criteria_ids else "unchanged",
+        "reevaluated_criteria": criteria_ids,
+        "carried_over_criteria": len(criteria_registry.ids) - len(criteria_ids),
+        **diff.to_dict(),
+    }
+    print(f"✅ Incremental re-analysis: {len(criteria_ids)} criteria re-evaluated")
+    store_analysis(cache_key, pdf_text, result, variant)
+    return result
+
+
+async def stream_business_plan_analysis(pdf_text: str, metadata: Optional[Dict] = None) -> AsyncIterator[Dict]:
+    """
+    Streaming variant of analyze_business_plan_async.
+    
+    Yields {"event": ..., "data": ...} dicts while Claude is still generating:
+    - one event per STREAM_EVENT_FIELDS field as soon as its value is complete
+    - one "issue" event per completed issue
+    - a final "result" event with the complete mapped analysis
+    
+    With ANALYSIS_TWO_PHASE the scoring phase is streamed (no fixes or
+    copy-paste texts, result marked analysis_phase="scoring") - the
+    generation phase runs after payment as for /api/analyze.
+    """
+    cached_result = prescreen_verdict(pdf_text, metadata)
+    # Streamed from the analysis model directly - no cascade, no fan-out
+    variant = SCORING_CACHE_VARIANT if ANALYSIS_TWO_PHASE else SINGLE_CACHE_VARIANT
+    cache_key = get_analysis_cache_key(pdf_text, variant)
+    seed_context = ""
+    if cached_result is None and ANALYSIS_TWO_PHASE:
+        complete = analysis_cache.get(get_analysis_cache_key(pdf_text, COMPLETE_CACHE_VARIANT))
+        cached_result = as_scoring_result(complete) if complete is not None else None
+    if cached_result is None:
+        cached_result, seed_context = lookup_analysis(pdf_text, cache_key, variant)
+    if cached_result is not None:
+        for field in STREAM_EVENT_FIELDS:
+            if field in cached_result:
+                yield {"event": field, "data": cached_result[field]}
+        for index, issue in enumerate(cached_result.get("top_issues", [])):
+            if ANALYSIS_TWO_PHASE and isinstance(issue, dict):
+                issue = {k: v for k, v in issue.items() if k not in PAID_ISSUE_FIELDS}
+            yield {"event": "issue", "data": {"index": index, "issue": issue}}
+        yield {"event": "result", "data": cached_result}
+        return
+    
+    # The industry is classified locally - known before Claude starts
+    yield {"event": "detected_industry", "data": classify_industry(pdf_text).label}
+    
+    client = get_async_anthropic_client()
+    parser = IncrementalJSONParser(stream_array_items=("issues",))
+    issue_index = 0
+    
+    try:
+        # A stream cannot be retried or hedged once events were sent - breaker only
+        if not claude_breaker.allow():
+            raise CircuitOpenError("Claude API circuit is open - failing fast")
+        recorded = False
+        try:
+            if ANALYSIS_TWO_PHASE:
+                request = build_instruction_request(pdf_text, SCORING_INSTRUCTIONS, SCORING_MAX_TOKENS, context=seed_context)
+            else:
+                request = build_analysis_request(pdf_text, seed_context)
+            async with client.messages.stream(**request) as stream:
+                async for text in stream.text_stream:
+                    for kind, key, value in parser.feed(text):
+                        if kind == "item":
+                            yield {"event": "issue", "data": {"index": issue_index, "issue": value}}
+                            issue_index += 1
+                        elif key in STREAM_EVENT_FIELDS:
+                            yield {"event": key, "data": value}
+                final_message = await stream.get_final_message()
+                record_usage(final_message.usage)
+            claude_breaker.record_success()
+            recorded = True
+        except Exception as e:
+            if is_retryable(e):
+                claude_breaker.record_failure()
+                recorded = True
+            raise
+        finally:
+            if not recorded:
+                # Non-retryable error or client disconnect (cancelled/closed generator)
+                claude_breaker.release_probe()
+        
+        raw_analysis = await recover_analysis_async(parser.text, pdf_text)
+        result = await asyncio.to_thread(finalize_analysis, raw_analysis, metadata, pdf_text)
+        if ANALYSIS_TWO_PHASE:
+            # A continuation uses the full analysis prompt - keep only the free part
+            result = as_scoring_result(result)
+        store_analysis(cache_key, pdf_text, result, variant)
+        
+    except json.JSONDecodeError as e:
+        result = create_error_response(f"JSON-Parsing-Fehler: {str(e)}")
+    except Exception as e:
+        result = create_error_response(f"Analysefehler: {str(e)}")
+    
+    yield {"event": "result", "data": result}
+
+
 def create_fallback_issue() -> Dict:
     return {
         "title": "Dokumentenprüfung erforderlich",
@@ -486,10 +1651,10 @@ def create_generic_issue(index: int) -> Dict:
 def create_generic_criterion_fix(criterion_id: str) -> Dict:
     info = get_criterion_info(criterion_id)
     return {
-        "problem": f"{info['name']} nicht ausreichend dokumentiert",
-        "copy_paste_text": f"Der Bereich '{info['name']}' wurde nach IHK-Empfehlungen geplant.",
+        "problem": f"{info.name} nicht ausreichend dokumentiert",
+        "copy_paste_text": f"Der Bereich '{info.name}' wurde nach IHK-Empfehlungen geplant.",
         "time_minutes": 10,
-        "impact_points": info.get("max_points", 3),
+        "impact_points": info.max_points,
         "why_it_works": "Klare Dokumentation zeigt professionelle Vorbereitung."
     }
 
@@ -503,13 +1668,13 @@ def create_error_response(error_message: str) -> Dict:
         "detected_industry": "Nicht erkannt",
         "business_name": "Ihr Unternehmen",
         "estimated_revenue": "N/A",
-        "benchmark_revenue": "€40.000 - €60.000",
+        "benchmark_revenue": default_benchmark_range(),
         "positive_aspects": ["Business Plan wurde eingereicht", "Gründungsmotivation erkennbar"],
         "top_issues": [create_fallback_issue(), create_generic_issue(2), create_generic_issue(3)],
         "criteria_checklist": {cid: "NICHT_GEFUNDEN" for cid in get_all_criteria_ids()},
         "criteria_fixes": {},
         "criteria_fulfilled_count": 0,
-        "criteria_total_count": 27,
+        "criteria_total_count": len(criteria_registry.ids),
         "total_fix_time_minutes": 60,
         "total_fixes_count": 0,
         "personalized_summary": "Automatische Analyse fehlgeschlagen. Bitte erneut versuchen.",
@@ -0,0 +1,255 @@
+"""
+Incremental JSON Parser für GründerAI
+Parses Claude's streamed JSON answer chunk by chunk
+
+Emits every top-level field of the answer object as soon as its value is
+complete, and every element of selected top-level arrays (e.g. "issues")
+or entry of selected top-level objects (e.g. "criteria_fixes") as soon as
+that element is complete - without waiting for the whole answer.
+
+The same scanner salvages truncated or slightly malformed answers:
+every complete field and every complete element survives. A token where
+"," or "}" belongs (e.g. a missing comma between two fields) ends the scan
+at the last complete field - the next value is never taken for the
+pending key.
+"""
+
+import json
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# (kind, key, value):
+# "field" - complete top-level field
+# "item"  - complete element of a streamed top-level array
+# "entry" - complete (entry_key, value) of a streamed top-level object
+ParseEvent = Tuple[str, str, Any]
+
+_WHITESPACE = " \t\r\n"
+
+
+class IncrementalJSONParser:
+    """Character-level scanner over a growing JSON object text"""
+
+    def __init__(
+        self,
+        stream_array_items: Iterable[str] = ("issues",),
+        stream_object_entries: Iterable[str] = (),
+        stream_all: bool = False
+    ):
+        self.stream_array_items = set(stream_array_items)
+        self.stream_object_entries = set(stream_object_entries)
+        self.stream_all = stream_all
+        self.fields: Dict[str, Any] = {}
+        self.partial: Dict[str, Any] = {}
+        self.done = False
+        self.broken = False  # scan stopped at a structural error
+
+        self._buffer = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+
+        # Top-level object state
+        self._expect_key = False
+        self._key_start: Optional[int] = None
+        self._key: Optional[str] = None
+        self._awaiting_value = False
+        self._value_start: Optional[int] = None
+        self._value_done = False
+
+        # Streamed container state (depth 2 inside a top-level array/object)
+        self._container_key: Optional[str] = None
+        self._container_type: Optional[str] = None
+        self._expect_entry_key = False
+        self._entry_key_start: Optional[int] = None
+        self._entry_key: Optional[str] = None
+        self._awaiting_item = False
+        self._item_start: Optional[int] = None
+
+    @property
+    def text(self) -> str:
+        """Everything fed so far"""
+        return self._buffer
+
+    def _decode(self, raw: str) -> Tuple[bool, Any]:
+        try:
+            return True, json.loads(raw)
+        except ValueError:
+            return False, None
+
+    def _streams(self, key: Optional[str], opener: str) -> bool:
+        if key is None:
+            return False
+        if self.stream_all:
+            return True
+        if opener == "[":
+            return key in self.stream_array_items
+        return key in self.stream_object_entries
+
+    def _close_field(self, end: int, events: List[ParseEvent]):
+        if self._key is not None and self._value_start is not None:
+            ok, value = self._decode(self._buffer[self._value_start:end])
+            if ok:
+                self.fields[self._key] = value
+                self.partial.pop(self._key, None)
+                events.append(("field", self._key, value))
+        self._key = None
+        self._key_start = None
+        self._value_start = None
+        self._value_done = False
+        self._awaiting_value = False
+        self._expect_key = True
+
+    def _break_off(self):
+        """Structural error in the top-level object: keep what is complete, drop the pending field"""
+        self.broken = True
+        self.done = True
+
+    def _close_item(self, end: int, events: List[ParseEvent]):
+        if self._item_start is not None:
+            ok, value = self._decode(self._buffer[self._item_start:end])
+            if ok:
+                if self._container_type == "[":
+                    self.partial[self._container_key].append(value)
+                    events.append(("item", self._container_key, value))
+                elif self._entry_key is not None:
+                    self.partial[self._container_key][self._entry_key] = value
+                    events.append(("entry", self._container_key, (self._entry_key, value)))
+        self._item_start = None
+        self._entry_key = None
+        self._entry_key_start = None
+
+    def _open_container(self, opener: str):
+        self._container_key = self._key
+        self._container_type = opener
+        self.partial[self._key] = [] if opener == "[" else {}
+        self._awaiting_item = opener == "["
+        self._expect_entry_key = opener == "{"
+
+    def _close_container(self):
+        self._container_key = None
+        self._container_type = None
+        self._awaiting_item = False
+        self._expect_entry_key = False
+
+    def feed(self, chunk: str) -> List[ParseEvent]:
+        """Add a chunk of text, return the events completed by it"""
+        events: List[ParseEvent] = []
+        self._buffer += chunk
+        buf = self._buffer
+        i = self._pos
+
+        while i < len(buf) and not self.done:
+            ch = buf[i]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._key_start is not None and self._key is None:
+                        ok, key = self._decode(buf[self._key_start:i + 1])
+                        self._key = key if ok else None
+                    elif self._depth == 1 and self._value_start is not None:
+                        self._value_done = True
+                    elif self._depth == 2 and self._entry_key_start is not None and self._entry_key is None:
+                        ok, key = self._decode(buf[self._entry_key_start:i + 1])
+                        self._entry_key = key if ok else None
+                i += 1
+                continue
+
+            # Skip anything before the opening brace (e.g. ```json fences)
+            if self._depth == 0:
+                if ch == "{":
+                    self._depth = 1
+                    self._expect_key = True
+                i += 1
+                continue
+
+            if ch in _WHITESPACE:
+                if self._depth == 1 and self._value_start is not None:
+                    self._value_done = True
+            else:
+                if self._depth == 1 and self._value_done and ch not in ",}":
+                    # Value complete, but no "," or "}" - e.g. a missing comma
+                    self._break_off()
+                    break
+                if self._depth == 1 and self._awaiting_value:
+                    self._awaiting_value = False
+                    self._value_start = i
+                    if ch in "[{" and self._streams(self._key, ch):
+                        self._open_container(ch)
+                        self._depth += 1
+                        i += 1
+                        continue
+                elif (self._depth == 2 and self._container_key is not None
+                        and self._awaiting_item and ch not in "]}"):
+                    self._awaiting_item = False
+                    self._item_start = i
+
+            if ch == '"':
+                if self._depth == 1 and not self._expect_key and self._value_start != i:
+                    # A string that is neither key nor value: a second key without value
+                    self._break_off()
+                    break
+                self._in_string = True
+                if self._depth == 1 and self._expect_key:
+                    self._expect_key = False
+                    self._key_start = i
+                elif self._depth == 2 and self._container_type == "{" and self._expect_entry_key:
+                    self._expect_entry_key = False
+                    self._entry_key_start = i
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                if self._depth == 2 and self._container_key is not None:
+                    self._close_item(i, events)
+                    self._close_container()
+                self._depth -= 1
+                if self._depth == 1:
+                    self._value_done = True
+                elif self._depth == 0:
+                    self._close_field(i, events)
+                    self.done = True
+            elif ch == ",":
+                if self._depth == 1:
+                    self._close_field(i, events)
+                elif self._depth == 2 and self._container_key is not None:
+                    self._close_item(i, events)
+                    self._awaiting_item = self._container_type == "["
+                    self._expect_entry_key = self._container_type == "{"
+            elif ch == ":":
+                if self._depth == 1:
+                    if self._key is None or self._value_start is not None:
+                        self._break_off()
+                        break
+                    self._awaiting_value = True
+                elif self._depth == 2 and self._container_type == "{" and self._entry_key is not None:
+                    self._awaiting_item = True
+
+            i += 1
+
+        self._pos = i
+        return events
+
+
+def salvage_json_object(text: str) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    Recover as much as possible from a truncated or malformed JSON object.
+
+    Returns (salvaged, incomplete_keys): all complete top-level fields plus
+    the complete elements/entries of containers that were cut off, and the
+    keys of those cut-off containers.
+    """
+    parser = IncrementalJSONParser(stream_all=True)
+    parser.feed(text)
+
+    salvaged = dict(parser.fields)
+    incomplete = []
+    for key, value in parser.partial.items():
+        if key not in salvaged:
+            salvaged[key] = value
+            incomplete.append(key)
+    return salvaged, incomplete
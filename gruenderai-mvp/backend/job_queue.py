@@ -0,0 +1,100 @@
+"""
+Background Job Queue für GründerAI
+Bounded pool of asyncio workers for long-running analysis jobs
+
+Endpoints enqueue a job and return immediately (202 + job id),
+a fixed number of workers process the queue in the background.
+"""
+
+import os
+import asyncio
+import traceback
+from typing import Awaitable, Callable, Dict, List, Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Worker pool configuration
+ANALYSIS_JOB_WORKERS = int(os.getenv("ANALYSIS_JOB_WORKERS", "4"))
+ANALYSIS_JOB_QUEUE_SIZE = int(os.getenv("ANALYSIS_JOB_QUEUE_SIZE", "100"))
+
+Job = Callable[[], Awaitable[None]]
+
+
+class QueueFullError(Exception):
+    """Raised when the job queue is at capacity"""
+
+
+class WorkerPool:
+    """Fixed number of asyncio worker tasks consuming a bounded queue"""
+
+    def __init__(self, name: str, workers: int, max_pending: int):
+        self.name = name
+        self.workers = workers
+        self.max_pending = max_pending
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._running = 0
+        self._completed = 0
+        self._failed = 0
+
+    @property
+    def started(self) -> bool:
+        return bool(self._tasks)
+
+    def start(self):
+        """Start the worker tasks (must be called from a running event loop)"""
+        if self.started:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_pending)
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"{self.name}-worker-{i}")
+            for i in range(self.workers)
+        ]
+
+    async def stop(self):
+        """Cancel all workers; queued jobs that have not started are dropped"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+
+    def submit(self, job: Job):
+        """Enqueue a job, raises QueueFullError when the queue is at capacity"""
+        if not self.started:
+            self.start()
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise QueueFullError(f"{self.name} queue is full ({self.max_pending} pending jobs)")
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            self._running += 1
+            try:
+                await job()
+                self._completed += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self._failed += 1
+                print(f"❌ {self.name} job failed: {traceback.format_exc()}")
+            finally:
+                self._running -= 1
+                self._queue.task_done()
+
+    def stats(self) -> Dict:
+        return {
+            "workers": self.workers,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "running": self._running,
+            "completed": self._completed,
+            "failed": self._failed,
+            "max_pending": self.max_pending,
+        }
+
+
+# Worker pool for /api/analyze?mode=async
+analysis_jobs = WorkerPool("analysis", ANALYSIS_JOB_WORKERS, ANALYSIS_JOB_QUEUE_SIZE)
@@ -0,0 +1,319 @@
+"""
+K.O.-Kriterien Vorprüfung für GründerAI
+Deterministic pre-screen of the hard exclusion criteria G1-G4
+
+Team founding, Kapitalgesellschaft, Gesellschafter and planned employees
+exclude the Gründungszuschuss regardless of everything else. They are
+detected locally with high-precision patterns (microseconds, no API call):
+- FEHLER: an exclusion is stated (and not negated, conditional or about
+  customers, the Arbeitsagentur or a Verein)
+- OK: the plan explicitly states the solo/sole-proprietor setup
+- undetermined criteria are left to Claude
+Only OK statements and unambiguous first-person K.O. statements are ever
+decided locally; weaker pattern hits are passed to Claude as hints.
+"""
+
+import os
+import re
+from typing import Dict, List, NamedTuple, Tuple
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# off | prefill | narrow | short_circuit
+# prefill: local results are passed to Claude as hints, Claude decides
+# narrow: Claude is told the decided results and skips those criteria
+# short_circuit: plans with an unambiguous K.O. hit get an immediate
+#                KRITISCH verdict without Claude call, all other plans
+#                behave like narrow
+KO_PRESCREEN_MODE = os.getenv("KO_PRESCREEN_MODE", "prefill")
+
+# Score ceiling when a K.O. criterion is violated, score of the short-circuit verdict
+KO_SCORE_CAP = 44
+KO_VERDICT_SCORE = 30
+
+KO_CRITERIA = ["G1", "G2", "G3", "G4"]
+
+_CAPITAL_COMPANY = r"(gmbh|ug|unternehmergesellschaft|aktiengesellschaft|ag|kg|ohg)"
+_STAFF = (
+    r"(mitarbeiter(in|innen)?|angestellte[n]?|festangestellte[n]?|verkäufer(in|innen)?|aushilfen?|"
+    r"minijobber(in|innen)?|verkaufskräfte|teilzeitkräfte|vollzeitkräfte|kräfte|personal)"
+)
+_COUNT = r"(\d+|eine[nr]?|zwei|drei|vier|fünf)"
+# Staff as the object of a hiring statement ("zwei Mitarbeiter", "neue Aushilfen", "Personal")
+_HIRED = rf"(({_COUNT}|weitere[n]?|neue[n]?|zusätzliche[ns]?)\s+{_STAFF}|personal)"
+
+# Unambiguous statements of the founder about their own plan -
+# only these overrule Claude (narrow) or end the analysis (short_circuit)
+KO_PATTERNS = {
+    "G1": [
+        r"\bwir gründen\b",
+        r"\bgründerteam\b",
+        r"\bteamgründung\b",
+        r"\bgemeinsam mit (meinem|meiner) (geschäfts)?partner(in)?\b[^.\n]{0,60}\b(gründe|gründen|führe|führen)",
+    ],
+    "G2": [
+        rf"\brechtsform\b[^.\n]{{0,40}}\b{_CAPITAL_COMPANY}\b",
+        rf"\b(ich|wir)\s+(gründe|gründen)\b[^.\n]{{0,30}}\b(eine[rn]?|die)\s+{_CAPITAL_COMPANY}\b",
+    ],
+    "G3": [
+        r"\b(mein|meine[rnm]?|unser\w*)\s+(mit)?gesellschafter(in|innen)?\b",
+        r"\brechtsform\b[^.\n]{0,40}\bgbr\b",
+    ],
+    "G4": [
+        rf"\b(ich|wir)\s+(stelle|stellen)\b[^.\n]{{0,60}}\b{_HIRED}\b[^.\n]{{0,20}}\bein\b",
+        rf"\b(stelle|stellen)\s+(ich|wir)\b[^.\n]{{0,60}}\b{_HIRED}\b[^.\n]{{0,20}}\bein\b",
+        rf"\b(ich|wir)\b[^.\n]{{0,60}}\b{_HIRED}\b[^.\n]{{0,30}}\b(einstellen|einzustellen)\b",
+        rf"\b(ich|wir)\b[^.\n]{{0,40}}\b{_HIRED}\s+(zu\s+)?beschäftigen\b",
+        rf"\b(ich|wir)\s+(beschäftige|beschäftigen)\b[^.\n]{{0,30}}\b{_HIRED}\b",
+    ],
+}
+
+# Indications without a clear subject (or with another reading) - only
+# passed to Claude as a hint, never decided locally
+KO_HINT_PATTERNS = {
+    "G1": [
+        r"\bmitgründer(in)?\b",
+        r"\bco-?founder\b",
+    ],
+    "G2": [
+        rf"\bgründung\b[^.\n]{{0,30}}\b(eine[rn]?|der)\s+{_CAPITAL_COMPANY}\b",
+        r"\bug \(haftungsbeschränkt\)[^.\n]{0,30}\b(gegründet|gründe|gründen)",
+    ],
+    "G3": [
+        r"\b(weitere[rn]?|zwei|drei|\d+)\s+(mit)?gesellschafter(in|innen)?\b",
+        r"\bgesellschaftsvertrag\b",
+        r"\bteilhaber(in)?\b",
+        r"\bgeschäftsanteile?\b",
+        r"\b\d{1,2}\s?%\s*(der\s+)?(anteile|beteiligung)\b",
+    ],
+    "G4": [
+        rf"\b(geplant|vorgesehen)\b[^.\n]{{0,60}}\b{_HIRED}\b[^.\n]{{0,30}}\b(einzustellen|einstellen|zu beschäftigen)\b",
+        rf"\b{_COUNT}\s+{_STAFF}\b[^.\n]{{0,40}}\b(geplant|vorgesehen|eingestellt)\b",
+        # a non-zero amount, "Personalkosten: 0 €" is a solo statement
+        r"\bpersonalkosten\b[^\n]{0,40}?(?<![\d.,])[1-9][\d.]*(,\d+)?\s*(€|eur\b|euro\b)",
+    ],
+}
+
+OK_PATTERNS = {
+    "G1": [
+        r"\bsolo-?selbst(st)?ändig",
+        r"\bals einzelperson\b",
+        r"\bgründe (ich )?allein",
+    ],
+    "G2": [
+        r"\brechtsform\b[^.\n]{0,40}\b(einzelunternehmen|einzelunternehmer(in)?|freiberuf\w*)",
+        r"\bals (einzelunternehmer(in)?|freiberufler(in)?)\b",
+    ],
+    "G3": [
+        r"\balleinige[rn]? (inhaber(in)?|eigentümer(in)?|gesellschafter(in)?)\b",
+        r"\balleininhaber(in)?\b",
+    ],
+    "G4": [
+        r"\bohne (angestellte|mitarbeiter|personal)\b",
+        r"\bkeine (angestellten|mitarbeiter(innen)?)\b",
+    ],
+}
+
+# A K.O. statement only counts if it is neither negated nor vague/later
+NEGATION = re.compile(r"\b(kein\w*|ohne|nicht|weder)\b", re.IGNORECASE)
+CONDITIONAL = re.compile(
+    r"\b(bei bedarf|eventuell|ggf|gegebenenfalls|langfristig|später|perspektivisch|zukünftig|"
+    r"ab (dem )?(jahr [2-5]|zweiten|dritten|vierten|fünften)|im (jahr [2-5]|zweiten|dritten|vierten|fünften)|"
+    r"honorarbasis|freie[nr]? mitarbeiter|freiberufliche[nr]?|konkurren\w*|wettbewerb\w*)",
+    re.IGNORECASE,
+)
+# Sentences about someone else's staff or shareholders (customers, advisors, associations)
+OTHER_PARTY = re.compile(
+    r"\b(zielgruppe\w*|kunde[n]?|kundin(nen)?|kundschaft|klient\w*|auftraggeber\w*|"
+    r"agentur für arbeit|arbeitsagentur|jobcenter|verein\w*|e\.\s?v\.)",
+    re.IGNORECASE,
+)
+SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+|\n+")
+
+_KO_REGEX = {cid: [re.compile(p, re.IGNORECASE) for p in patterns] for cid, patterns in KO_PATTERNS.items()}
+_KO_HINT_REGEX = {cid: [re.compile(p, re.IGNORECASE) for p in patterns] for cid, patterns in KO_HINT_PATTERNS.items()}
+_OK_REGEX = {cid: [re.compile(p, re.IGNORECASE) for p in patterns] for cid, patterns in OK_PATTERNS.items()}
+
+# Issue and copy-paste templates for violated K.O. criteria
+KO_TEMPLATES = {
+    "G1": {
+        "title": "Teamgründung - Gründungszuschuss nur für Einzelpersonen",
+        "problem": "Der Plan beschreibt eine Gründung im Team",
+        "copy_paste_text": "Ich gründe als Einzelperson ohne Geschäftspartner. Die gesamte unternehmerische Verantwortung liegt allein bei mir.",
+        "why_it_works": "Eindeutige Solo-Gründung signalisiert Förderfähigkeit.",
+        "time_minutes": 10,
+        "impact_points": 5,
+    },
+    "G2": {
+        "title": "Kapitalgesellschaft als Rechtsform geplant",
+        "problem": "GmbH/UG/AG als Rechtsform schließt den Gründungszuschuss aus",
+        "copy_paste_text": "Ich gründe mein Unternehmen als Einzelunternehmen. Diese Rechtsform ermöglicht einen schnellen, kostengünstigen Start und passt zu meiner Solo-Selbständigkeit.",
+        "why_it_works": "Einzelunternehmen und Freiberufler sind die förderfähigen Rechtsformen.",
+        "time_minutes": 10,
+        "impact_points": 5,
+    },
+    "G3": {
+        "title": "Weitere Gesellschafter beteiligt",
+        "problem": "Der Plan nennt Gesellschafter oder Anteilsinhaber",
+        "copy_paste_text": "Ich bin alleinige Inhaberin bzw. alleiniger Inhaber des Unternehmens. Es gibt keine weiteren Gesellschafter oder Beteiligungen Dritter.",
+        "why_it_works": "Alleinige Inhaberschaft ist Voraussetzung für die Förderung.",
+        "time_minutes": 5,
+        "impact_points": 4,
+    },
+    "G4": {
+        "title": "Angestellte geplant - verstößt gegen Förderkriterien",
+        "problem": "Im ersten Jahr sind Angestellte geplant",
+        "copy_paste_text": "Im ersten Geschäftsjahr arbeite ich ohne Angestellte als Solo-Selbständige(r). Bei Bedarf arbeite ich mit freiberuflichen Partnern auf Honorarbasis.",
+        "why_it_works": "Honorarbasis ist rechtlich kein Arbeitsverhältnis und erfüllt die Solo-Anforderung.",
+        "time_minutes": 15,
+        "impact_points": 5,
+    },
+}
+
+
+class PrescreenResult(NamedTuple):
+    checklist: Dict[str, str]
+    evidence: Dict[str, str]
+    certain: Tuple[str, ...] = ()  # K.O. hits from unambiguous statements
+
+    @property
+    def knockouts(self) -> List[str]:
+        return [cid for cid in KO_CRITERIA if self.checklist.get(cid) == "FEHLER"]
+
+    def enforced(self, mode: str = KO_PRESCREEN_MODE) -> Dict[str, str]:
+        """
+        Results that overrule Claude: none in prefill (hints only), in
+        narrow/short_circuit the OK statements and unambiguous K.O. hits
+        """
+        if mode not in ("narrow", "short_circuit"):
+            return {}
+        return {
+            cid: status for cid, status in self.checklist.items()
+            if status == "OK" or cid in self.certain
+        }
+
+    def enforced_knockouts(self, mode: str = KO_PRESCREEN_MODE) -> List[str]:
+        enforced = self.enforced(mode)
+        return [cid for cid in KO_CRITERIA if enforced.get(cid) == "FEHLER"]
+
+    def to_dict(self) -> Dict:
+        return {
+            "checklist": dict(self.checklist),
+            "evidence": dict(self.evidence),
+            "knockouts": self.knockouts,
+            "enforced_knockouts": self.enforced_knockouts(),
+        }
+
+
+def _snippet(sentence: str) -> str:
+    sentence = " ".join(sentence.split())
+    return sentence if len(sentence) <= 160 else sentence[:157] + "..."
+
+
+def prescreen_text(text: str) -> PrescreenResult:
+    """Detect G1-G4 from the plan text"""
+    checklist: Dict[str, str] = {}
+    evidence: Dict[str, str] = {}
+    certain: List[str] = []
+
+    for sentence in SENTENCE_SPLIT.split(text):
+        if not sentence.strip():
+            continue
+        # Negated, vague/later or about someone else: no K.O. statement
+        ko_possible = (
+            NEGATION.search(sentence) is None
+            and CONDITIONAL.search(sentence) is None
+            and OTHER_PARTY.search(sentence) is None
+        )
+
+        for cid in KO_CRITERIA:
+            if cid in certain:
+                continue
+            if any(p.search(sentence) for p in _OK_REGEX[cid]):
+                # "alleiniger Gesellschafter", "ohne Angestellte" - explicit solo statement
+                if cid not in checklist:
+                    checklist[cid] = "OK"
+                    evidence[cid] = _snippet(sentence)
+            elif ko_possible and any(p.search(sentence) for p in _KO_REGEX[cid]):
+                # K.O. statements win over earlier OK statements and hints
+                checklist[cid] = "FEHLER"
+                evidence[cid] = _snippet(sentence)
+                certain.append(cid)
+            elif ko_possible and checklist.get(cid) != "FEHLER" and any(p.search(sentence) for p in _KO_HINT_REGEX[cid]):
+                checklist[cid] = "FEHLER"
+                evidence[cid] = _snippet(sentence)
+
+    return PrescreenResult(checklist, evidence, tuple(cid for cid in KO_CRITERIA if cid in certain))
+
+
+def build_prescreen_context(prescreen: PrescreenResult, mode: str = KO_PRESCREEN_MODE) -> str:
+    """
+    Prompt addition: decided criteria Claude skips (narrow/short_circuit)
+    and hints Claude checks itself (all other local results)
+    """
+    enforced = prescreen.enforced(mode)
+    fixed, hints = [], []
+    for cid in KO_CRITERIA:
+        if cid in prescreen.checklist:
+            line = f'- {cid}: {prescreen.checklist[cid]} (Fundstelle: "{prescreen.evidence[cid]}")'
+            (fixed if cid in enforced else hints).append(line)
+
+    sections = []
+    if fixed:
+        sections.append(
+            "VORAB GEPRÜFTE K.O.-KRITERIEN (stehen fest, NICHT in criteria_checklist aufnehmen, "
+            "aber im Score und in den Issues berücksichtigen):\n" + "\n".join(fixed)
+        )
+    if hints:
+        sections.append(
+            "HINWEISE DER K.O.-VORPRÜFUNG (automatische Mustertreffer, können falsch sein - "
+            "prüfe diese Kriterien selbst anhand des Plans und bewerte sie in criteria_checklist):\n"
+            + "\n".join(hints)
+        )
+    return "\n\n".join(sections)
+
+
+def build_ko_issue(cid: str, prescreen: PrescreenResult) -> Dict:
+    template = KO_TEMPLATES[cid]
+    return {
+        "title": template["title"],
+        "description": f"{template['problem']}: \"{prescreen.evidence.get(cid, '')}\" - das ist ein K.O.-Kriterium für den Gründungszuschuss.",
+        "severity": "KRITISCH",
+        "fix": template["problem"] + " - formuliere den Plan entsprechend um.",
+        "copy_paste_text": template["copy_paste_text"],
+        "time_minutes": template["time_minutes"],
+        "impact_points": template["impact_points"],
+        "why_it_works": template["why_it_works"],
+    }
+
+
+def build_ko_fix(cid: str) -> Dict:
+    template = KO_TEMPLATES[cid]
+    return {
+        "problem": template["problem"],
+        "copy_paste_text": template["copy_paste_text"],
+        "time_minutes": template["time_minutes"],
+        "impact_points": template["impact_points"],
+        "why_it_works": template["why_it_works"],
+    }
+
+
+def build_ko_verdict(prescreen: PrescreenResult) -> Dict:
+    """Raw analysis of the immediate KRITISCH verdict (short_circuit mode)"""
+    knockouts = prescreen.enforced_knockouts("short_circuit")
+    names = ", ".join(KO_TEMPLATES[cid]["title"] for cid in knockouts)
+    return {
+        "score": max(KO_VERDICT_SCORE - 5 * (len(knockouts) - 1), 10),
+        "risk_level": "KRITISCH",
+        "issues": [build_ko_issue(cid, prescreen) for cid in knockouts],
+        "criteria_checklist": prescreen.enforced("short_circuit"),
+        "criteria_fixes": {cid: build_ko_fix(cid) for cid in knockouts},
+        "positive_aspects": ["Business Plan wurde eingereicht"],
+        "personalized_summary": (
+            f"Die Vorprüfung hat K.O.-Kriterien gefunden: {names}. "
+            "Solange diese bestehen, ist der Gründungszuschuss ausgeschlossen. "
+            "Behebe zuerst diese Punkte mit den Kopiervorlagen und lade den Plan erneut hoch - "
+            "dann bewerten wir alle 27 Kriterien."
+        ),
+    }
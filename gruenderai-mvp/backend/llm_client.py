@@ -0,0 +1,211 @@
+"""
+Shared Anthropic Clients für GründerAI
+One pooled sync + async client per process instead of a new client per analysis
+Created and closed by the FastAPI lifespan hook, lazily created for scripts/CLI
+"""
+
+import os
+import threading
+from typing import Dict, Optional
+import httpx
+from anthropic import Anthropic, AsyncAnthropic
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Connection pool configuration
+ANTHROPIC_TIMEOUT_SECONDS = float(os.getenv("ANTHROPIC_TIMEOUT_SECONDS", "120"))
+ANTHROPIC_CONNECT_TIMEOUT_SECONDS = float(os.getenv("ANTHROPIC_CONNECT_TIMEOUT_SECONDS", "10"))
+ANTHROPIC_MAX_CONNECTIONS = int(os.getenv("ANTHROPIC_MAX_CONNECTIONS", "50"))
+ANTHROPIC_MAX_KEEPALIVE = int(os.getenv("ANTHROPIC_MAX_KEEPALIVE", "20"))
+ANTHROPIC_KEEPALIVE_EXPIRY = float(os.getenv("ANTHROPIC_KEEPALIVE_EXPIRY", "120"))
+
+
+class ConnectionStats:
+    """
+    Counts HTTP requests vs. newly opened connections via httpcore trace events.
+    requests - new_connections = requests served on a reused keep-alive connection.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.new_connections = 0
+        self.tls_handshakes = 0
+
+    def _record(self, event_name: str):
+        with self._lock:
+            if event_name == "connection.connect_tcp.complete":
+                self.new_connections += 1
+            elif event_name == "connection.start_tls.complete":
+                self.tls_handshakes += 1
+
+    def trace(self, event_name: str, info: Dict):
+        self._record(event_name)
+
+    async def async_trace(self, event_name: str, info: Dict):
+        self._record(event_name)
+
+    def on_request(self, request: httpx.Request):
+        with self._lock:
+            self.requests += 1
+        request.extensions["trace"] = self.trace
+
+    async def on_async_request(self, request: httpx.Request):
+        with self._lock:
+            self.requests += 1
+        request.extensions["trace"] = self.async_trace
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            reused = max(self.requests - self.new_connections, 0)
+            return {
+                "requests": self.requests,
+                "new_connections": self.new_connections,
+                "tls_handshakes": self.tls_handshakes,
+                "reused_connections": reused,
+                "reuse_rate": round(reused / self.requests, 3) if self.requests else 0.0,
+            }
+
+
+connection_stats = ConnectionStats()
+
+
+class TokenUsageStats:
+    """Accumulated token usage incl. prompt cache writes/reads"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.cache_creation_input_tokens = 0
+        self.cache_read_input_tokens = 0
+
+    def record(self, usage):
+        if usage is None:
+            return
+        with self._lock:
+            self.calls += 1
+            self.input_tokens += getattr(usage, "input_tokens", 0) or 0
+            self.output_tokens += getattr(usage, "output_tokens", 0) or 0
+            self.cache_creation_input_tokens += getattr(usage, "cache_creation_input_tokens", 0) or 0
+            self.cache_read_input_tokens += getattr(usage, "cache_read_input_tokens", 0) or 0
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            prompt_tokens = self.input_tokens + self.cache_creation_input_tokens + self.cache_read_input_tokens
+            return {
+                "calls": self.calls,
+                "input_tokens": self.input_tokens,
+                "output_tokens": self.output_tokens,
+                "cache_creation_input_tokens": self.cache_creation_input_tokens,
+                "cache_read_input_tokens": self.cache_read_input_tokens,
+                "prompt_cache_hit_rate": round(self.cache_read_input_tokens / prompt_tokens, 3) if prompt_tokens else 0.0,
+            }
+
+
+token_usage = TokenUsageStats()
+
+_client: Optional[Anthropic] = None
+_async_client: Optional[AsyncAnthropic] = None
+_client_lock = threading.Lock()
+
+
+def _get_api_key() -> str:
+    api_key = os.getenv("ANTHROPIC_API_KEY")
+    if not api_key:
+        raise ValueError("ANTHROPIC_API_KEY environment variable not set")
+    return api_key
+
+
+def _pool_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=ANTHROPIC_MAX_CONNECTIONS,
+        max_keepalive_connections=ANTHROPIC_MAX_KEEPALIVE,
+        keepalive_expiry=ANTHROPIC_KEEPALIVE_EXPIRY,
+    )
+
+
+def _pool_timeout() -> httpx.Timeout:
+    return httpx.Timeout(ANTHROPIC_TIMEOUT_SECONDS, connect=ANTHROPIC_CONNECT_TIMEOUT_SECONDS)
+
+
+def _create_client() -> Anthropic:
+    http_client = httpx.Client(
+        limits=_pool_limits(),
+        timeout=_pool_timeout(),
+        event_hooks={"request": [connection_stats.on_request]},
+    )
+    # Retries are handled by llm_resilience (deadline + backoff + circuit breaker)
+    return Anthropic(api_key=_get_api_key(), http_client=http_client, max_retries=0)
+
+
+def _create_async_client() -> AsyncAnthropic:
+    http_client = httpx.AsyncClient(
+        limits=_pool_limits(),
+        timeout=_pool_timeout(),
+        event_hooks={"request": [connection_stats.on_async_request]},
+    )
+    return AsyncAnthropic(api_key=_get_api_key(), http_client=http_client, max_retries=0)
+
+
+def get_shared_client() -> Anthropic:
+    """Process-wide sync client (created on first use)"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = _create_client()
+    return _client
+
+
+def get_shared_async_client() -> AsyncAnthropic:
+    """Process-wide async client (created on first use)"""
+    global _async_client
+    if _async_client is None:
+        with _client_lock:
+            if _async_client is None:
+                _async_client = _create_async_client()
+    return _async_client
+
+
+def init_anthropic_clients():
+    """Create the shared clients up front (FastAPI startup)"""
+    if not os.getenv("ANTHROPIC_API_KEY"):
+        print("⚠️ ANTHROPIC_API_KEY not set - Anthropic clients not initialized")
+        return
+    get_shared_client()
+    get_shared_async_client()
+
+
+async def close_anthropic_clients():
+    """Close the shared clients and their connection pools (FastAPI shutdown)"""
+    global _client, _async_client
+    with _client_lock:
+        client, async_client = _client, _async_client
+        _client, _async_client = None, None
+    if client is not None:
+        client.close()
+    if async_client is not None:
+        await async_client.close()
+
+
+def record_usage(usage):
+    """Record the usage block of a Claude response"""
+    token_usage.record(usage)
+
+
+def get_token_usage() -> Dict:
+    """Token usage statistics for /health"""
+    return token_usage.snapshot()
+
+
+def get_connection_stats() -> Dict:
+    """Connection reuse statistics for /health"""
+    return {
+        "initialized": _client is not None or _async_client is not None,
+        "max_connections": ANTHROPIC_MAX_CONNECTIONS,
+        "max_keepalive_connections": ANTHROPIC_MAX_KEEPALIVE,
+        **connection_stats.snapshot(),
+    }
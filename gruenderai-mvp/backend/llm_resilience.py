@@ -0,0 +1,334 @@
+"""
+LLM Call Resilience für GründerAI
+Latency-budgeted retries, hedged requests and a circuit breaker around Claude calls
+
+- Per-attempt deadline (no request hangs for minutes)
+- Jittered exponential backoff for timeouts, 429, 5xx and 529 (overloaded),
+  no further attempt once the total retry budget of a call is spent
+- Optional hedged second request once the observed p95 latency of the
+  same call type (fast, fanout, full, ...) is exceeded
+- Circuit breaker: after repeated failures calls fail fast until the API recovers
+"""
+
+import os
+import time
+import random
+import asyncio
+import threading
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Optional
+from anthropic import APIConnectionError, APIStatusError
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Retry / hedging configuration
+LLM_ATTEMPT_TIMEOUT_SECONDS = float(os.getenv("LLM_ATTEMPT_TIMEOUT_SECONDS", "120"))
+LLM_MAX_ATTEMPTS = int(os.getenv("LLM_MAX_ATTEMPTS", "3"))
+# Total time one call may spend on attempts and backoff
+LLM_RETRY_BUDGET_SECONDS = float(os.getenv("LLM_RETRY_BUDGET_SECONDS", "180"))
+LLM_BACKOFF_BASE_SECONDS = float(os.getenv("LLM_BACKOFF_BASE_SECONDS", "1"))
+LLM_BACKOFF_MAX_SECONDS = float(os.getenv("LLM_BACKOFF_MAX_SECONDS", "20"))
+LLM_HEDGE_ENABLED = os.getenv("LLM_HEDGE_ENABLED", "false").lower() == "true"
+LLM_HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+
+# Circuit breaker configuration
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+CIRCUIT_RESET_SECONDS = float(os.getenv("CIRCUIT_RESET_SECONDS", "30"))
+
+RETRYABLE_STATUS_CODES = {408, 409, 429}
+
+# An attempt with less time left than this is not worth starting
+MIN_ATTEMPT_SECONDS = 5.0
+
+
+class CircuitOpenError(Exception):
+    """Raised when the circuit breaker rejects a call"""
+
+
+def is_retryable(error: Exception) -> bool:
+    """Timeouts, connection errors, rate limits and server-side errors"""
+    if isinstance(error, (asyncio.TimeoutError, APIConnectionError)):
+        return True
+    if isinstance(error, APIStatusError):
+        return error.status_code in RETRYABLE_STATUS_CODES or error.status_code >= 500
+    return False
+
+
+def backoff_delay(attempt: int) -> float:
+    """Full-jitter exponential backoff"""
+    ceiling = min(LLM_BACKOFF_MAX_SECONDS, LLM_BACKOFF_BASE_SECONDS * (2 ** attempt))
+    return random.uniform(0, ceiling)
+
+
+class LatencyTracker:
+    """Rolling window of successful call latencies"""
+
+    def __init__(self, window: int = 200):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        with self._lock:
+            if not self._samples:
+                return None
+            ordered = sorted(self._samples)
+        index = min(int(len(ordered) * pct), len(ordered) - 1)
+        return ordered[index]
+
+    def count(self) -> int:
+        with self._lock:
+            return len(self._samples)
+
+
+class CircuitBreaker:
+    """closed → open after N consecutive failures → half_open after timeout → closed on success"""
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._half_open_probe = False
+        self._rejected = 0
+        self._lock = threading.Lock()
+
+    def _refresh(self):
+        if self._state == "open" and time.time() - self._opened_at >= self.reset_seconds:
+            self._state = "half_open"
+            self._half_open_probe = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._refresh()
+            return self._state
+
+    def is_open(self) -> bool:
+        """True while calls are being rejected (no state change)"""
+        return self.state == "open"
+
+    def allow(self) -> bool:
+        """May a call go through? In half_open only one probe call passes"""
+        with self._lock:
+            self._refresh()
+            if self._state == "closed":
+                return True
+            if self._state == "half_open" and not self._half_open_probe:
+                self._half_open_probe = True
+                return True
+            self._rejected += 1
+            return False
+
+    def release_probe(self):
+        """Call finished without telling anything about API health"""
+        with self._lock:
+            self._half_open_probe = False
+
+    def record_success(self):
+        with self._lock:
+            self._state = "closed"
+            self._failures = 0
+            self._half_open_probe = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == "half_open" or self._failures >= self.failure_threshold:
+                self._state = "open"
+                self._opened_at = time.time()
+                self._half_open_probe = False
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            self._refresh()
+            return {
+                "state": self._state,
+                "consecutive_failures": self._failures,
+                "rejected_calls": self._rejected,
+                "failure_threshold": self.failure_threshold,
+                "reset_seconds": self.reset_seconds,
+            }
+
+
+claude_breaker = CircuitBreaker(CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RESET_SECONDS)
+_call_stats = {"calls": 0, "retries": 0, "hedges": 0, "hedge_wins": 0, "failures": 0, "budget_exhausted": 0}
+# Sync calls run in worker threads, async calls on the event loop
+_stats_lock = threading.Lock()
+
+
+def _count(stat: str):
+    with _stats_lock:
+        _call_stats[stat] += 1
+
+# One latency window per call type - a fast-model call and a full analysis
+# differ by an order of magnitude, a shared p95 would hedge one too late
+# and the other far too early
+_latency: Dict[str, LatencyTracker] = {}
+_latency_lock = threading.Lock()
+
+
+def latency_tracker(call_type: str) -> LatencyTracker:
+    with _latency_lock:
+        if call_type not in _latency:
+            _latency[call_type] = LatencyTracker()
+        return _latency[call_type]
+
+
+def hedge_delay(call_type: str = "full") -> Optional[float]:
+    """Seconds after which a hedged request is sent (observed p95 of the call type), None = no hedging"""
+    tracker = latency_tracker(call_type)
+    if not LLM_HEDGE_ENABLED or tracker.count() < LLM_HEDGE_MIN_SAMPLES:
+        return None
+    return tracker.percentile(0.95)
+
+
+def retry_delay(attempt: int, deadline: float) -> Optional[float]:
+    """Backoff before the next attempt, None when the retry budget does not allow one"""
+    if attempt >= LLM_MAX_ATTEMPTS - 1:
+        return None
+    delay = backoff_delay(attempt)
+    if time.perf_counter() + delay + MIN_ATTEMPT_SECONDS > deadline:
+        _count("budget_exhausted")
+        return None
+    return delay
+
+
+async def _hedged_attempt(make_call: Callable[[float], Awaitable[Any]], timeout: float, call_type: str) -> Any:
+    """One attempt; sends a second identical request if the first exceeds p95"""
+    delay = hedge_delay(call_type)
+    primary = asyncio.ensure_future(make_call(timeout))
+    pending = {primary}
+    try:
+        if delay is None or delay >= timeout:
+            return await primary
+
+        done, pending = await asyncio.wait(pending, timeout=delay)
+        if done:
+            return primary.result()
+
+        _count("hedges")
+        hedge = asyncio.ensure_future(make_call(timeout))
+        pending.add(hedge)
+        error = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if task is hedge:
+                        _count("hedge_wins")
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        # Also on cancellation and on the attempt deadline - no request keeps running unobserved
+        for task in pending:
+            task.cancel()
+
+
+async def call_with_resilience_async(make_call: Callable[[float], Awaitable[Any]], call_type: str = "full") -> Any:
+    """
+    Run an async Claude call with deadline, retries, hedging and circuit breaker.
+    make_call receives the per-attempt timeout in seconds.
+    """
+    if not claude_breaker.allow():
+        raise CircuitOpenError("Claude API circuit is open - failing fast")
+
+    _count("calls")
+    deadline = time.perf_counter() + LLM_RETRY_BUDGET_SECONDS
+    recorded = False
+    last_error: Optional[Exception] = None
+    try:
+        for attempt in range(LLM_MAX_ATTEMPTS):
+            started = time.perf_counter()
+            timeout = min(LLM_ATTEMPT_TIMEOUT_SECONDS, deadline - started)
+            try:
+                result = await asyncio.wait_for(_hedged_attempt(make_call, timeout, call_type), timeout=timeout)
+                latency_tracker(call_type).record(time.perf_counter() - started)
+                claude_breaker.record_success()
+                recorded = True
+                return result
+            except Exception as e:
+                if not is_retryable(e):
+                    raise
+                last_error = e
+                delay = retry_delay(attempt, deadline)
+                if delay is None:
+                    break
+                _count("retries")
+                await asyncio.sleep(delay)
+
+        _count("failures")
+        claude_breaker.record_failure()
+        recorded = True
+        raise last_error
+    finally:
+        if not recorded:
+            # Non-retryable error or cancelled: says nothing about API health
+            claude_breaker.release_probe()
+
+
+def call_with_resilience(make_call: Callable[[float], Any], call_type: str = "full") -> Any:
+    """Sync variant (no hedging): deadline via request timeout, retries, circuit breaker"""
+    if not claude_breaker.allow():
+        raise CircuitOpenError("Claude API circuit is open - failing fast")
+
+    _count("calls")
+    deadline = time.perf_counter() + LLM_RETRY_BUDGET_SECONDS
+    recorded = False
+    last_error: Optional[Exception] = None
+    try:
+        for attempt in range(LLM_MAX_ATTEMPTS):
+            started = time.perf_counter()
+            try:
+                result = make_call(min(LLM_ATTEMPT_TIMEOUT_SECONDS, deadline - started))
+                latency_tracker(call_type).record(time.perf_counter() - started)
+                claude_breaker.record_success()
+                recorded = True
+                return result
+            except Exception as e:
+                if not is_retryable(e):
+                    raise
+                last_error = e
+                delay = retry_delay(attempt, deadline)
+                if delay is None:
+                    break
+                _count("retries")
+                time.sleep(delay)
+
+        _count("failures")
+        claude_breaker.record_failure()
+        recorded = True
+        raise last_error
+    finally:
+        if not recorded:
+            claude_breaker.release_probe()
+
+
+def get_resilience_stats() -> Dict:
+    """Circuit breaker state and call statistics for /health"""
+    with _latency_lock:
+        trackers = dict(_latency)
+    latency = {}
+    for call_type, tracker in sorted(trackers.items()):
+        p50 = tracker.percentile(0.5)
+        p95 = tracker.percentile(0.95)
+        latency[call_type] = {
+            "samples": tracker.count(),
+            "latency_p50_seconds": round(p50, 2) if p50 is not None else None,
+            "latency_p95_seconds": round(p95, 2) if p95 is not None else None,
+        }
+    with _stats_lock:
+        call_stats = dict(_call_stats)
+    return {
+        "circuit": claude_breaker.snapshot(),
+        **call_stats,
+        "latency": latency,
+        "hedging_enabled": LLM_HEDGE_ENABLED,
+        "retry_budget_seconds": LLM_RETRY_BUDGET_SECONDS,
+    }
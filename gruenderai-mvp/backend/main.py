@@ -3,35 +3,85 @@ GründerAI Backend - Main API (Updated with PayPal Integration)
 FastAPI server for business plan analysis with payment processing
 """
 
-from fastapi import FastAPI, UploadFile, File, HTTPException
+from fastapi import FastAPI, UploadFile, File, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
-from pydantic import BaseModel, EmailStr
-from typing import List, Optional
+from fastapi.responses import FileResponse, JSONResponse
+from pydantic import BaseModel, EmailStr, Field
+from typing import List, Optional, Tuple
 import os
+import copy
+import json
 import uuid
+import asyncio
 from datetime import datetime
 from dotenv import load_dotenv
 import time
 from fastapi.responses import Response
 from fastapi.responses import StreamingResponse
+from contextlib import asynccontextmanager
 import io
 
 # Import our modules
-from grant_calibration import analyze_business_plan
-from pdf_processor import extract_text_from_file
+from grant_calibration import (
+    analyze_business_plan_async,
+    score_business_plan_async,
+    complete_business_plan_analysis_async,
+    strip_paid_fields,
+    as_scoring_result,
+    ANALYSIS_TWO_PHASE,
+    stream_business_plan_analysis,
+    reanalyze_business_plan_async,
+    get_cache_stats,
+    get_near_duplicate_stats,
+)
+from extraction_pool import (
+    extraction_pool, extract_text_isolated, get_extraction_stats, ExtractionRejectedError, EXTRACTION_POOL_ENABLED
+)
 from paypal_integration import create_order, capture_order, get_order_details
 from pdf_generator import generate_report_pdf
 from email_service import send_report_email, send_payment_confirmation
+from llm_client import (
+    init_anthropic_clients,
+    close_anthropic_clients,
+    get_connection_stats,
+    get_token_usage,
+)
+from job_queue import analysis_jobs, QueueFullError
+from llm_resilience import claude_breaker, get_resilience_stats, CIRCUIT_RESET_SECONDS
+from batch_analysis import run_batch_analysis, BATCH_MAX_FILES
+from near_duplicate import similarity_index
+from score_simulator import ScoreModel
+from model_cascade import get_cascade_stats
+from upload_ingest import IngestedUpload, UploadRejectedError, ingest_multipart, read_upload_file
 
 # Load environment variables
 load_dotenv()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create shared resources on startup, release them on shutdown"""
+    init_anthropic_clients()
+    analysis_jobs.start()
+    # Read the persisted similarity index before the first upload needs it
+    await asyncio.to_thread(similarity_index.load)
+    if EXTRACTION_POOL_ENABLED:
+        # Start the extraction workers before the first upload has to wait for them
+        await asyncio.to_thread(extraction_pool.start)
+    yield
+    for task in list(batch_tasks):
+        task.cancel()
+    await analysis_jobs.stop()
+    await close_anthropic_clients()
+    extraction_pool.shutdown()
+
+
 # Initialize FastAPI
 app = FastAPI(
     title="GründerAI API",
     description="Business Plan Analysis for Gründungszuschuss Approval",
     version="2.0.0",
+    lifespan=lifespan,
 )
 
 # CORS Configuration
@@ -82,9 +132,24 @@ class CapturePaymentRequest(BaseModel):
     customer_name: str
 
 
+class SimulationRequest(BaseModel):
+    fixes: Optional[List[str]] = None  # criterion IDs, None = all fixes
+
+
+class PreflightRequest(BaseModel):
+    sha256: str = Field(..., pattern="^[0-9a-fA-F]{64}$")  # of the file bytes
+    filename: Optional[str] = None
+
+
 # In-memory storage (replace with database in production)
 analysis_storage = {}
 payment_storage = {}
+batch_storage = {}
+# SHA-256 of an uploaded file -> analysis_id of its latest completed analysis
+document_index = {}
+
+# Running batch collector tasks (strong references until they finish)
+batch_tasks = set()
 
 
 @app.get("/")
@@ -96,6 +161,12 @@ async def root():
         "endpoints": {
             "health": "/health",
             "analyze": "/api/analyze",
+            "analyze_stream": "/api/analyze/stream",
+            "analyze_preflight": "/api/analyze/preflight",
+            "analysis_status": "/api/analysis/{analysis_id}",
+            "simulate_score": "/api/analysis/{analysis_id}/simulate",
+            "analyze_batch": "/api/analyze/batch",
+            "batch_status": "/api/batch/{batch_id}",
             "create_payment": "/api/create-payment",
             "capture_payment": "/api/capture-payment",
             "download_report": "/api/download-report/{analysis_id}",
@@ -115,68 +186,566 @@ async def health_check():
         "status": "healthy",
         "anthropic_configured": anthropic_configured,
         "paypal_configured": paypal_configured,
+        "analysis_cache": get_cache_stats(),
+        "near_duplicates": get_near_duplicate_stats(),
+        "model_cascade": get_cascade_stats(),
+        "extraction_pool": get_extraction_stats(),
+        "anthropic_pool": get_connection_stats(),
+        "token_usage": get_token_usage(),
+        "analysis_jobs": analysis_jobs.stats(),
+        "batches_running": len(batch_tasks),
+        "claude_resilience": get_resilience_stats(),
         "timestamp": datetime.now().isoformat(),
     }
 
 
-@app.post("/api/analyze")
-async def analyze_endpoint(file: UploadFile = File(...)):
+def ensure_claude_available():
+    """
+    Fail fast with 503 while the Claude circuit breaker is open
+    instead of queueing uploads behind an API incident
+    """
+    if claude_breaker.is_open():
+        raise HTTPException(
+            status_code=503,
+            detail="Analysis service temporarily unavailable. Please try again shortly.",
+            headers={"Retry-After": str(int(CIRCUIT_RESET_SECONDS))},
+        )
+
+
+# Request body schema of the endpoints that parse their upload themselves
+UPLOAD_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "required": ["file"],
+                    "properties": {"file": {"type": "string", "format": "binary"}},
+                }
+            }
+        },
+    }
+}
+
+
+async def receive_upload(request: Request) -> IngestedUpload:
+    """
+    Stream the PDF/DOCX upload of a multipart request (field "file")
+    Size limit and file type are checked while the bytes arrive
+    Raises HTTPException for invalid uploads
+    """
+    try:
+        return await ingest_multipart(request.headers, request.stream())
+    except UploadRejectedError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+async def read_upload(file: UploadFile) -> IngestedUpload:
+    """
+    Validate an already received PDF/DOCX upload (type, size, format)
+    Raises HTTPException for invalid uploads
+    """
+    try:
+        return await read_upload_file(file)
+    except UploadRejectedError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+async def extract_plan_text(content: bytes, content_type: str) -> str:
+    """
+    Extract text from uploaded file bytes (isolated worker process)
+    Raises HTTPException if the document has no readable text
+    or exceeds the extraction time/memory limits
+    """
+    try:
+        text = await extract_text_isolated(content, content_type)
+    except ExtractionRejectedError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if not text or len(text.strip()) < 100:
+        raise HTTPException(
+            status_code=400,
+            detail="Could not extract sufficient text from file. Please ensure the document contains readable text.",
+        )
+
+    return text
+
+
+async def extract_upload_text(upload: IngestedUpload) -> str:
+    """Extract the text of a received PDF/DOCX upload"""
+    return await extract_plan_text(upload.content, upload.content_type)
+
+
+def get_previous_analysis(previous_analysis_id: Optional[str]) -> Optional[dict]:
+    """
+    Stored analysis a revised plan is compared against (None without ID)
+    Raises HTTPException if it does not exist or has no plan text
+    """
+    if previous_analysis_id is None:
+        return None
+    entry = analysis_storage.get(previous_analysis_id)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="Previous analysis not found.")
+    if entry.get("status", "done") != "done" or not entry.get("plan_text"):
+        raise HTTPException(status_code=409, detail="Previous analysis is not available for re-analysis.")
+    return entry
+
+
+async def run_upload_analysis(text: str, previous: Optional[dict] = None) -> dict:
+    """
+    Analysis run at upload: scoring phase only in two-phase mode,
+    incremental re-analysis when a previous analysis of the plan is given
+    """
+    if previous is not None:
+        return await reanalyze_business_plan_async(text, previous["result"], previous["plan_text"])
+    if ANALYSIS_TWO_PHASE:
+        return await score_business_plan_async(text)
+    return await analyze_business_plan_async(text)
+
+
+def store_analysis(
+    result: dict,
+    upload: IngestedUpload,
+    plan_text: Optional[str] = None,
+    previous_analysis_id: Optional[str] = None,
+) -> str:
+    """Store analysis result under a new analysis ID and return the ID"""
+    analysis_id = str(uuid.uuid4())
+
+    analysis_storage[analysis_id] = {
+        "status": "done",
+        "result": result,
+        "timestamp": datetime.now().isoformat(),
+        "filename": upload.filename,
+        "content_sha256": upload.sha256,
+        "paid": False,
+        "plan_text": plan_text,
+        "previous_analysis_id": previous_analysis_id,
+    }
+
+    # Add analysis_id to result
+    result["analysis_id"] = analysis_id
+    register_document(analysis_id)
+    return analysis_id
+
+
+def visible_result(entry: dict) -> dict:
+    """Stored result as served to the client: in two-phase mode without fixes and texts until paid"""
+    if ANALYSIS_TWO_PHASE and not entry.get("paid"):
+        return strip_paid_fields(entry["result"])
+    return entry["result"]
+
+
+def register_document(analysis_id: str):
+    """Make a completed analysis findable by the SHA-256 of its upload"""
+    entry = analysis_storage[analysis_id]
+    if entry.get("content_sha256") and entry.get("status") == "done" and not entry["result"].get("error"):
+        document_index[entry["content_sha256"]] = analysis_id
+
+
+def reuse_known_document(content_sha256: str, filename: Optional[str] = None) -> Optional[dict]:
+    """
+    Copy of the completed analysis of an identical file under a new
+    analysis ID (own payment state), None if the file is unknown
+    """
+    known_id = document_index.get(content_sha256)
+    known = analysis_storage.get(known_id) if known_id else None
+    if known is None or known.get("status") != "done":
+        return None
+
+    analysis_id = str(uuid.uuid4())
+    result = copy.deepcopy(known["result"])
+    if ANALYSIS_TWO_PHASE and result.get("analysis_phase") != "scoring":
+        # The original may have been paid for - the copy starts at the scoring phase again
+        result = as_scoring_result(result)
+    result["analysis_id"] = analysis_id
+    analysis_storage[analysis_id] = {
+        "status": "done",
+        "result": result,
+        "timestamp": datetime.now().isoformat(),
+        "filename": filename or known.get("filename"),
+        "content_sha256": content_sha256,
+        "paid": False,
+        "plan_text": known.get("plan_text"),
+        "previous_analysis_id": None,
+        "duplicate_of": known_id,
+    }
+    return result
+
+
+async def run_analysis_job(analysis_id: str, content: bytes, content_type: str):
+    """Background job: extract text and analyze, update job status in storage"""
+    entry = analysis_storage[analysis_id]
+    entry["status"] = "running"
+    entry["started_at"] = datetime.now().isoformat()
+
+    try:
+        text = await extract_plan_text(content, content_type)
+        previous = analysis_storage.get(entry.get("previous_analysis_id") or "")
+        result = await run_upload_analysis(text, previous)
+        result["analysis_id"] = analysis_id
+        entry["plan_text"] = text
+        entry["result"] = result
+        entry["status"] = "done"
+        register_document(analysis_id)
+    except HTTPException as e:
+        entry["error"] = e.detail
+        entry["status"] = "failed"
+    except Exception as e:
+        entry["error"] = f"Analysis failed: {str(e)}"
+        entry["status"] = "failed"
+    finally:
+        entry["finished_at"] = datetime.now().isoformat()
+
+
+def enqueue_analysis(upload: IngestedUpload, previous_analysis_id: Optional[str] = None) -> str:
+    """Register a queued analysis and hand it to the background workers"""
+    analysis_id = str(uuid.uuid4())
+
+    analysis_storage[analysis_id] = {
+        "status": "queued",
+        "result": None,
+        "timestamp": datetime.now().isoformat(),
+        "filename": upload.filename,
+        "content_sha256": upload.sha256,
+        "paid": False,
+        "previous_analysis_id": previous_analysis_id,
+    }
+
+    try:
+        analysis_jobs.submit(lambda: run_analysis_job(analysis_id, upload.content, upload.content_type))
+    except QueueFullError:
+        del analysis_storage[analysis_id]
+        raise HTTPException(
+            status_code=503, detail="Too many analyses in progress. Please try again shortly."
+        )
+
+    return analysis_id
+
+
+# Running phase-2 generations per analysis_id (shared by create- and capture-payment)
+generation_tasks = {}
+
+
+async def _generate_full_analysis(analysis_id: str) -> dict:
+    entry = analysis_storage[analysis_id]
+    try:
+        result = await complete_business_plan_analysis_async(entry["result"], entry["plan_text"])
+        result["analysis_id"] = analysis_id
+        entry["result"] = result
+        return result
+    finally:
+        generation_tasks.pop(analysis_id, None)
+
+
+async def ensure_complete_analysis(analysis_id: str) -> dict:
+    """
+    Return the complete analysis, running the generation phase
+    (fixes + copy-paste texts) first if only the scoring phase exists
+    """
+    entry = analysis_storage[analysis_id]
+    if entry["result"].get("analysis_phase") != "scoring" or not entry.get("plan_text"):
+        return entry["result"]
+
+    task = generation_tasks.get(analysis_id)
+    if task is None:
+        task = asyncio.ensure_future(_generate_full_analysis(analysis_id))
+        generation_tasks[analysis_id] = task
+    return await asyncio.shield(task)
+
+
+def format_sse(event: str, data) -> str:
+    """Format one Server-Sent-Events message"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@app.post("/api/analyze", openapi_extra=UPLOAD_OPENAPI)
+async def analyze_endpoint(
+    request: Request,
+    mode: str = Query("sync"),
+    previous_analysis_id: Optional[str] = Query(None),
+):
     """
     Analyze business plan from uploaded PDF/DOCX
     Returns analysis with score, risk level, and top issues
+
+    mode=async: returns 202 with the analysis_id immediately,
+    poll GET /api/analysis/{analysis_id} for status and result
+
+    previous_analysis_id: the upload is a revised version of that plan -
+    only criteria of changed sections are re-evaluated, the rest is carried over
+
+    The upload is parsed while it arrives; oversized or non-PDF/DOCX
+    files are rejected before the rest of the body is read
     """
     try:
-        # Validate file type
-        allowed_types = [
-            "application/pdf",
-            "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-        ]
-        if file.content_type not in allowed_types:
-            raise HTTPException(
-                status_code=400,
-                detail="Invalid file type. Only PDF and DOCX files are supported.",
+        previous = get_previous_analysis(previous_analysis_id)
+        upload = await receive_upload(request)
+
+        # Identical file analyzed before: no extraction, no Claude call -
+        # served even while the Claude circuit is open
+        known = reuse_known_document(upload.sha256, upload.filename) if previous is None else None
+        if known is not None:
+            if mode == "async":
+                return JSONResponse(
+                    status_code=202,
+                    content={
+                        "analysis_id": known["analysis_id"],
+                        "status": "done",
+                        "status_url": f"/api/analysis/{known['analysis_id']}",
+                    },
+                )
+            return known
+
+        ensure_claude_available()
+
+        if mode == "async":
+            analysis_id = enqueue_analysis(upload, previous_analysis_id)
+            return JSONResponse(
+                status_code=202,
+                content={
+                    "analysis_id": analysis_id,
+                    "status": "queued",
+                    "status_url": f"/api/analysis/{analysis_id}",
+                },
             )
 
-        # Validate file size (max 5MB)
-        content = await file.read()
-        if len(content) > 5 * 1024 * 1024:
-            raise HTTPException(
-                status_code=400, detail="File too large. Maximum size is 5MB."
-            )
+        text = await extract_upload_text(upload)
 
-        # Extract text from file
-        text = extract_text_from_file(content, file.content_type)
+        # Analyze with Claude (non-blocking, event loop keeps serving)
+        result = await run_upload_analysis(text, previous)
 
-        if not text or len(text.strip()) < 100:
-            raise HTTPException(
-                status_code=400,
-                detail="Could not extract sufficient text from file. Please ensure the document contains readable text.",
-            )
+        analysis_id = store_analysis(result, upload, text, previous_analysis_id)
 
-        # Analyze with Claude
-        result = analyze_business_plan(text)
+        return visible_result(analysis_storage[analysis_id])
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
+
+
+@app.post("/api/analyze/preflight")
+async def analyze_preflight_endpoint(request: PreflightRequest):
+    """
+    Hash-first upload: the client sends the SHA-256 of the file before the file
+    Known file: {"status": "known", "analysis": ...} under a new analysis_id
+    (no upload, no extraction, no Claude call)
+    Unknown file: {"status": "send_bytes"} - upload it to /api/analyze as usual
+    """
+    analysis = reuse_known_document(request.sha256.lower(), request.filename)
+    if analysis is None:
+        return {"status": "send_bytes", "upload_url": "/api/analyze"}
+    return {"status": "known", "analysis": analysis}
+
+
+@app.get("/api/analysis/{analysis_id}")
+async def get_analysis_endpoint(analysis_id: str):
+    """
+    Status and result of an analysis
+    status: queued | running | done | failed
+    Returns 202 while the analysis is still queued or running.
+    Fixes and copy-paste texts are only included after payment.
+    """
+    if analysis_id not in analysis_storage:
+        raise HTTPException(status_code=404, detail="Analysis not found.")
+
+    entry = analysis_storage[analysis_id]
+    status = entry.get("status", "done")
+
+    if status == "done":
+        return {**visible_result(entry), "analysis_id": analysis_id, "status": status}
+
+    if status == "failed":
+        return {"analysis_id": analysis_id, "status": status, "error": entry.get("error")}
+
+    return JSONResponse(
+        status_code=202,
+        content={"analysis_id": analysis_id, "status": status},
+    )
+
+
+@app.post("/api/analysis/{analysis_id}/simulate")
+async def simulate_score_endpoint(analysis_id: str, request: SimulationRequest):
+    """
+    What-if score for a subset of fixes, e.g. {"fixes": ["G4", "F1"]}
+    Computed locally from the stored checklist - never calls Claude
+    """
+    entry = analysis_storage.get(analysis_id)
+    if entry is None or entry.get("status", "done") != "done":
+        raise HTTPException(status_code=404, detail="Analysis not found.")
+
+    return {"analysis_id": analysis_id, **ScoreModel.from_result(entry["result"]).simulate(request.fixes)}
 
-        # Generate unique analysis ID
-        analysis_id = str(uuid.uuid4())
 
-        # Store analysis result
-        analysis_storage[analysis_id] = {
-            "result": result,
+async def run_batch_job(batch_id: str, plans: dict):
+    """Background task: submit the batch and store every result as it arrives"""
+    batch = batch_storage[batch_id]
+    batch["status"] = "running"
+    for analysis_id in plans:
+        analysis_storage[analysis_id]["status"] = "running"
+
+    def on_result(analysis_id: str, result: dict):
+        result = dict(result)
+        result["analysis_id"] = analysis_id
+        entry = analysis_storage[analysis_id]
+        entry["result"] = result
+        entry["status"] = "done"
+        entry["finished_at"] = datetime.now().isoformat()
+        register_document(analysis_id)
+
+    try:
+        stats = await run_batch_analysis(plans, on_result)
+        batch["provider_batch_id"] = stats["batch_id"]
+        batch["stats"] = stats
+        batch["status"] = "done"
+    except Exception as e:
+        batch["status"] = "failed"
+        batch["error"] = f"Batch failed: {str(e)}"
+        for analysis_id in plans:
+            entry = analysis_storage[analysis_id]
+            if entry["status"] != "done":
+                entry["status"] = "failed"
+                entry["error"] = batch["error"]
+    finally:
+        batch["finished_at"] = datetime.now().isoformat()
+
+
+@app.post("/api/analyze/batch")
+async def analyze_batch_endpoint(files: List[UploadFile] = File(...)):
+    """
+    Bulk analysis for B2B customers (many plans in one upload)
+    Extracts all documents in parallel and submits the Claude requests
+    as one message batch. Returns 202 with batch_id and one analysis_id
+    per file, poll GET /api/batch/{batch_id} for progress
+    """
+    if len(files) > BATCH_MAX_FILES:
+        raise HTTPException(
+            status_code=400, detail=f"Too many files. Maximum is {BATCH_MAX_FILES} per batch."
+        )
+
+    async def read_and_extract(file: UploadFile) -> Tuple[str, str]:
+        upload = await read_upload(file)
+        return upload.sha256, await extract_upload_text(upload)
+
+    extracted = await asyncio.gather(*(read_and_extract(f) for f in files), return_exceptions=True)
+
+    batch_id = str(uuid.uuid4())
+    plans = {}
+    analyses = []
+    for file, upload in zip(files, extracted):
+        analysis_id = str(uuid.uuid4())
+        entry = {
+            "status": "queued",
+            "result": None,
             "timestamp": datetime.now().isoformat(),
             "filename": file.filename,
             "paid": False,
+            "batch_id": batch_id,
         }
+        if isinstance(upload, Exception):
+            entry["status"] = "failed"
+            entry["error"] = upload.detail if isinstance(upload, HTTPException) else f"Analysis failed: {str(upload)}"
+        else:
+            # Hash kept so finished batch results are found by single uploads
+            entry["content_sha256"], entry["plan_text"] = upload
+            plans[analysis_id] = entry["plan_text"]
+        analysis_storage[analysis_id] = entry
+        analyses.append({"analysis_id": analysis_id, "filename": file.filename, "status": entry["status"]})
+
+    batch_storage[batch_id] = {
+        "status": "queued" if plans else "done",
+        "analysis_ids": [a["analysis_id"] for a in analyses],
+        "timestamp": datetime.now().isoformat(),
+    }
 
-        # Add analysis_id to result
-        result["analysis_id"] = analysis_id
+    if plans:
+        task = asyncio.create_task(run_batch_job(batch_id, plans))
+        batch_tasks.add(task)
+        task.add_done_callback(batch_tasks.discard)
+
+    return JSONResponse(
+        status_code=202,
+        content={
+            "batch_id": batch_id,
+            "status": batch_storage[batch_id]["status"],
+            "status_url": f"/api/batch/{batch_id}",
+            "analyses": analyses,
+        },
+    )
 
-        return result
 
+@app.get("/api/batch/{batch_id}")
+async def get_batch_endpoint(batch_id: str):
+    """
+    Progress of a bulk analysis
+    Lists every analysis with status and, once done, score and risk level
+    """
+    if batch_id not in batch_storage:
+        raise HTTPException(status_code=404, detail="Batch not found.")
+
+    batch = batch_storage[batch_id]
+    analyses = []
+    counts = {"queued": 0, "running": 0, "done": 0, "failed": 0}
+    for analysis_id in batch["analysis_ids"]:
+        entry = analysis_storage.get(analysis_id)
+        if entry is None:
+            continue
+        counts[entry["status"]] = counts.get(entry["status"], 0) + 1
+        item = {"analysis_id": analysis_id, "filename": entry.get("filename"), "status": entry["status"]}
+        if entry["status"] == "done":
+            item["score"] = entry["result"].get("score")
+            item["risk_level"] = entry["result"].get("risk_level")
+        elif entry["status"] == "failed":
+            item["error"] = entry.get("error")
+        analyses.append(item)
+
+    return {
+        "batch_id": batch_id,
+        "status": batch["status"],
+        "counts": counts,
+        "analyses": analyses,
+        "error": batch.get("error"),
+    }
+
+
+@app.post("/api/analyze/stream", openapi_extra=UPLOAD_OPENAPI)
+async def analyze_stream_endpoint(request: Request):
+    """
+    Streaming variant of /api/analyze (Server-Sent Events)
+    Emits score, risk_level, business_name, detected_industry,
+    positive_aspects and one "issue" event per issue as soon as Claude
+    has generated them, then a final "result" event with analysis_id
+    """
+    try:
+        upload = await receive_upload(request)
+        known = reuse_known_document(upload.sha256, upload.filename)
+        if known is None:
+            ensure_claude_available()
+        text = await extract_upload_text(upload) if known is None else None
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
 
+    async def event_stream():
+        if known is not None:
+            yield format_sse("result", known)
+            return
+        async for message in stream_business_plan_analysis(text):
+            if message["event"] == "result":
+                analysis_id = store_analysis(message["data"], upload, text)
+                yield format_sse("result", visible_result(analysis_storage[analysis_id]))
+                continue
+            yield format_sse(message["event"], message["data"])
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 
 @app.post("/api/create-payment")
 async def create_payment_endpoint(payment_request: PaymentRequest):
@@ -191,6 +760,9 @@ async def create_payment_endpoint(payment_request: PaymentRequest):
             print(f"❌ DEBUG: Analysis not found: {payment_request.analysis_id}")
             raise HTTPException(status_code=404, detail="Analysis not found...")
 
+        if analysis_storage[payment_request.analysis_id].get("status", "done") != "done":
+            raise HTTPException(status_code=409, detail="Analysis not finished yet.")
+
         print(f"✅ DEBUG: Analysis found, creating PayPal order...")
 
         # Create PayPal order
@@ -214,6 +786,12 @@ async def create_payment_endpoint(payment_request: PaymentRequest):
         print(f"✅ DEBUG: Payment stored in memory")
         print(f"📦 DEBUG: payment_storage keys: {list(payment_storage.keys())}")
 
+        # Speculatively generate the paid part of the analysis while the user is at PayPal
+        try:
+            analysis_jobs.submit(lambda: ensure_complete_analysis(payment_request.analysis_id))
+        except QueueFullError:
+            pass
+
         return {
             "success": True,
             "order_id": order["order_id"],
@@ -248,19 +826,21 @@ async def capture_payment_endpoint(capture_request: CapturePaymentRequest):
         if capture_request.analysis_id not in analysis_storage:
             raise HTTPException(status_code=404, detail="Analysis not found.")
 
-        # Capture PayPal payment
-        capture_result = capture_order(capture_request.order_id)
+        payment = payment_storage[capture_request.order_id]
 
-        if not capture_result.get("completed", False):
-            raise HTTPException(
-                status_code=400, detail="Payment capture failed. Please try again."
-            )
+        # Capture PayPal payment (already captured: retry after a failed report generation)
+        if payment.get("status") != "completed":
+            capture_result = capture_order(capture_request.order_id)
+
+            if not capture_result.get("completed", False):
+                raise HTTPException(
+                    status_code=400, detail="Payment capture failed. Please try again."
+                )
 
-        # Update payment status
-        payment_storage[capture_request.order_id]["status"] = "completed"
-        payment_storage[capture_request.order_id][
-            "captured_at"
-        ] = datetime.now().isoformat()
+            # Update payment status
+            payment["status"] = "completed"
+            payment["captured_at"] = datetime.now().isoformat()
+            payment["capture_id"] = capture_result.get("capture_id")
 
         # Mark analysis as paid
         analysis_storage[capture_request.analysis_id]["paid"] = True
@@ -271,8 +851,16 @@ async def capture_payment_endpoint(capture_request: CapturePaymentRequest):
             "customer_name"
         ] = capture_request.customer_name
 
-        # Get analysis result
-        analysis_result = analysis_storage[capture_request.analysis_id]["result"]
+        # Get analysis result (incl. copy-paste texts in two-phase mode)
+        try:
+            analysis_result = await ensure_complete_analysis(capture_request.analysis_id)
+        except Exception as e:
+            print(f"❌ Report generation failed after payment {capture_request.order_id}: {str(e)}")
+            raise HTTPException(
+                status_code=503,
+                detail="Payment received, but the report could not be generated yet. "
+                "Please retry - you will not be charged again.",
+            )
 
         # Generate PDF report
         reports_dir = os.path.join(os.path.dirname(__file__), "reports")
@@ -305,7 +893,7 @@ async def capture_payment_endpoint(capture_request: CapturePaymentRequest):
             "message": "Payment successful! Report has been sent to your email.",
             "download_url": f"/api/download-report/{capture_request.analysis_id}",
             "order_id": capture_request.order_id,
-            "capture_id": capture_result.get("capture_id"),
+            "capture_id": payment.get("capture_id"),
         }
 
     except HTTPException:
@@ -392,6 +980,14 @@ async def generate_report(data: dict):
     try:
         from pdf_generator import generate_report_pdf
         
+        # Stored analyses: complete report only after payment, otherwise the free part
+        entry = analysis_storage.get(data.get("analysis_id") or "")
+        if entry is not None and entry.get("status", "done") == "done":
+            if entry.get("paid"):
+                data = await ensure_complete_analysis(data["analysis_id"])
+            else:
+                data = visible_result(entry)
+        
         pdf_bytes = generate_report_pdf(data)
         
         safe_name = data.get('business_name', 'Report').replace(" ", "_")[:30]
@@ -472,6 +1068,9 @@ async def dev_report_generation(analysis_id: str):
         if analysis_id not in analysis_storage:
             raise HTTPException(status_code=404, detail="Analysis not found.")
 
+        if analysis_storage[analysis_id].get("status", "done") != "done":
+            raise HTTPException(status_code=409, detail="Analysis not finished yet.")
+
         # Get analysis result
         analysis_result = analysis_storage[analysis_id]["result"]
 
@@ -0,0 +1,164 @@
+"""
+Model Cascade für GründerAI
+Fast model first, the analysis model only when the first pass is not reliable
+
+Most uploads are clear cases - K.O. hits or plans far from a risk band
+boundary. With MODEL_CASCADE_ENABLED the analysis runs on
+CASCADE_FAST_MODEL first and is escalated to the analysis model when
+- the answer fails validation (unparseable, keys or criteria missing,
+  score out of range)
+- confidence is low: stated score and checklist points disagree, or the
+  checklist contradicts the local checks (K.O. pre-screen, F1)
+- the score is within CASCADE_BAND_MARGIN points of a risk band boundary
+  (not for K.O. plans - their score is capped anyway)
+Routing decisions, escalation reasons, latency and tokens per tier are
+reported under model_cascade in /health.
+"""
+
+import os
+import threading
+from typing import Dict, Iterable, NamedTuple, Optional
+from dotenv import load_dotenv
+
+from criteria_registry import criteria_registry
+from score_simulator import STATUS_WEIGHTS, RISK_BANDS
+from llm_resilience import LatencyTracker
+from llm_client import TokenUsageStats
+
+load_dotenv()
+
+MODEL_CASCADE_ENABLED = os.getenv("MODEL_CASCADE_ENABLED", "false").lower() == "true"
+CASCADE_FAST_MODEL = os.getenv("CASCADE_FAST_MODEL", "claude-3-5-haiku-20241022")
+CASCADE_MIN_CONFIDENCE = float(os.getenv("CASCADE_MIN_CONFIDENCE", "0.6"))
+CASCADE_BAND_MARGIN = int(os.getenv("CASCADE_BAND_MARGIN", "5"))
+
+# Gap between stated score and checklist points at which confidence is zero
+MAX_SCORE_GAP = 40
+# Share of the criteria the checklist has to cover
+MIN_CHECKLIST_COVERAGE = 0.9
+
+TIERS = ("fast", "large")
+
+
+class CascadeDecision(NamedTuple):
+    escalate: bool
+    reason: Optional[str]  # validation | low_confidence | band_boundary | fast_model_error
+    confidence: float
+
+    def to_dict(self) -> Dict:
+        return {"escalated": self.escalate, "reason": self.reason, "confidence": round(self.confidence, 3)}
+
+
+def checklist_points(checklist: Dict) -> float:
+    """Score (0-100) implied by the checklist statuses and max_points"""
+    points = sum(
+        STATUS_WEIGHTS.get(str(checklist.get(c.id, "")).upper(), 0.0) * c.max_points
+        for c in criteria_registry.criteria
+    )
+    return points * 100 / criteria_registry.total_points
+
+
+def validation_error(raw_analysis: Dict, required_keys: Iterable[str]) -> Optional[str]:
+    """Why a first-pass answer is unusable, None if it is complete"""
+    missing = [key for key in required_keys if key not in raw_analysis]
+    if missing:
+        return f"missing {', '.join(missing)}"
+    score = raw_analysis.get("score")
+    if not isinstance(score, (int, float)) or not 0 <= score <= 100:
+        return "score out of range"
+    checklist = raw_analysis.get("criteria_checklist")
+    if not isinstance(checklist, dict) or not isinstance(raw_analysis.get("issues"), list):
+        return "malformed checklist or issues"
+    covered = sum(1 for cid in criteria_registry.ids if cid in checklist)
+    if covered < MIN_CHECKLIST_COVERAGE * len(criteria_registry.ids):
+        return "criteria missing"
+    return None
+
+
+def confidence(raw_analysis: Dict, local_checklist: Dict) -> float:
+    """
+    Self-consistency of a first-pass answer (0-1): stated score vs.
+    checklist points, and agreement with the locally decided criteria
+    """
+    checklist = raw_analysis["criteria_checklist"]
+    gap = abs(raw_analysis["score"] - checklist_points(checklist))
+    consistency = max(0.0, 1.0 - gap / MAX_SCORE_GAP)
+    if not local_checklist:
+        return consistency
+    agreeing = sum(
+        1 for cid, status in local_checklist.items()
+        if str(checklist.get(cid, "")).upper() == status
+    )
+    return min(consistency, agreeing / len(local_checklist))
+
+
+def near_band_boundary(score: float) -> bool:
+    return any(0 < threshold and abs(score - threshold) < CASCADE_BAND_MARGIN for threshold, _ in RISK_BANDS)
+
+
+def decide_escalation(
+    raw_analysis: Dict, required_keys: Iterable[str], local_checklist: Dict, knockout: bool = False
+) -> CascadeDecision:
+    """Whether the fast model's answer has to be redone by the analysis model"""
+    if validation_error(raw_analysis, required_keys) is not None:
+        return CascadeDecision(True, "validation", 0.0)
+    if knockout:
+        # KRITISCH verdict and capped score regardless of the details
+        return CascadeDecision(False, None, 1.0)
+    value = confidence(raw_analysis, local_checklist)
+    if value < CASCADE_MIN_CONFIDENCE:
+        return CascadeDecision(True, "low_confidence", value)
+    if near_band_boundary(raw_analysis["score"]):
+        return CascadeDecision(True, "band_boundary", value)
+    return CascadeDecision(False, None, value)
+
+
+class CascadeStats:
+    """Routing decisions plus latency and tokens per tier"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.decisions = 0
+        self.escalations: Dict[str, int] = {}
+        self.latency = {tier: LatencyTracker() for tier in TIERS}
+        self.usage = {tier: TokenUsageStats() for tier in TIERS}
+
+    def record_call(self, tier: str, seconds: float, usage=None):
+        self.latency[tier].record(seconds)
+        self.usage[tier].record(usage)
+
+    def record_decision(self, decision: CascadeDecision):
+        with self._lock:
+            self.decisions += 1
+            if decision.escalate:
+                self.escalations[decision.reason] = self.escalations.get(decision.reason, 0) + 1
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            escalated = sum(self.escalations.values())
+            routing = {
+                "decisions": self.decisions,
+                "escalations": dict(self.escalations),
+                "escalation_rate": round(escalated / self.decisions, 3) if self.decisions else None,
+            }
+        tiers = {}
+        for tier in TIERS:
+            p50 = self.latency[tier].percentile(0.5)
+            p95 = self.latency[tier].percentile(0.95)
+            usage = self.usage[tier].snapshot()
+            tiers[tier] = {
+                "calls": usage["calls"],
+                "latency_p50_seconds": round(p50, 2) if p50 is not None else None,
+                "latency_p95_seconds": round(p95, 2) if p95 is not None else None,
+                "input_tokens": usage["input_tokens"],
+                "output_tokens": usage["output_tokens"],
+            }
+        return {"enabled": MODEL_CASCADE_ENABLED, "fast_model": CASCADE_FAST_MODEL, **routing, "tiers": tiers}
+
+
+cascade_stats = CascadeStats()
+
+
+def get_cascade_stats() -> Dict:
+    """Model routing statistics for /health"""
+    return cascade_stats.snapshot()
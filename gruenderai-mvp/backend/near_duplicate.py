@@ -0,0 +1,289 @@
+"""
+Near-Duplicate Detection für GründerAI
+MinHash / LSH index over analyzed plans
+
+Users re-upload a plan after tweaking a paragraph - the exact-hash cache
+misses, the result would be almost identical. Every stored analysis gets
+a MinHash signature of its word shingles, bucketed by LSH bands:
+- band hashes live in one sorted NumPy array (+ a small dict of recent
+  inserts), ~40 MB for 200k plans instead of millions of Python buckets
+- lookup: one searchsorted + vectorized signature comparison of the
+  candidates (sub-millisecond, independent of the index size)
+- similarity >= NEAR_DUPLICATE_SEED_THRESHOLD: seed the new analysis with
+  the previous score and checklist. The previous result is never served
+  as is - it may be another uploader's plan, and business name, summary
+  and issue texts would leak across users.
+Signatures are persisted next to the analysis cache (JSON lines).
+"""
+
+import os
+import json
+import time
+import zlib
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Optional
+import numpy as np
+from dotenv import load_dotenv
+
+from analysis_cache import ANALYSIS_CACHE_DIR, ANALYSIS_CACHE_TTL_HOURS
+
+load_dotenv()
+
+NEAR_DUPLICATE_ENABLED = os.getenv("NEAR_DUPLICATE_ENABLED", "true").lower() == "true"
+NEAR_DUPLICATE_SEED_THRESHOLD = float(os.getenv("NEAR_DUPLICATE_SEED_THRESHOLD", "0.8"))
+NEAR_DUPLICATE_MAX_ENTRIES = int(os.getenv("NEAR_DUPLICATE_MAX_ENTRIES", "200000"))
+NEAR_DUPLICATE_INDEX_PATH = os.getenv(
+    "NEAR_DUPLICATE_INDEX_PATH",
+    os.path.join(ANALYSIS_CACHE_DIR, "similarity_index.jsonl") if ANALYSIS_CACHE_DIR else "",
+)
+
+SHINGLE_WORDS = 5
+NUM_PERMUTATIONS = 64
+LSH_BANDS = 16  # 16 bands x 4 rows: candidates from ~50 % similarity on
+LSH_ROWS = NUM_PERMUTATIONS // LSH_BANDS
+# Recent inserts are merged into the sorted band array in bulk
+MIN_MERGE_SIZE = 4096
+
+# Multiply-shift hashing in wrapping uint64 arithmetic (no modulo).
+# Fixed seed: signatures must stay comparable across restarts
+_rng = np.random.RandomState(20240611)
+_PERM_A = (_rng.randint(0, 1 << 62, size=(NUM_PERMUTATIONS, 1), dtype=np.int64).astype(np.uint64) << np.uint64(1)) | np.uint64(1)
+_PERM_B = _rng.randint(0, 1 << 62, size=(NUM_PERMUTATIONS, 1), dtype=np.int64).astype(np.uint64)
+_BAND_MULTIPLIERS = (_rng.randint(0, 1 << 62, size=LSH_ROWS // 2, dtype=np.int64).astype(np.uint64) << np.uint64(1)) | np.uint64(1)
+_BAND_SALTS = _rng.randint(0, 1 << 62, size=LSH_BANDS, dtype=np.int64).astype(np.uint64)
+_SHINGLE_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+_SHIFT = np.uint64(32)
+
+def _tag_hash(tag: str) -> np.uint64:
+    return np.uint64((zlib.crc32(tag.encode("utf-8")) * int(_SHINGLE_MULTIPLIER)) & 0xFFFFFFFFFFFFFFFF)
+
+
+def band_hashes(signatures: np.ndarray, tag_hash) -> np.ndarray:
+    """One uint64 per LSH band (and tag) for a signature or a signature matrix"""
+    pairs = np.ascontiguousarray(signatures).view(np.uint64).reshape(signatures.shape[:-1] + (LSH_BANDS, LSH_ROWS // 2))
+    return (pairs * _BAND_MULTIPLIERS).sum(axis=-1) + _BAND_SALTS + tag_hash
+
+
+class SimilarityMatch(NamedTuple):
+    key: str
+    similarity: float
+
+    def to_dict(self) -> Dict:
+        return {"similarity": round(self.similarity, 3), "source": self.key[:12]}
+
+
+def minhash_signature(text: str) -> Optional[np.ndarray]:
+    """MinHash signature of the word shingles, None for too short texts"""
+    words = unicodedata.normalize("NFC", text or "").lower().split()
+    if len(words) < SHINGLE_WORDS:
+        return None
+    vocabulary = {word: zlib.crc32(word.encode("utf-8")) for word in set(words)}
+    word_hashes = np.fromiter(map(vocabulary.__getitem__, words), dtype=np.uint64, count=len(words))
+    count = len(words) - SHINGLE_WORDS + 1
+    shingles = word_hashes[:count].copy()
+    for offset in range(1, SHINGLE_WORDS):
+        shingles = shingles * _SHINGLE_MULTIPLIER + word_hashes[offset:offset + count]
+    shingles = np.unique(shingles >> _SHIFT)
+    return ((_PERM_A * shingles + _PERM_B) >> _SHIFT).min(axis=1).astype(np.uint32)
+
+
+class PlanSimilarityIndex:
+    """LSH-banded MinHash index: cache key → signature, scoped by tag (prompt version/variant)"""
+
+    def __init__(
+        self,
+        path: Optional[str] = NEAR_DUPLICATE_INDEX_PATH,
+        max_entries: int = NEAR_DUPLICATE_MAX_ENTRIES,
+        ttl_hours: float = ANALYSIS_CACHE_TTL_HOURS,
+        enabled: bool = NEAR_DUPLICATE_ENABLED
+    ):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_hours * 3600
+        self.enabled = enabled
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key → (row, tag, created_at)
+        self._row_keys: List[Optional[str]] = []
+        self._row_tags = np.zeros(1024, dtype=np.uint64)
+        self._signatures = np.zeros((1024, NUM_PERMUTATIONS), dtype=np.uint32)
+        self._free_rows: List[int] = []
+        self._dead_rows: List[int] = []  # evicted, still referenced by the sorted array
+        # sorted band hashes → row, plus recent inserts not merged yet
+        self._sorted_hashes = np.zeros(0, dtype=np.uint64)
+        self._sorted_rows = np.zeros(0, dtype=np.int64)
+        self._pending: Dict[int, List[int]] = {}
+        self._pending_rows = 0
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._stats = {"lookups": 0, "seeded": 0, "stores": 0, "evictions": 0}
+
+    def _allocate_row(self) -> int:
+        if self._free_rows:
+            return self._free_rows.pop()
+        row = len(self._row_keys)
+        if row == len(self._signatures):
+            self._signatures = np.concatenate([self._signatures, np.zeros_like(self._signatures)])
+            self._row_tags = np.concatenate([self._row_tags, np.zeros_like(self._row_tags)])
+        self._row_keys.append(None)
+        return row
+
+    def _insert(self, key: str, signature: np.ndarray, tag: str, created_at: float, index_bands: bool = True):
+        if key in self._entries:
+            return
+        row = self._allocate_row()
+        self._signatures[row] = signature
+        self._row_tags[row] = _tag_hash(tag)
+        self._row_keys[row] = key
+        self._entries[key] = (row, tag, created_at)
+        if index_bands:
+            for band_hash in band_hashes(signature, self._row_tags[row]).tolist():
+                self._pending.setdefault(band_hash, []).append(row)
+            self._pending_rows += 1
+        while len(self._entries) > self.max_entries:
+            self._evict_oldest()
+        if self._pending_rows >= max(MIN_MERGE_SIZE, len(self._entries) // 8):
+            self._rebuild()
+
+    def _evict_oldest(self):
+        key, (row, _, _) = self._entries.popitem(last=False)
+        self._row_keys[row] = None
+        self._dead_rows.append(row)
+        self._stats["evictions"] += 1
+
+    def _rebuild(self):
+        """Sort the band hashes of all live rows; frees evicted rows"""
+        rows = np.fromiter((row for row, _, _ in self._entries.values()), dtype=np.int64, count=len(self._entries))
+        hashes = band_hashes(self._signatures[rows], self._row_tags[rows][:, None]).ravel()
+        order = np.argsort(hashes, kind="stable")
+        self._sorted_hashes = hashes[order]
+        self._sorted_rows = np.repeat(rows, LSH_BANDS)[order]
+        self._pending = {}
+        self._pending_rows = 0
+        self._free_rows.extend(self._dead_rows)
+        self._dead_rows = []
+
+    def _ensure_loaded(self):
+        """Read persisted signatures once (expired lines are skipped and compacted away)"""
+        if self._loaded:
+            return
+        self._loaded = True
+        if not self.path or not os.path.exists(self.path):
+            return
+        lines = 0
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    lines += 1
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    if self.ttl_seconds > 0 and time.time() - entry.get("created_at", 0) > self.ttl_seconds:
+                        continue
+                    signature = np.frombuffer(bytes.fromhex(entry["signature"]), dtype=np.uint32)
+                    if len(signature) == NUM_PERMUTATIONS:
+                        self._insert(entry["key"], signature, entry["tag"], entry["created_at"], index_bands=False)
+        except OSError as e:
+            print(f"⚠️ Similarity index load failed: {str(e)}")
+        self._rebuild()
+        if lines > 2 * max(len(self._entries), 1):
+            self._compact()
+        print(f"✅ Similarity index loaded ({len(self._entries)} plans)")
+
+    def _compact(self):
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for key, (row, tag, created_at) in self._entries.items():
+                    f.write(self._line(key, tag, self._signatures[row], created_at))
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"⚠️ Similarity index compaction failed: {str(e)}")
+
+    @staticmethod
+    def _line(key: str, tag: str, signature: np.ndarray, created_at: float) -> str:
+        return json.dumps({"key": key, "tag": tag, "signature": signature.tobytes().hex(), "created_at": created_at}) + "\n"
+
+    def _append(self, key: str, tag: str, signature: np.ndarray, created_at: float):
+        if not self.path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(self._line(key, tag, signature, created_at))
+        except OSError as e:
+            print(f"⚠️ Similarity index write failed: {str(e)}")
+
+    def load(self):
+        """Load the persisted index now instead of on the first lookup"""
+        if self.enabled:
+            with self._lock:
+                self._ensure_loaded()
+
+    def add(self, key: str, text: str, tag: str):
+        """Index an analyzed plan under its cache key"""
+        if not self.enabled:
+            return
+        signature = minhash_signature(text)
+        if signature is None:
+            return
+        with self._lock:
+            self._ensure_loaded()
+            if key in self._entries:
+                return
+            created_at = time.time()
+            self._insert(key, signature, tag, created_at)
+            self._stats["stores"] += 1
+        self._append(key, tag, signature, created_at)
+
+    def find(self, text: str, tag: str, exclude: Optional[str] = None) -> Optional[SimilarityMatch]:
+        """Most similar indexed plan with the same tag, if above the seed threshold"""
+        if not self.enabled:
+            return None
+        signature = minhash_signature(text)
+        if signature is None:
+            return None
+        tag_hash = _tag_hash(tag)
+        queries = band_hashes(signature, tag_hash)
+        with self._lock:
+            self._ensure_loaded()
+            self._stats["lookups"] += 1
+            starts = np.searchsorted(self._sorted_hashes, queries, side="left")
+            ends = np.searchsorted(self._sorted_hashes, queries, side="right")
+            candidates = set()
+            for start, end in zip(starts.tolist(), ends.tolist()):
+                candidates.update(self._sorted_rows[start:end].tolist())
+            for query in queries.tolist():
+                candidates.update(self._pending.get(query, ()))
+            rows = [
+                row for row in candidates
+                if self._row_keys[row] is not None and self._row_keys[row] != exclude and self._row_tags[row] == tag_hash
+            ]
+            if not rows:
+                return None
+            similarities = (self._signatures[rows] == signature).mean(axis=1)
+            best = int(similarities.argmax())
+            key = self._row_keys[rows[best]]
+
+        similarity = float(similarities[best])
+        if similarity >= NEAR_DUPLICATE_SEED_THRESHOLD:
+            return SimilarityMatch(key, similarity)
+        return None
+
+    def record_seed(self):
+        with self._lock:
+            self._stats["seeded"] += 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                **self._stats,
+                "entries": len(self._entries),
+                "seed_threshold": NEAR_DUPLICATE_SEED_THRESHOLD,
+            }
+
+
+# Process-wide index, persisted next to the analysis cache
+similarity_index = PlanSimilarityIndex()
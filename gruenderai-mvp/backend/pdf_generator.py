@@ -25,6 +25,8 @@ from reportlab.platypus import (
 )
 from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_JUSTIFY, TA_RIGHT
 
+from criteria_registry import criteria_registry
+
 
 # ============================================
 # COLOR PALETTE (Professional & Clean)
@@ -48,70 +50,6 @@ BG_DANGER = colors.Color(1.0, 0.96, 0.95)          # #FFF5F4
 BORDER = colors.Color(0.88, 0.90, 0.92)            # #E0E5EB
 
 
-# ============================================
-# 27 BA GZ 04 KRITERIEN
-# ============================================
-BA_GZ_04_CRITERIA = {
-    "grundvoraussetzungen": {
-        "name": "Grundvoraussetzungen",
-        "criteria": [
-            {"id": "G1", "name": "Solo-Selbständigkeit"},
-            {"id": "G2", "name": "Einzelunternehmen/Freiberufler"},
-            {"id": "G3", "name": "Keine Gesellschafter"},
-            {"id": "G4", "name": "Keine Angestellten Jahr 1"},
-            {"id": "G5", "name": "Haupterwerb geplant"},
-            {"id": "G6", "name": "ALG-Anspruch vorhanden"},
-        ]
-    },
-    "finanzplanung": {
-        "name": "Finanzplanung",
-        "criteria": [
-            {"id": "F1", "name": "Realistische Umsatzprognose"},
-            {"id": "F2", "name": "Kostenaufstellung"},
-            {"id": "F3", "name": "Liquiditätsplanung"},
-            {"id": "F4", "name": "Break-Even Analyse"},
-            {"id": "F5", "name": "Kapitalbedarf"},
-            {"id": "F6", "name": "Privatentnahmen"},
-        ]
-    },
-    "marktanalyse": {
-        "name": "Marktanalyse",
-        "criteria": [
-            {"id": "M1", "name": "Zielgruppe definiert"},
-            {"id": "M2", "name": "Wettbewerbsanalyse"},
-            {"id": "M3", "name": "USP formuliert"},
-            {"id": "M4", "name": "Marktgröße"},
-            {"id": "M5", "name": "Preiskalkulation"},
-        ]
-    },
-    "geschaeftsmodell": {
-        "name": "Geschäftsmodell",
-        "criteria": [
-            {"id": "B1", "name": "Leistungsbeschreibung"},
-            {"id": "B2", "name": "Kundenakquise"},
-            {"id": "B3", "name": "Marketing-Mix"},
-            {"id": "B4", "name": "Standortwahl"},
-        ]
-    },
-    "qualifikation": {
-        "name": "Qualifikation",
-        "criteria": [
-            {"id": "Q1", "name": "Fachliche Eignung"},
-            {"id": "Q2", "name": "Kaufmännische Kenntnisse"},
-            {"id": "Q3", "name": "Branchenkontakte"},
-        ]
-    },
-    "risikobewertung": {
-        "name": "Risikobewertung",
-        "criteria": [
-            {"id": "R1", "name": "Risiken identifiziert"},
-            {"id": "R2", "name": "Gegenmaßnahmen"},
-            {"id": "R3", "name": "Plan B vorhanden"},
-        ]
-    }
-}
-
-
 def get_risk_color(risk_level: str) -> colors.Color:
     risk_map = {
         "LOW": SUCCESS, "NIEDRIG": SUCCESS,
@@ -453,7 +391,7 @@ def generate_report_pdf(analysis_result: Dict, output_path: str = None) -> bytes
     # PAGE 3: CHECKLIST
     # ==========================================
     content.append(Paragraph("BA GZ 04 Prüfprotokoll", s_h1))
-    content.append(Paragraph("27 Kriterien nach Bundesagentur für Arbeit", s_small))
+    content.append(Paragraph(f"{len(criteria_registry.ids)} Kriterien nach Bundesagentur für Arbeit", s_small))
     content.append(Spacer(1, 4*mm))
     
     # Stats
@@ -481,12 +419,12 @@ def generate_report_pdf(analysis_result: Dict, output_path: str = None) -> bytes
     content.append(Spacer(1, 5*mm))
     
     # Checklist by category
-    for cat_key, category in BA_GZ_04_CRITERIA.items():
-        content.append(Paragraph(f"<b>{category['name']}</b>", s_h3))
+    for category in criteria_registry.categories:
+        content.append(Paragraph(f"<b>{category.short_name}</b>", s_h3))
         
         rows = []
-        for c in category["criteria"]:
-            cid = c["id"]
+        for c in category.criteria:
+            cid = c.id
             status = criteria_checklist.get(cid, "NICHT_GEFUNDEN")
             symbol, color = get_status_info(status)
             has_fix = "📋" if cid in criteria_fixes else ""
@@ -495,7 +433,7 @@ def generate_report_pdf(analysis_result: Dict, output_path: str = None) -> bytes
                 Paragraph(f"<font color='#{color.hexval()[2:]}'><b>{symbol}</b></font>", 
                          ParagraphStyle('sym', fontSize=12, alignment=TA_CENTER)),
                 Paragraph(f"<b>{cid}</b>", ParagraphStyle('id', fontSize=9, textColor=TEXT_MEDIUM)),
-                Paragraph(c["name"], s_body),
+                Paragraph(c.name, s_body),
                 Paragraph(has_fix, ParagraphStyle('fx', fontSize=10, alignment=TA_CENTER)),
             ])
         
@@ -520,12 +458,12 @@ def generate_report_pdf(analysis_result: Dict, output_path: str = None) -> bytes
     content.append(Paragraph("Fertige Textbausteine für deinen Business Plan", s_small))
     content.append(Spacer(1, 5*mm))
     
-    for cat_key, category in BA_GZ_04_CRITERIA.items():
-        cat_fixes = [(c["id"], c["name"], criteria_fixes[c["id"]]) 
-                     for c in category["criteria"] if c["id"] in criteria_fixes]
+    for category in criteria_registry.categories:
+        cat_fixes = [(c.id, c.name, criteria_fixes[c.id]) 
+                     for c in category.criteria if c.id in criteria_fixes]
         
         if cat_fixes:
-            content.append(Paragraph(f"<b>{category['name']}</b>", s_h2))
+            content.append(Paragraph(f"<b>{category.short_name}</b>", s_h2))
             
             for cid, cname, fix_data in cat_fixes:
                 status = criteria_checklist.get(cid, "WARNUNG")
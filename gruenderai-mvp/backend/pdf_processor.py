@@ -1,26 +1,63 @@
 """
 PDF & DOCX Text Extraction
 Handles both PDF and Word documents
+Async variants run the CPU-bound parsing off the event loop
+
+PDF pages are extracted lazily and extraction stops once the extraction
+budget is met (EXTRACTION_TOKEN_BUDGET / EXTRACTION_MAX_CHARS) - appendix
+pages beyond it are never parsed. full=True extracts every page.
 """
 
+import os
+import asyncio
 from io import BytesIO
+from typing import Iterator, Optional
 import PyPDF2
 from docx import Document
+from dotenv import load_dotenv
+
+from section_selector import estimate_tokens, ANALYSIS_TOKEN_BUDGET
+
+load_dotenv()
+
+# Plan text read from a PDF; the section selector picks the analysis
+# budget from it, so it has to reach well beyond ANALYSIS_TOKEN_BUDGET (0 = no limit)
+EXTRACTION_TOKEN_BUDGET = int(os.getenv("EXTRACTION_TOKEN_BUDGET", str(10 * ANALYSIS_TOKEN_BUDGET)))
+EXTRACTION_MAX_CHARS = int(os.getenv("EXTRACTION_MAX_CHARS", "0"))
 
-def extract_text_from_pdf(content: bytes) -> str:
-    """Extract text from PDF bytes"""
+def iter_pdf_pages(content: bytes) -> Iterator[str]:
+    """Yield the text of each PDF page, parsing a page only when it is requested"""
     try:
-        pdf_file = BytesIO(content)
-        pdf_reader = PyPDF2.PdfReader(pdf_file)
-        
-        text = ""
+        pdf_reader = PyPDF2.PdfReader(BytesIO(content))
         for page in pdf_reader.pages:
-            text += page.extract_text() + "\n"
-        
-        return text.strip()
+            yield page.extract_text() or ""
     except Exception as e:
         raise Exception(f"PDF extraction failed: {str(e)}")
 
+def read_pages_within_budget(
+    pages: Iterator[str], max_tokens: Optional[int] = None, max_chars: Optional[int] = None
+) -> str:
+    """Join pages until the token or character budget is met (None/0 = no limit)"""
+    parts = []
+    chars = 0
+    tokens = 0
+    for page_text in pages:
+        parts.append(page_text)
+        chars += len(page_text) + 1
+        if max_chars and chars >= max_chars:
+            break
+        if max_tokens:
+            tokens += estimate_tokens(page_text)
+            if tokens >= max_tokens:
+                break
+    return "\n".join(parts).strip()
+
+def extract_text_from_pdf(content: bytes, full: bool = False) -> str:
+    """Extract text from PDF bytes (up to the extraction budget unless full=True)"""
+    if full:
+        return read_pages_within_budget(iter_pdf_pages(content))
+    return read_pages_within_budget(iter_pdf_pages(content), EXTRACTION_TOKEN_BUDGET, EXTRACTION_MAX_CHARS)
+
 def extract_text_from_docx(content: bytes) -> str:
     """Extract text from DOCX bytes"""
     try:
@@ -41,20 +78,21 @@ def extract_text_from_docx(content: bytes) -> str:
     except Exception as e:
         raise Exception(f"DOCX extraction failed: {str(e)}")
 
-def extract_text_from_file(content: bytes, content_type: str) -> str:
+def extract_text_from_file(content: bytes, content_type: str, full: bool = False) -> str:
     """
     Extract text from file based on content type
     
     Args:
         content: File bytes
         content_type: MIME type
+        full: Extract every PDF page instead of stopping at the extraction budget
     
     Returns:
         Extracted text as string
     """
     
     if content_type == "application/pdf":
-        return extract_text_from_pdf(content)
+        return extract_text_from_pdf(content, full)
     
     elif content_type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
         return extract_text_from_docx(content)
@@ -62,6 +100,36 @@ def extract_text_from_file(content: bytes, content_type: str) -> str:
     else:
         raise ValueError(f"Unsupported content type: {content_type}")
 
+async def extract_text_from_pdf_async(content: bytes, full: bool = False) -> str:
+    """Extract text from PDF bytes without blocking the event loop"""
+    return await asyncio.to_thread(extract_text_from_pdf, content, full)
+
+async def extract_text_from_docx_async(content: bytes) -> str:
+    """Extract text from DOCX bytes without blocking the event loop"""
+    return await asyncio.to_thread(extract_text_from_docx, content)
+
+async def extract_text_from_file_async(content: bytes, content_type: str, full: bool = False) -> str:
+    """
+    Async variant of extract_text_from_file for the FastAPI endpoints
+    
+    Args:
+        content: File bytes
+        content_type: MIME type
+        full: Extract every PDF page instead of stopping at the extraction budget
+    
+    Returns:
+        Extracted text as string
+    """
+    
+    if content_type == "application/pdf":
+        return await extract_text_from_pdf_async(content, full)
+    
+    elif content_type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
+        return await extract_text_from_docx_async(content)
+    
+    else:
+        raise ValueError(f"Unsupported content type: {content_type}")
+
 # Test function
 if __name__ == "__main__":
     # Test with a sample file
@@ -0,0 +1,128 @@
+"""
+Plan Diff für GründerAI
+Section-level diff of two versions of a business plan
+
+A revised plan (after applying the Kopiervorlagen) usually differs in a
+few sections only. Both versions are segmented like in the section
+selector, sections are aligned by heading (numbering ignored), and the
+changed paragraphs are mapped to the criteria categories they talk
+about - only those categories need to be re-evaluated.
+"""
+
+import re
+import difflib
+from typing import Dict, List, NamedTuple, Tuple
+
+from section_selector import Section, CATEGORY_KEYWORDS, segment_sections, is_boilerplate, score_section
+
+# A category counts as affected from this share of the best category score
+CATEGORY_SHARE = 0.25
+
+NUMBERING = re.compile(r"^\s*(\d{1,2}(\.\d{1,2}){0,3})\.?\s*")
+PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+
+
+class SectionChange(NamedTuple):
+    title: str
+    status: str  # added | removed | changed
+    categories: Tuple[str, ...]
+    changed_chars: int
+
+    def to_dict(self) -> Dict:
+        return {"title": self.title, "status": self.status, "categories": list(self.categories)}
+
+
+class PlanDiff(NamedTuple):
+    changes: Tuple[SectionChange, ...]
+    categories: Tuple[str, ...]  # affected categories in CATEGORY_KEYWORDS order
+    changed_ratio: float  # changed characters / characters of the new plan
+
+    def to_dict(self) -> Dict:
+        return {
+            "changed_sections": [change.to_dict() for change in self.changes],
+            "affected_categories": list(self.categories),
+            "changed_ratio": round(self.changed_ratio, 3),
+        }
+
+
+def _section_key(title: str) -> str:
+    """Headings match across versions even when sections were renumbered"""
+    return " ".join(NUMBERING.sub("", title).lower().split())
+
+
+def _paragraphs(text: str) -> List[str]:
+    parts = PARAGRAPH_BREAK.split(text) if PARAGRAPH_BREAK.search(text) else text.splitlines()
+    return [" ".join(part.split()) for part in parts if part.strip()]
+
+
+def _changed_paragraphs(old_text: str, new_text: str) -> Tuple[List[str], int]:
+    """Paragraphs that were removed, replaced or inserted, and the size of the change"""
+    old, new = _paragraphs(old_text), _paragraphs(new_text)
+    matcher = difflib.SequenceMatcher(None, old, new, autojunk=False)
+    changed = []
+    size = 0
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag != "equal":
+            changed.extend(old[i1:i2] + new[j1:j2])
+            size += max(sum(map(len, old[i1:i2])), sum(map(len, new[j1:j2])))
+    return changed, size
+
+
+def affected_categories(title: str, changed_text: str, section_text: str = "") -> Tuple[str, ...]:
+    """
+    Criteria categories a change touches, by keyword relevance of the
+    changed text (the whole section if the change itself has no keywords)
+    """
+    scores = score_section(Section(0, title, changed_text))
+    if max(scores.values()) <= 0 and section_text:
+        scores = score_section(Section(0, title, section_text))
+    top = max(scores.values())
+    if top <= 0:
+        return ()
+    return tuple(category for category in CATEGORY_KEYWORDS if scores[category] >= CATEGORY_SHARE * top)
+
+
+def _content_sections(text: str) -> Dict[Tuple[str, int], Section]:
+    """Sections by (heading key, occurrence), cover pages and tables of contents dropped"""
+    sections = {}
+    occurrences: Dict[str, int] = {}
+    for section in segment_sections(text):
+        if is_boilerplate(section):
+            continue
+        key = _section_key(section.title)
+        occurrences[key] = occurrences.get(key, 0) + 1
+        sections[(key, occurrences[key])] = section
+    return sections
+
+
+def diff_plan_sections(old_text: str, new_text: str) -> PlanDiff:
+    """Changed, added and removed sections of the new plan version and the categories they affect"""
+    old_sections = _content_sections(old_text)
+    new_sections = _content_sections(new_text)
+    changes = []
+
+    for key, section in new_sections.items():
+        previous = old_sections.get(key)
+        if previous is None:
+            changes.append(SectionChange(
+                section.title, "added", affected_categories(section.title, section.text), len(section.text)
+            ))
+        elif " ".join(previous.text.split()) != " ".join(section.text.split()):
+            changed, size = _changed_paragraphs(previous.text, section.text)
+            changes.append(SectionChange(
+                section.title, "changed", affected_categories(section.title, "\n".join(changed), section.text), size
+            ))
+
+    for key, section in old_sections.items():
+        if key not in new_sections:
+            changes.append(SectionChange(
+                section.title, "removed", affected_categories(section.title, section.text), len(section.text)
+            ))
+
+    affected = {category for change in changes for category in change.categories}
+    total_chars = max(sum(len(section.text) for section in new_sections.values()), 1)
+    return PlanDiff(
+        tuple(changes),
+        tuple(category for category in CATEGORY_KEYWORDS if category in affected),
+        min(sum(change.changed_chars for change in changes) / total_chars, 1.0),
+    )
@@ -0,0 +1,297 @@
+"""
+Revenue Engine für GründerAI
+Local extraction of plan figures and deterministic revenue plausibility
+
+Extracts euro amounts with their context (Umsatz / Kosten / Entnahmen,
+Jahr 1-3) from the plan text - German number formats, T€/Mio. scales,
+monthly figures - and compares the year-1 revenue against an industry
+benchmark. Replaces the free-form revenue_comparison of the LLM answer,
+so F1 is evaluated instantly and identically on every run.
+Benchmarks come from the versioned benchmark index (benchmark_index.py).
+"""
+
+import re
+from typing import Dict, List, Optional, Set, Tuple
+
+from benchmark_index import find_benchmark, default_benchmark
+
+# Deviation (percent outside the benchmark range) → F1 status
+F1_OK_DEVIATION = 20
+F1_WARNING_DEVIATION = 50
+
+_NUMBER = r"\d{1,3}(?:[.\u00a0\u202f]\d{3})+(?:,\d{1,2})?|\d+(?:,\d+)?"
+AMOUNT = re.compile(
+    rf"(?P<pre>€|eur\b)?\s*(?<![\d.,])(?P<num>{_NUMBER})\s*"
+    r"(?P<scale>mio\.?|millionen|tsd\.?|t(?=\s?(?:€|eur))|k\b)?\s*(?P<post>€|eur\b|euro\b)?",
+    re.IGNORECASE,
+)
+
+# Metric keywords, checked in this order ("Lebenshaltungskosten" are Entnahmen, not Kosten)
+METRIC_KEYWORDS = [
+    ("entnahmen", re.compile(r"entnahme|lebenshaltung|privatbedarf|unternehmerlohn", re.IGNORECASE)),
+    ("umsatz", re.compile(r"umsatz|umsätze|erlöse|einnahmen", re.IGNORECASE)),
+    ("kosten", re.compile(r"kosten|ausgaben|aufwendungen|aufwand", re.IGNORECASE)),
+]
+SKIP_CONTEXT = re.compile(r"investition|kapitalbedarf|startkapital|darlehen|kredit|stammkapital|pro kunde|je kunde|stundensatz", re.IGNORECASE)
+# Figures about the market, not the plan ("Umsatzvolumen des Marktes", "Umsatzpotenzial")
+MARKET_CONTEXT = re.compile(r"markt|volumen|potenzial|potential|branchenumsatz", re.IGNORECASE)
+MONTHLY = re.compile(r"monatlich|pro monat|je monat|im monat|/\s*monat|\bmtl\.?", re.IGNORECASE)
+ANNUAL_HINT = re.compile(r"jahresumsatz|jährlich|pro jahr|im jahr|p\.\s?a\.", re.IGNORECASE)
+ORDINALS = {"erste": 1, "ersten": 1, "erstes": 1, "zweite": 2, "zweiten": 2, "zweites": 2, "dritte": 3, "dritten": 3, "drittes": 3}
+YEAR_PATTERNS = [
+    re.compile(r"\b(?:jahr|gj|geschäftsjahr)\s*([1-5])\b", re.IGNORECASE),
+    re.compile(r"\b([1-5])\.\s*(?:jahr|geschäftsjahr|gj)\b", re.IGNORECASE),
+    re.compile(r"\b(erste[nrs]?|zweite[nrs]?|dritte[nrs]?)\s+(?:jahr|geschäftsjahr)", re.IGNORECASE),
+]
+SEGMENT_SPLIT = re.compile(r"\n+|(?<=[.!?])\s+(?=[A-ZÄÖÜ])")
+
+MIN_ANNUAL_AMOUNT = 1000
+MAX_TABLE_COLUMNS = 5
+
+
+def parse_german_amount(number: str, scale: str = "") -> Optional[float]:
+    """'85.000,50' → 85000.5, with scale 'T'/'Tsd'/'k' (×1.000) or 'Mio' (×1.000.000)"""
+    cleaned = re.sub(r"[.\u00a0\u202f]", "", number).replace(",", ".")
+    try:
+        value = float(cleaned)
+    except ValueError:
+        return None
+    scale = (scale or "").lower().rstrip(".")
+    if scale in ("t", "tsd", "k"):
+        value *= 1000
+    elif scale in ("mio", "millionen"):
+        value *= 1000000
+    return value
+
+
+def find_amount_positions(segment: str) -> List[Tuple[int, float]]:
+    """(offset, value) of the euro amounts in a text segment (a currency sign or a scale is required)"""
+    amounts = []
+    for match in AMOUNT.finditer(segment):
+        if not (match.group("pre") or match.group("post") or match.group("scale")):
+            continue
+        value = parse_german_amount(match.group("num"), match.group("scale"))
+        if value is not None:
+            amounts.append((match.start("num"), value))
+    return amounts
+
+
+def find_amounts(segment: str) -> List[float]:
+    """Euro amounts in a text segment"""
+    return [value for _, value in find_amount_positions(segment)]
+
+
+def _year_mentions(segment: str) -> List[Tuple[int, int, int]]:
+    """(start, end, year) of the year references, without overlaps"""
+    mentions = []
+    for pattern in YEAR_PATTERNS:
+        for match in pattern.finditer(segment):
+            token = match.group(1).lower()
+            mentions.append((match.start(), match.end(), ORDINALS.get(token) or int(token)))
+    result = []
+    for mention in sorted(mentions):
+        if not result or mention[0] >= result[-1][1]:
+            result.append(mention)
+    return result
+
+
+def _year_amounts(segment: str, amounts: List[Tuple[int, float]]) -> Dict[int, float]:
+    """
+    Pair every year reference with its amount: "Jahr 1: 40.000 €, Jahr 2: 60.000 €"
+    (amount after the year) or "40.000 € im ersten Jahr, 60.000 € im zweiten" (before)
+    """
+    mentions = _year_mentions(segment)
+    if not mentions or not amounts:
+        return {}
+    pairs: Dict[int, float] = {}
+    amount_first = amounts[0][0] < mentions[0][0]
+    for index, (start, end, year) in enumerate(mentions):
+        if amount_first:
+            low, high = (mentions[index - 1][1] if index else 0), start
+            candidates = [value for offset, value in amounts if low <= offset < high]
+            if candidates:
+                pairs.setdefault(year, candidates[-1])
+        else:
+            high = mentions[index + 1][0] if index + 1 < len(mentions) else len(segment)
+            candidates = [value for offset, value in amounts if end <= offset < high]
+            if candidates:
+                pairs.setdefault(year, candidates[0])
+    return pairs
+
+
+def _metric(segment: str) -> Optional[str]:
+    for metric, pattern in METRIC_KEYWORDS:
+        if pattern.search(segment):
+            return metric
+    return None
+
+
+def _extract_financials(text: str) -> Tuple[Dict[str, Dict[int, float]], Set[str]]:
+    """Annual figures per metric and the metrics whose year 1 is only an unlabeled figure"""
+    figures: Dict[str, Dict[int, float]] = {"umsatz": {}, "kosten": {}, "entnahmen": {}}
+    fallback: Dict[str, float] = {}
+
+    for segment in SEGMENT_SPLIT.split(text):
+        metric = _metric(segment)
+        if metric is None or SKIP_CONTEXT.search(segment):
+            continue
+        positions = find_amount_positions(segment)
+        if not positions or len(positions) > MAX_TABLE_COLUMNS:
+            # no figure, or a monthly liquidity plan row
+            continue
+        if MONTHLY.search(segment):
+            positions = [(offset, a * 12) for offset, a in positions]
+        positions = [(offset, a) for offset, a in positions if a >= MIN_ANNUAL_AMOUNT]
+        if not positions:
+            continue
+        amounts = [a for _, a in positions]
+
+        years = _year_amounts(segment, positions)
+        if years:
+            for year, amount in years.items():
+                figures[metric].setdefault(year, amount)
+        elif len(amounts) > 1:
+            # table row: Jahr 1, Jahr 2, Jahr 3 ...
+            for index, amount in enumerate(amounts[:3], start=1):
+                figures[metric].setdefault(index, amount)
+        elif ANNUAL_HINT.search(segment) or MONTHLY.search(segment):
+            figures[metric].setdefault(1, amounts[0])
+        elif not MARKET_CONTEXT.search(segment):
+            fallback.setdefault(metric, amounts[0])
+
+    estimated = set()
+    for metric, amount in fallback.items():
+        if 1 not in figures[metric]:
+            figures[metric][1] = amount
+            estimated.add(metric)
+    return figures, estimated
+
+
+def extract_financials(text: str) -> Dict[str, Dict[int, float]]:
+    """
+    {"umsatz": {1: ..., 2: ..., 3: ...}, "kosten": {...}, "entnahmen": {...}}
+    Annual values; the first statement per metric and year wins.
+    """
+    return _extract_financials(text)[0]
+
+
+def deviation_percent(value: float, low: float, high: float) -> int:
+    """Percent outside the benchmark range (0 inside, positive above, negative below)"""
+    if value > high:
+        return round((value - high) / high * 100)
+    if value < low:
+        return -round((low - value) / low * 100)
+    return 0
+
+
+def f1_status(deviation: Optional[int]) -> Optional[str]:
+    """F1 (realistische Umsatzprognose) from the benchmark deviation"""
+    if deviation is None:
+        return None
+    if abs(deviation) <= F1_OK_DEVIATION:
+        return "OK"
+    if abs(deviation) <= F1_WARNING_DEVIATION:
+        return "WARNUNG"
+    return "FEHLER"
+
+
+def revenue_f1_status(assessment: Dict) -> Optional[str]:
+    """F1 of a revenue assessment, None when the year-1 revenue is only estimated"""
+    if assessment.get("plan_estimated"):
+        return None
+    return f1_status(assessment["deviation_percent"])
+
+
+def assess_revenue(text: str, industry: Optional[str] = None) -> Dict:
+    """
+    revenue_comparison of the analysis: plan figures, benchmark,
+    deviation and plausibility warnings - all computed locally
+    """
+    figures, estimated = _extract_financials(text)
+    revenue, costs, withdrawals = figures["umsatz"], figures["kosten"], figures["entnahmen"]
+    benchmark = find_benchmark(industry).benchmark
+    label, low, high = benchmark.label, benchmark.low, benchmark.high
+    plan = revenue.get(1)
+
+    deviation = deviation_percent(plan, low, high) if plan is not None else None
+    if deviation is None:
+        plausibility = "UNBEKANNT"
+    elif deviation > 0:
+        plausibility = "ZU_HOCH"
+    elif deviation < 0:
+        plausibility = "ZU_NIEDRIG"
+    else:
+        plausibility = "PLAUSIBEL"
+
+    warnings = []
+    if plan is None:
+        warnings.append("Kein Umsatz für das erste Jahr gefunden")
+    else:
+        if "umsatz" in estimated:
+            warnings.append("Umsatz für das erste Jahr nicht eindeutig ausgewiesen")
+        if costs.get(1) is not None and costs[1] >= plan:
+            warnings.append("Kosten im ersten Jahr übersteigen den Umsatz")
+        if withdrawals.get(1) is not None and plan - costs.get(1, 0) < withdrawals[1]:
+            warnings.append("Gewinn im ersten Jahr deckt die Privatentnahmen nicht")
+        if revenue.get(2) is not None and revenue[2] > plan * 2:
+            warnings.append("Umsatzsprung von Jahr 1 auf Jahr 2 über 100 %")
+    if not withdrawals:
+        warnings.append("Keine Privatentnahmen / Lebenshaltungskosten gefunden")
+
+    return {
+        "plan": round(plan) if plan is not None else None,
+        "ihk_benchmark": f"{low}-{high}",
+        "benchmark_low": low,
+        "benchmark_high": high,
+        "benchmark_industry": label,
+        "benchmark_source": benchmark.source,
+        "deviation_percent": deviation,
+        "plausibility": plausibility,
+        "plan_years": {str(year): round(value) for year, value in sorted(revenue.items())},
+        "costs_years": {str(year): round(value) for year, value in sorted(costs.items())},
+        "withdrawals_years": {str(year): round(value) for year, value in sorted(withdrawals.items())},
+        "warnings": warnings,
+        # Year-1 revenue from a figure without year or period - too weak to decide F1
+        "plan_estimated": "umsatz" in estimated,
+        "source": "local",
+    }
+
+
+def format_euro(value: float) -> str:
+    """85000 → '€85.000'"""
+    return f"€{value:,.0f}".replace(",", ".")
+
+
+def format_benchmark_range(low: float, high: float) -> str:
+    """(40000, 60000) → '€40.000 - €60.000'"""
+    if low == high:
+        return format_euro(low)
+    return f"{format_euro(low)} - {format_euro(high)}"
+
+
+def default_benchmark_range() -> str:
+    """Display range of the default benchmark (no industry / no figures)"""
+    benchmark = default_benchmark()
+    return format_benchmark_range(benchmark.low, benchmark.high)
+
+
+def parse_benchmark_range(benchmark) -> Optional[Tuple[float, float]]:
+    """'40000-60000', '€40.000 - €60.000', '40 - 60 T€' → (low, high)"""
+    if isinstance(benchmark, (int, float)):
+        return float(benchmark), float(benchmark)
+    if not isinstance(benchmark, str):
+        return None
+    parts = re.split(r"\s*[-–]\s*|\s+bis\s+", benchmark.strip(), maxsplit=1)
+    if len(parts) != 2:
+        return None
+    scale_match = re.search(r"(mio|tsd|t(?=\s?(?:€|eur))|k\b)", parts[1], re.IGNORECASE)
+    scale = scale_match.group(1) if scale_match else ""
+    values = []
+    for part in parts:
+        match = re.search(_NUMBER, part)
+        if not match:
+            return None
+        values.append(parse_german_amount(match.group(0), scale))
+    if None in values:
+        return None
+    return values[0], values[1]
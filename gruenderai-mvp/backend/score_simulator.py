@@ -0,0 +1,111 @@
+"""
+Score Simulator für GründerAI
+Local what-if scores over the criteria checklist
+
+The results page asks "what if I fix only G4 and F1?" - answered from the
+stored analysis without a Claude call, in a few microseconds:
+- gain of a fix = its impact_points, capped by the recoverable points of
+  the criterion (FEHLER: all max_points, WARNUNG: the missing half)
+- fixes without impact_points fall back to the recovery factors
+- potential score = current score + gains of the selected fixes, capped
+"""
+
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+from criteria_registry import criteria_registry
+
+POTENTIAL_SCORE_CAP = 95
+
+# Share of a criterion's max_points per checklist status
+STATUS_WEIGHTS = {"OK": 1.0, "WARNUNG": 0.5, "FEHLER": 0.0, "NICHT_GEFUNDEN": 0.0}
+# Estimated recovery without impact_points (share of max_points)
+RECOVERY_FACTORS = {"FEHLER": 0.85, "WARNUNG": 0.5}
+RISK_BANDS = [(85, "NIEDRIG"), (65, "MITTEL"), (45, "HOCH"), (0, "KRITISCH")]
+
+
+def risk_level_for_score(score: int) -> str:
+    """Risk band of a score (same bands as in the prompts)"""
+    for threshold, risk_level in RISK_BANDS:
+        if score >= threshold:
+            return risk_level
+    return "KRITISCH"
+
+
+def _int_or_none(value) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class FixGain(NamedTuple):
+    criterion_id: str
+    name: str
+    status: str
+    gain: int
+    time_minutes: int
+
+
+def fix_gain(criterion_id: str, status: str, fix: Dict) -> int:
+    """Score points a fix recovers for a WARNUNG/FEHLER criterion"""
+    max_points = criteria_registry.get(criterion_id).max_points
+    recoverable = int(max_points * (1.0 - STATUS_WEIGHTS[status]))
+    impact = _int_or_none(fix.get("impact_points")) if isinstance(fix, dict) else None
+    if impact is None:
+        return int(max_points * RECOVERY_FACTORS[status])
+    return max(0, min(impact, recoverable))
+
+
+class ScoreModel:
+    """Fix gains of one analysis, built once and evaluated for any fix subset"""
+
+    __slots__ = ("score", "gains")
+
+    def __init__(self, score: int, checklist: Dict, fixes: Dict):
+        self.score = int(score or 0)
+        self.gains: Dict[str, FixGain] = {}
+        for cid, status in checklist.items():
+            status = str(status).upper()
+            if status in RECOVERY_FACTORS and cid in fixes:
+                fix = fixes[cid] if isinstance(fixes[cid], dict) else {}
+                self.gains[cid] = FixGain(
+                    cid, criteria_registry.get(cid).name, status,
+                    fix_gain(cid, status, fix), _int_or_none(fix.get("time_minutes")) or 10,
+                )
+
+    @classmethod
+    def from_result(cls, result: Dict) -> "ScoreModel":
+        return cls(result.get("score", 0), result.get("criteria_checklist", {}), result.get("criteria_fixes", {}))
+
+    def potential(self, fix_ids: Optional[Iterable[str]] = None) -> int:
+        """Score after applying the given fixes (all fixes when None)"""
+        gains = self.gains.values() if fix_ids is None else (self.gains[cid] for cid in fix_ids if cid in self.gains)
+        return min(self.score + sum(g.gain for g in gains), max(POTENTIAL_SCORE_CAP, self.score))
+
+    def simulate(self, fix_ids: Optional[List[str]] = None) -> Dict:
+        """Current, potential and per-fix scores for a subset of fixes"""
+        selected = list(self.gains) if fix_ids is None else list(dict.fromkeys(c for c in fix_ids if c in self.gains))
+        selected_ids = set(selected)
+        potential = self.potential(selected)
+        return {
+            "current_score": self.score,
+            "potential_score": potential,
+            "potential_risk_level": risk_level_for_score(potential),
+            "score_improvement": potential - self.score,
+            "selected_fixes": selected,
+            "unknown_fixes": [] if fix_ids is None else [c for c in fix_ids if c not in self.gains],
+            "total_time_minutes": sum(self.gains[cid].time_minutes for cid in selected),
+            "fixes": [
+                {
+                    "criterion_id": g.criterion_id,
+                    "name": g.name,
+                    "status": g.status,
+                    "gain": g.gain,
+                    "score_alone": self.potential([g.criterion_id]),
+                    "time_minutes": g.time_minutes,
+                    "selected": g.criterion_id in selected_ids,
+                }
+                for g in self.gains.values()
+            ],
+            "score_cap": POTENTIAL_SCORE_CAP,
+        }
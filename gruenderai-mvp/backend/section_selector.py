@@ -0,0 +1,217 @@
+"""
+Section Selector für GründerAI
+Token-budget-aware selection of business plan content for the analysis prompt
+
+Instead of sending the first N characters, the plan is segmented into
+sections (Finanzplan, Marktanalyse, Qualifikation, ...), each section is
+ranked by relevance to the BA GZ 04 criteria categories and the best
+content is packed into a configurable token budget.
+"""
+
+import os
+import re
+from typing import Dict, List, NamedTuple
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Token budget for the plan text in the analysis prompt
+ANALYSIS_TOKEN_BUDGET = int(os.getenv("ANALYSIS_TOKEN_BUDGET", "3000"))
+
+# Keywords per criteria category (keys match BA_GZ_04_CRITERIA)
+CATEGORY_KEYWORDS = {
+    "grundvoraussetzungen": [
+        "rechtsform", "einzelunternehmen", "freiberuf", "gmbh", "ug ", "gbr", "gesellschafter",
+        "mitarbeiter", "angestellte", "personal", "vollzeit", "haupterwerb", "stunden",
+        "arbeitslosengeld", "alg", "gründungszuschuss", "agentur für arbeit",
+    ],
+    "finanzplanung": [
+        "finanz", "umsatz", "kosten", "liquidität", "rentabilität", "break-even", "break even",
+        "gewinnschwelle", "kapitalbedarf", "investition", "startkapital", "entnahme",
+        "lebenshaltung", "gewinn", "eigenkapital", "kredit", "€", "eur",
+    ],
+    "marktanalyse": [
+        "markt", "zielgruppe", "wettbewerb", "konkurren", "kunden", "usp",
+        "alleinstellung", "preis", "nachfrage", "branche",
+    ],
+    "geschaeftsmodell": [
+        "geschäftsidee", "angebot", "leistung", "produkt", "dienstleistung", "marketing",
+        "vertrieb", "werbung", "akquise", "standort", "geschäftsmodell",
+    ],
+    "qualifikation": [
+        "qualifikation", "erfahrung", "ausbildung", "studium", "lebenslauf", "gründerperson",
+        "kenntnisse", "berufserfahrung", "weiterbildung", "netzwerk", "kontakte",
+    ],
+    "risikobewertung": [
+        "risik", "chancen", "swot", "schwächen", "plan b", "alternative", "gegenmaßnahme",
+        "absicherung", "versicherung",
+    ],
+}
+
+# Typical business plan headings without a category keyword
+HEADING_WORDS = [
+    "deckblatt", "inhaltsverzeichnis", "inhalt", "zusammenfassung", "executive summary",
+    "vorwort", "anhang", "anlage", "fazit", "ausblick", "unternehmen", "gründer",
+]
+
+# Sections that never help the analysis
+BOILERPLATE_PATTERNS = [
+    re.compile(r"inhaltsverzeichnis|inhalt\s*$|deckblatt|table of contents", re.IGNORECASE),
+]
+TOC_LINE = re.compile(r"(\.{4,}|…{2,}|\s{3,})\s*\d{1,3}\s*$")
+NUMBERED_HEADING = re.compile(r"^\s*(\d{1,2}(\.\d{1,2}){0,3})\.?\s+\S")
+TOKEN_PIECE = re.compile(r"\w+|[^\w\s]")
+SENTENCE_END = re.compile(r"[.!?]\s")
+
+HEADING_WEIGHT = 3.0
+
+
+class Section(NamedTuple):
+    index: int
+    title: str
+    text: str
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Local token estimate (no API call).
+    Short words and punctuation cost one token, long German
+    compounds roughly one token per six characters.
+    """
+    return sum(1 + len(piece) // 6 for piece in TOKEN_PIECE.findall(text))
+
+
+def _is_heading(line: str) -> bool:
+    stripped = line.strip()
+    if not stripped or len(stripped) > 80 or stripped.endswith((".", ",", ";")):
+        return False
+    if NUMBERED_HEADING.match(stripped) and not TOC_LINE.search(stripped):
+        return True
+    lowered = stripped.lower()
+    if len(stripped.split()) <= 6:
+        if stripped.isupper() and len(stripped) > 3:
+            return True
+        if any(lowered.startswith(w) for w in HEADING_WORDS):
+            return True
+        for keywords in CATEGORY_KEYWORDS.values():
+            if any(lowered.startswith(k) for k in keywords if len(k) > 4):
+                return True
+    return False
+
+
+def segment_sections(text: str) -> List[Section]:
+    """Split plan text into sections at heading-like lines"""
+    sections: List[Section] = []
+    title = ""
+    body: List[str] = []
+
+    for line in text.splitlines():
+        if _is_heading(line):
+            if title or any(l.strip() for l in body):
+                sections.append(Section(len(sections), title, "\n".join(body).strip()))
+            title = line.strip()
+            body = []
+        else:
+            body.append(line)
+
+    if title or any(l.strip() for l in body):
+        sections.append(Section(len(sections), title, "\n".join(body).strip()))
+    return sections
+
+
+def is_boilerplate(section: Section) -> bool:
+    """Cover pages and tables of contents"""
+    if any(p.search(section.title) for p in BOILERPLATE_PATTERNS):
+        return True
+    lines = [l for l in section.text.splitlines() if l.strip()]
+    if lines and sum(1 for l in lines if TOC_LINE.search(l)) / len(lines) > 0.5:
+        return True
+    return False
+
+
+def score_section(section: Section) -> Dict[str, float]:
+    """Relevance of a section per criteria category"""
+    title = section.title.lower()
+    body = section.text.lower()
+    scores = {}
+    for category, keywords in CATEGORY_KEYWORDS.items():
+        score = 0.0
+        for keyword in keywords:
+            if keyword in title:
+                score += HEADING_WEIGHT
+            score += min(body.count(keyword), 5)
+        scores[category] = score
+    return scores
+
+
+def _render(section: Section) -> str:
+    return f"{section.title}\n{section.text}".strip() if section.title else section.text
+
+
+def _truncate_to_budget(text: str, budget: int) -> str:
+    """Cut text to roughly `budget` tokens, preferably at a sentence end"""
+    if budget <= 0:
+        return ""
+    ratio = budget / max(estimate_tokens(text), 1)
+    cut = text[:int(len(text) * ratio)]
+    sentence_ends = [m.end() for m in SENTENCE_END.finditer(cut)]
+    if sentence_ends and sentence_ends[-1] > len(cut) // 2:
+        cut = cut[:sentence_ends[-1]]
+    return cut.strip()
+
+
+def select_plan_text(text: str, token_budget: int = ANALYSIS_TOKEN_BUDGET) -> str:
+    """
+    Pack the most relevant plan sections into the token budget.
+
+    1. Drop cover pages and tables of contents
+    2. Take the best section of every criteria category (coverage)
+    3. Fill the remaining budget by relevance per token
+    Selected sections keep their original order.
+    """
+    sections = [s for s in segment_sections(text) if not is_boilerplate(s)]
+    if not sections:
+        return _truncate_to_budget(text, token_budget)
+
+    rendered = {s.index: _render(s) for s in sections}
+    tokens = {s.index: max(estimate_tokens(rendered[s.index]), 1) for s in sections}
+
+    if sum(tokens.values()) <= token_budget:
+        return "\n\n".join(rendered[s.index] for s in sections)
+
+    scores = {s.index: score_section(s) for s in sections}
+    relevance = {i: sum(category_scores.values()) for i, category_scores in scores.items()}
+    allotted: Dict[int, int] = {}
+    remaining = token_budget
+
+    def allot(index: int, limit: int):
+        nonlocal remaining
+        extra = min(tokens[index] - allotted.get(index, 0), limit, remaining)
+        if extra <= 0 or (index not in allotted and extra < min(100, tokens[index])):
+            return
+        allotted[index] = allotted.get(index, 0) + extra
+        remaining -= extra
+
+    # Coverage: best section per category, capped so one huge section cannot eat the budget
+    per_category_cap = max(token_budget // (len(CATEGORY_KEYWORDS) + 1), 100)
+    for category in CATEGORY_KEYWORDS:
+        best = max(sections, key=lambda s: scores[s.index][category])
+        if scores[best.index][category] > 0 and best.index not in allotted:
+            allot(best.index, per_category_cap)
+
+    # Fill: relevance density, partially taken sections may grow
+    ranked = sorted(
+        (s for s in sections if relevance[s.index] > 0),
+        key=lambda s: relevance[s.index] / tokens[s.index] ** 0.5,
+        reverse=True,
+    )
+    for section in ranked:
+        allot(section.index, tokens[section.index])
+
+    selected = []
+    for index in sorted(allotted):
+        if allotted[index] >= tokens[index]:
+            selected.append(rendered[index])
+        else:
+            selected.append(_truncate_to_budget(rendered[index], allotted[index]))
+    return "\n\n".join(part for part in selected if part)
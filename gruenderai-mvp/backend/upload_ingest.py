@@ -0,0 +1,204 @@
+"""
+Upload Ingestion für GründerAI
+Streaming multipart parsing with size limit, hashing and format sniffing
+
+FastAPI's UploadFile spools the whole request body to a temporary file
+before the endpoint runs; the endpoint then reads it a second time and
+only afterwards checks size and type. Here the checks run chunk by chunk
+as the body arrives:
+- the size limit is enforced per chunk (and up front from Content-Length),
+  oversized uploads are rejected without being buffered
+- the format is sniffed from the first bytes (%PDF- / ZIP header), files
+  that are neither PDF nor DOCX are rejected before the rest arrives
+- SHA-256 of the file is computed on the fly
+The file itself is still collected completely: text extraction needs the
+whole document (a PDF's xref table is at its end) and starts only when the
+file part has ended - ingestion returns right then, without reading any
+parts that follow it.
+"""
+
+import hashlib
+from typing import AsyncIterator, Dict, NamedTuple, Optional
+from multipart.exceptions import MultipartParseError
+from multipart.multipart import MultipartParser, parse_options_header
+
+UPLOAD_MAX_BYTES = 5 * 1024 * 1024
+UPLOAD_CHUNK_SIZE = 64 * 1024
+# Multipart boundaries and part headers on top of the file itself
+MULTIPART_OVERHEAD_BYTES = 16 * 1024
+
+UPLOAD_FIELD = "file"
+PDF_TYPE = "application/pdf"
+DOCX_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+ALLOWED_TYPES = [PDF_TYPE, DOCX_TYPE]
+
+# PDF readers accept the header anywhere in the first 1024 bytes
+PDF_HEADER_WINDOW = 1024
+SNIFF_BYTES = 8
+
+INVALID_TYPE_MESSAGE = "Invalid file type. Only PDF and DOCX files are supported."
+TOO_LARGE_MESSAGE = "File too large. Maximum size is 5MB."
+
+
+class UploadRejectedError(Exception):
+    """Upload is not a valid PDF/DOCX within the size limit"""
+
+
+class IngestedUpload(NamedTuple):
+    content: bytes
+    content_type: str
+    filename: Optional[str]
+    sha256: str
+
+    @property
+    def size(self) -> int:
+        return len(self.content)
+
+
+def sniff_format(head: bytes) -> Optional[str]:
+    """MIME type from the first bytes of a file (None: neither PDF nor DOCX)"""
+    if b"%PDF-" in head[:PDF_HEADER_WINDOW]:
+        return PDF_TYPE
+    if head.startswith(b"PK\x03\x04"):
+        return DOCX_TYPE
+    return None
+
+
+class UploadAccumulator:
+    """Collects one file chunk by chunk: size limit, SHA-256 and format sniffing"""
+
+    def __init__(self, content_type: Optional[str], filename: Optional[str] = None):
+        if content_type not in ALLOWED_TYPES:
+            raise UploadRejectedError(INVALID_TYPE_MESSAGE)
+        self.content_type = content_type
+        self.filename = filename
+        self._buffer = bytearray()
+        self._hash = hashlib.sha256()
+        self._sniffed = False
+
+    def feed(self, chunk: bytes):
+        if len(self._buffer) + len(chunk) > UPLOAD_MAX_BYTES:
+            raise UploadRejectedError(TOO_LARGE_MESSAGE)
+        self._buffer += chunk
+        self._hash.update(chunk)
+        if not self._sniffed and len(self._buffer) >= SNIFF_BYTES:
+            self._check_format()
+
+    def _check_format(self):
+        detected = sniff_format(bytes(self._buffer[:PDF_HEADER_WINDOW]))
+        if detected == self.content_type:
+            self._sniffed = True
+        elif self.content_type != PDF_TYPE or len(self._buffer) >= PDF_HEADER_WINDOW:
+            # PDFs may carry junk before the header - wait for the whole window
+            raise UploadRejectedError(INVALID_TYPE_MESSAGE)
+
+    def finish(self) -> IngestedUpload:
+        if not self._sniffed and sniff_format(bytes(self._buffer[:PDF_HEADER_WINDOW])) != self.content_type:
+            raise UploadRejectedError(INVALID_TYPE_MESSAGE)
+        return IngestedUpload(bytes(self._buffer), self.content_type, self.filename, self._hash.hexdigest())
+
+
+class _FilePartCollector:
+    """MultipartParser callbacks that feed the `file` part into an UploadAccumulator"""
+
+    def __init__(self):
+        self.upload: Optional[IngestedUpload] = None
+        self._accumulator: Optional[UploadAccumulator] = None
+        self._headers: Dict[bytes, bytes] = {}
+        self._header_field = b""
+        self._header_value = b""
+        self._in_file_part = False
+
+    def callbacks(self) -> Dict:
+        return {
+            "on_part_begin": self.on_part_begin,
+            "on_part_data": self.on_part_data,
+            "on_part_end": self.on_part_end,
+            "on_header_field": self.on_header_field,
+            "on_header_value": self.on_header_value,
+            "on_header_end": self.on_header_end,
+            "on_headers_finished": self.on_headers_finished,
+        }
+
+    def on_part_begin(self):
+        self._headers = {}
+        self._in_file_part = False
+
+    def on_header_field(self, data: bytes, start: int, end: int):
+        self._header_field += data[start:end]
+
+    def on_header_value(self, data: bytes, start: int, end: int):
+        self._header_value += data[start:end]
+
+    def on_header_end(self):
+        self._headers[self._header_field.lower()] = self._header_value
+        self._header_field = b""
+        self._header_value = b""
+
+    def on_headers_finished(self):
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        if options.get(b"name", b"").decode("utf-8", "replace") != UPLOAD_FIELD or self.upload is not None:
+            return
+        filename = options.get(b"filename")
+        content_type = self._headers.get(b"content-type", b"").decode("latin-1").split(";")[0].strip()
+        self._accumulator = UploadAccumulator(
+            content_type, filename.decode("utf-8", "replace") if filename is not None else None
+        )
+        self._in_file_part = True
+
+    def on_part_data(self, data: bytes, start: int, end: int):
+        if self._in_file_part:
+            self._accumulator.feed(data[start:end])
+
+    def on_part_end(self):
+        if self._in_file_part:
+            self.upload = self._accumulator.finish()
+            self._in_file_part = False
+
+
+async def ingest_multipart(headers, stream: AsyncIterator[bytes]) -> IngestedUpload:
+    """
+    Parse a multipart/form-data body while it arrives and return its complete
+    `file` part. Size, type and hash are checked incrementally; the caller
+    extracts text only after this returns at the end of the file part.
+    Raises UploadRejectedError.
+    """
+    content_type, params = parse_options_header(headers.get("content-type", ""))
+    boundary = params.get(b"boundary")
+    if content_type != b"multipart/form-data" or not boundary:
+        raise UploadRejectedError("Expected a multipart/form-data upload with a file field.")
+
+    body_limit = UPLOAD_MAX_BYTES + MULTIPART_OVERHEAD_BYTES
+    try:
+        declared_length = int(headers.get("content-length", "0"))
+    except ValueError:
+        declared_length = 0
+    if declared_length > body_limit:
+        raise UploadRejectedError(TOO_LARGE_MESSAGE)
+
+    collector = _FilePartCollector()
+    parser = MultipartParser(boundary, collector.callbacks())
+    received = 0
+    async for chunk in stream:
+        received += len(chunk)
+        if received > body_limit:
+            raise UploadRejectedError(TOO_LARGE_MESSAGE)
+        try:
+            parser.write(chunk)
+        except MultipartParseError:
+            raise UploadRejectedError("Malformed multipart upload.")
+        if collector.upload is not None:
+            return collector.upload
+
+    raise UploadRejectedError("No file uploaded.")
+
+
+async def read_upload_file(file) -> IngestedUpload:
+    """Chunked read of an already received UploadFile (batch uploads)"""
+    accumulator = UploadAccumulator(file.content_type, file.filename)
+    while True:
+        chunk = await file.read(UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            break
+        accumulator.feed(chunk)
+    return accumulator.finish()